@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks BVH queries against testing every AABB.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import bvh, geometric_tests
+from .common import best_of, report
+
+N = 100000
+Q = 200
+
+
+def main():
+    rng = np.random.RandomState(0)
+    centres = rng.uniform(-100., 100., (N, 3))
+    extents = rng.uniform(.1, 1., (N, 3))
+    aabbs = np.stack([centres - extents, centres + extents], axis=1)
+
+    for method in ('sah', 'median'):
+        print('{:<32} {:>10.3f} ms'.format(
+            'create_from_aabbs ({})'.format(method),
+            best_of(lambda: bvh.create_from_aabbs(aabbs, method=method)) * 1e3
+        ))
+    tree = bvh.create_from_aabbs(aabbs)
+    print('{:<32} {:>10.3f} ms'.format('refit', best_of(lambda: bvh.refit(tree)) * 1e3))
+
+    rays = np.stack([rng.uniform(-100., 100., (Q, 3)), rng.normal(size=(Q, 3))], axis=1)
+    report('intersect_rays',
+        lambda: [geometric_tests.rays_intersect_aabbs(r, aabbs) for r in rays],
+        lambda: bvh.intersect_rays(tree, rays),
+        labels=('brute', 'bvh'))
+
+    points = rng.uniform(-100., 100., (Q, 3))
+    report('intersect_points',
+        lambda: [np.all((aabbs[:, 0] <= p) & (p <= aabbs[:, 1]), axis=-1) for p in points],
+        lambda: bvh.intersect_points(tree, points),
+        labels=('brute', 'bvh'))
+
+    boxes = aabbs[:Q] * 2.
+    report('intersect_aabbs',
+        lambda: [np.all((b[0] <= aabbs[:, 1]) & (aabbs[:, 0] <= b[1]), axis=-1) for b in boxes],
+        lambda: bvh.intersect_aabbs(tree, boxes),
+        labels=('brute', 'bvh'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks batched frustum culling against a per-object loop.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import frustum, matrix44
+from .common import report
+
+N = 10000
+
+
+def main():
+    rng = np.random.RandomState(0)
+    f = frustum.create_from_matrix(matrix44.multiply(
+        matrix44.create_look_at([0., 0., 50.], [0., 0., 0.], [0., 1., 0.]),
+        matrix44.create_perspective_projection(60., 16. / 9., .1, 100.)
+    ))
+
+    spheres = np.empty((N, 4))
+    spheres[:, 0:3] = rng.uniform(-100., 100., (N, 3))
+    spheres[:, 3] = rng.uniform(.1, 5., N)
+    report('classify_spheres',
+        lambda: [frustum.classify_spheres(f, a) for a in spheres],
+        lambda: frustum.classify_spheres(f, spheres))
+
+    centres = rng.uniform(-100., 100., (N, 3))
+    extents = rng.uniform(.1, 5., (N, 3))
+    aabbs = np.stack([centres - extents, centres + extents], axis=1)
+    report('classify_aabbs',
+        lambda: [frustum.classify_aabbs(f, a) for a in aabbs],
+        lambda: frustum.classify_aabbs(f, aabbs))
+
+
+if __name__ == '__main__':
+    main()
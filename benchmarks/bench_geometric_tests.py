@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks the batched geometric tests against per-element loops.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import bvh, geometric_tests as gt
+from .common import best_of, report
+
+N = 10000
+T = 100000
+
+
+def main():
+    rng = np.random.RandomState(0)
+    rays = np.stack([rng.uniform(-10., 10., (N, 3)), rng.normal(size=(N, 3))], axis=1)
+    centres = rng.uniform(-10., 10., (N, 3))
+    aabbs = np.stack([centres - 1., centres + 1.], axis=1)
+
+    report('rays_intersect_aabbs',
+        lambda: [gt.ray_intersect_aabb(r, a) for r, a in zip(rays, aabbs)],
+        lambda: gt.rays_intersect_aabbs(rays, aabbs))
+    report('rays_intersect_aabbs all pairs',
+        lambda: [gt.rays_intersect_aabbs(r, aabbs[:1000]) for r in rays[:1000]],
+        lambda: gt.rays_intersect_aabbs(rays[:1000], aabbs[:1000], all_pairs=True),
+        labels=('per ray', 'all pairs'))
+
+    spheres = np.empty((N, 4))
+    spheres[:, 0:3] = centres
+    spheres[:, 3] = rng.uniform(.5, 2., N)
+    report('rays_intersect_spheres',
+        lambda: [gt.ray_intersect_sphere(r, s) for r, s in zip(rays, spheres)],
+        lambda: gt.rays_intersect_spheres(rays, spheres))
+    report('rays_intersect_spheres all pairs',
+        lambda: [gt.rays_intersect_spheres(r, spheres[:1000]) for r in rays[:1000]],
+        lambda: gt.rays_intersect_spheres(rays[:1000], spheres[:1000], all_pairs=True),
+        labels=('per ray', 'all pairs'))
+
+    others = np.concatenate([rng.uniform(-10., 10., (N, 3)), rng.uniform(.5, 2., (N, 1))], axis=-1)
+    report('spheres_intersect_spheres',
+        lambda: [gt.sphere_does_intersect_sphere(a, b) for a, b in zip(spheres, others)],
+        lambda: gt.spheres_intersect_spheres(spheres, others))
+    report('spheres_penetration_spheres',
+        lambda: [gt.sphere_penetration_sphere(a, b) for a, b in zip(spheres, others)],
+        lambda: gt.spheres_penetration_spheres(spheres, others))
+    report('spheres_intersect_spheres all pairs',
+        lambda: [gt.spheres_intersect_spheres(s, others[:1000]) for s in spheres[:1000]],
+        lambda: gt.spheres_intersect_spheres(spheres[:1000], others[:1000], all_pairs=True),
+        labels=('per sphere', 'all pairs'))
+    report('spheres_penetration_spheres all pairs',
+        lambda: [gt.spheres_penetration_spheres(s, others[:1000]) for s in spheres[:1000]],
+        lambda: gt.spheres_penetration_spheres(spheres[:1000], others[:1000], all_pairs=True),
+        labels=('per sphere', 'all pairs'))
+
+    triangles = rng.uniform(-10., 10., (N, 1, 3)) + rng.uniform(-.5, .5, (N, 3, 3))
+    report('rays_intersect_triangles',
+        lambda: [gt.rays_intersect_triangles(r, t) for r, t in zip(rays, triangles)],
+        lambda: gt.rays_intersect_triangles(rays, triangles))
+
+    # ray casting a 100k triangle mesh, by brute force and with a bvh
+    mesh = rng.uniform(-10., 10., (T, 1, 3)) + rng.uniform(-.5, .5, (T, 3, 3))
+    tree = bvh.create_from_aabbs(np.stack([np.min(mesh, axis=1), np.max(mesh, axis=1)], axis=1))
+
+    def bvh_closest():
+        ray, triangle, _ = bvh.intersect_rays(tree, rays[:1000])
+        hit, t, barycentric = gt.rays_intersect_triangles(rays[ray], mesh[triangle])
+        ray, triangle, t = ray[hit], triangle[hit], t[hit]
+        order = np.lexsort((t, ray))
+        return ray[order], triangle[order], t[order]
+
+    report('rays_closest_triangle 1k x 100k',
+        lambda: gt.rays_closest_triangle(rays[:1000], mesh),
+        bvh_closest,
+        labels=('brute', 'bvh'))
+
+
+if __name__ == '__main__':
+    main()
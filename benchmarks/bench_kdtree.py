@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks building a k-d tree over 1M points, and its queries against
+testing every point.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import kdtree
+from .common import best_of, report
+
+N = 1000000
+
+#: The number of query points timed on their own.
+Q = 100000
+
+#: The number of query points used when comparing against testing every point.
+BRUTE_Q = 100
+
+
+def main():
+    rng = np.random.RandomState(0)
+    # 1 point per unit cube
+    points = rng.uniform(0., 100., (N, 3))
+
+    print('{:<32} {:>10.3f} ms'.format(
+        'create_from_points 1M', best_of(lambda: kdtree.create_from_points(points), repeat=1) * 1e3
+    ))
+    tree = kdtree.create_from_points(points)
+
+    queries = rng.uniform(0., 100., (Q, 3))
+    brute = queries[:BRUTE_Q]
+    report('query_nearest 100, k=1',
+        lambda: [np.argmin(np.sum((points - q) ** 2, axis=-1)) for q in brute],
+        lambda: kdtree.query_nearest(tree, brute),
+        labels=('brute', 'kdtree'))
+    report('query_radius 100',
+        lambda: [np.flatnonzero(np.sum((points - q) ** 2, axis=-1) <= 1.) for q in brute],
+        lambda: kdtree.query_radius(tree, brute, 1.),
+        labels=('brute', 'kdtree'))
+
+    for k in (1, 8):
+        print('{:<32} {:>10.3f} ms'.format(
+            'query_nearest 100k, k={}'.format(k), best_of(lambda: kdtree.query_nearest(tree, queries, k), repeat=1) * 1e3
+        ))
+    print('{:<32} {:>10.3f} ms'.format(
+        'query_radius 100k', best_of(lambda: kdtree.query_radius(tree, queries, 1.), repeat=1) * 1e3
+    ))
+
+
+if __name__ == '__main__':
+    main()
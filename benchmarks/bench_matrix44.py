@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks batched matrix44 functions against a per-element loop.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import matrix44, quaternion
+from .common import report
+
+N = 10000
+
+
+def main():
+    rng = np.random.RandomState(0)
+    mat = matrix44.multiply(
+        matrix44.create_from_eulers(rng.uniform(-np.pi, np.pi, 3)),
+        matrix44.create_from_translation(rng.uniform(-10., 10., 3))
+    )
+    v = rng.uniform(-1., 1., (N, 3))
+
+    report('apply_to_vector',
+        lambda: [matrix44.apply_to_vector(mat, a) for a in v],
+        lambda: matrix44.apply_to_vector(mat, v))
+    report('apply_to_vector (affine)',
+        lambda: [matrix44.apply_to_vector(mat, a, affine=True) for a in v],
+        lambda: matrix44.apply_to_vector(mat, v, affine=True))
+
+    t = rng.uniform(-10., 10., (N, 3))
+    q = quaternion.normalize(rng.uniform(-1., 1., (N, 4)))
+    s = rng.uniform(0.5, 2., (N, 3))
+    out = np.empty((N, 4, 4))
+
+    report('create_from_trs',
+        lambda: [
+            matrix44.create_from_scale(s[i]).dot(
+                matrix44.create_from_quaternion(q[i])).dot(
+                matrix44.create_from_translation(t[i]))
+            for i in range(N)
+        ],
+        lambda: matrix44.create_from_trs(t, q, s, out=out))
+
+    # closed form inverses against a general inverse
+    trs = matrix44.create_from_trs(t, q, s)
+    rigid = matrix44.create_from_trs(t, q)
+    inv = ('linalg.inv', 'closed form')
+
+    report('inverse_affine (single)',
+        lambda: np.linalg.inv(mat),
+        lambda: matrix44.inverse_affine(mat),
+        number=1000, labels=inv)
+    report('inverse_affine',
+        lambda: np.linalg.inv(trs),
+        lambda: matrix44.inverse_affine(trs, out=out),
+        labels=inv)
+    report('inverse_rigid (single)',
+        lambda: np.linalg.inv(mat),
+        lambda: matrix44.inverse_rigid(mat),
+        number=1000, labels=inv)
+    report('inverse_rigid',
+        lambda: np.linalg.inv(rigid),
+        lambda: matrix44.inverse_rigid(rigid, out=out),
+        labels=inv)
+
+    eye = rng.uniform(-10., 10., (N, 3))
+    target = rng.uniform(-10., 10., (N, 3))
+    up = np.array([0., 1., 0.])
+    report('create_look_at',
+        lambda: [matrix44.create_look_at(a, b, up) for a, b in zip(eye, target)],
+        lambda: matrix44.create_look_at(eye, target, up, out=out))
+
+    report('decompose',
+        lambda: [matrix44.decompose(a) for a in trs],
+        lambda: matrix44.decompose(trs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks loose octree queries against testing every object, and
+incremental moves against rebuilding the octree.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import frustum, geometric_tests, matrix44, octree
+from .common import best_of, report
+
+N = 100000
+
+#: The number of queries used when comparing against testing every object.
+Q = 200
+
+
+def create(ids, aabbs):
+    tree = octree.create([[-100., -100., -100.], [100., 100., 100.]])
+    return octree.insert(tree, ids, aabbs)
+
+
+def main():
+    rng = np.random.RandomState(0)
+    centres = rng.uniform(-100., 100., (N, 3))
+    extents = rng.uniform(.1, 1., (N, 3))
+    aabbs = np.stack([centres - extents, centres + extents], axis=1)
+    ids = np.arange(N)
+
+    print('{:<32} {:>10.3f} ms'.format('create + insert', best_of(lambda: create(ids, aabbs)) * 1e3))
+    tree = create(ids, aabbs)
+
+    centres = rng.uniform(-100., 100., (Q, 3))
+    boxes = np.stack([centres - 5., centres + 5.], axis=1)
+    report('intersect_aabbs 200',
+        lambda: [np.flatnonzero(np.all((b[0] <= aabbs[:, 1]) & (aabbs[:, 0] <= b[1]), axis=-1)) for b in boxes],
+        lambda: octree.intersect_aabbs(tree, boxes),
+        labels=('brute', 'octree'))
+
+    rays = np.stack([rng.uniform(-100., 100., (Q, 3)), rng.normal(size=(Q, 3))], axis=1)
+    report('intersect_rays 200',
+        lambda: geometric_tests.rays_intersect_aabbs(rays, aabbs, all_pairs=True),
+        lambda: octree.intersect_rays(tree, rays),
+        labels=('brute', 'octree'))
+
+    view = matrix44.create_look_at([0., 0., 150.], [0., 0., 0.], [0., 1., 0.])
+    projection = matrix44.create_perspective_projection(30., 1., .1, 100.)
+    f = frustum.create_from_matrix(matrix44.multiply(view, projection))
+    report('intersect_frustum',
+        lambda: frustum.classify_aabbs(f, aabbs),
+        lambda: octree.intersect_frustum(tree, f),
+        labels=('brute', 'octree'))
+
+    # a frame of movement, most objects stay in the same node
+    moved = aabbs + rng.normal(scale=.05, size=(N, 1, 3))
+    report('move',
+        lambda: create(ids, moved),
+        lambda: octree.move(tree, ids, moved),
+        labels=('create', 'move'))
+    report('move + intersect_aabbs 200',
+        lambda: octree.intersect_aabbs(create(ids, moved), boxes),
+        lambda: octree.intersect_aabbs(octree.move(tree, ids, moved), boxes),
+        labels=('create', 'move'))
+
+
+if __name__ == '__main__':
+    main()
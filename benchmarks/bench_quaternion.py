@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks batched quaternion functions against a per-element loop.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import euler, matrix33, quaternion
+from .common import report
+
+N = 10000
+
+
+def main():
+    rng = np.random.RandomState(0)
+    q1 = quaternion.normalize(rng.uniform(-1., 1., (N, 4)))
+    q2 = quaternion.normalize(rng.uniform(-1., 1., (N, 4)))
+
+    report('cross',
+        lambda: [quaternion.cross(a, b) for a, b in zip(q1, q2)],
+        lambda: quaternion.cross(q1, q2))
+    report('conjugate',
+        lambda: [quaternion.conjugate(a) for a in q1],
+        lambda: quaternion.conjugate(q1))
+    report('inverse',
+        lambda: [quaternion.inverse(a) for a in q1],
+        lambda: quaternion.inverse(q1))
+    report('rotation_angle',
+        lambda: [quaternion.rotation_angle(a) for a in q1],
+        lambda: quaternion.rotation_angle(q1))
+    report('rotation_axis',
+        lambda: [quaternion.rotation_axis(a) for a in q1],
+        lambda: quaternion.rotation_axis(q1))
+    report('exp',
+        lambda: [quaternion.exp(a) for a in q1],
+        lambda: quaternion.exp(q1))
+    report('power',
+        lambda: [quaternion.power(a, 2.) for a in q1],
+        lambda: quaternion.power(q1, 2.))
+    t = rng.uniform(0., 1., N)
+    report('slerp',
+        lambda: [quaternion.slerp(a, b, c) for a, b, c in zip(q1, q2, t)],
+        lambda: quaternion.slerp(q1, q2, t))
+    report('nlerp',
+        lambda: [quaternion.nlerp(a, b, c) for a, b, c in zip(q1, q2, t)],
+        lambda: quaternion.nlerp(q1, q2, t))
+    v = rng.uniform(-1., 1., (N, 3))
+    out = np.empty_like(v)
+    report('apply_to_vector (one quat)',
+        lambda: [quaternion.apply_to_vector(q1[0], a) for a in v],
+        lambda: quaternion.apply_to_vector(q1[0], v, out=out))
+    report('apply_to_vector (N quats)',
+        lambda: [quaternion.apply_to_vector(a, b) for a, b in zip(q1, v)],
+        lambda: quaternion.apply_to_vector(q1, v, out=out))
+    report('is_zero_length',
+        lambda: [quaternion.is_zero_length(a) for a in q1],
+        lambda: quaternion.is_zero_length(q1))
+    m = matrix33.create_from_quaternion(q1)
+    report('create_from_matrix',
+        lambda: [quaternion.create_from_matrix(a) for a in m],
+        lambda: quaternion.create_from_matrix(m))
+    e = rng.uniform(-np.pi, np.pi, (N, 3))
+    report('create_from_eulers',
+        lambda: [quaternion.create_from_eulers(a) for a in e],
+        lambda: quaternion.create_from_eulers(e))
+    axis = rng.uniform(-1., 1., (N, 3))
+    theta = rng.uniform(-np.pi, np.pi, N)
+    report('create_from_axis_rotation',
+        lambda: [quaternion.create_from_axis_rotation(a, b) for a, b in zip(axis, theta)],
+        lambda: quaternion.create_from_axis_rotation(axis, theta))
+    report('create_from_axis',
+        lambda: [quaternion.create_from_axis(a) for a in axis],
+        lambda: quaternion.create_from_axis(axis))
+    report('euler.create_from_quaternion',
+        lambda: [euler.create_from_quaternion(a) for a in q1],
+        lambda: euler.create_from_quaternion(q1))
+
+
+if __name__ == '__main__':
+    main()
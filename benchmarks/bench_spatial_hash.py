@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks spatial hash grid queries against testing every point.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import spatial_hash
+from .common import best_of, report
+
+N = 200000
+
+#: The number of query points used when comparing against testing every point.
+BRUTE_Q = 200
+
+
+def main():
+    rng = np.random.RandomState(0)
+    # around 1.6 points per unit cube
+    points = rng.uniform(0., 50., (N, 3))
+
+    print('{:<32} {:>10.3f} ms'.format(
+        'create_from_points', best_of(lambda: spatial_hash.create_from_points(points, 1.)) * 1e3
+    ))
+    grid = spatial_hash.create_from_points(points, 1.)
+
+    queries = points[:BRUTE_Q]
+    report('query_radius 200',
+        lambda: [np.flatnonzero(np.sum((points - q) ** 2, axis=-1) <= 1.) for q in queries],
+        lambda: spatial_hash.query_radius(grid, queries, 1.),
+        labels=('brute', 'grid'))
+    report('query_nearest 200, k=8',
+        lambda: [np.argpartition(np.sum((points - q) ** 2, axis=-1), 8)[:8] for q in queries],
+        lambda: spatial_hash.query_nearest(grid, queries, 8),
+        labels=('brute', 'grid'))
+
+    print('{:<32} {:>10.3f} ms'.format(
+        'query_radius 200k', best_of(lambda: spatial_hash.query_radius(grid, points, 1.)) * 1e3
+    ))
+    print('{:<32} {:>10.3f} ms'.format(
+        'query_nearest 200k, k=8', best_of(lambda: spatial_hash.query_nearest(grid, points, 8), repeat=1) * 1e3
+    ))
+    print('{:<32} {:>10.3f} ms'.format(
+        'query_pairs 200k', best_of(lambda: spatial_hash.query_pairs(grid, 1.)) * 1e3
+    ))
+
+
+if __name__ == '__main__':
+    main()
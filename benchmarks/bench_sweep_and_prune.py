@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks the sweep and prune broadphase against testing every pair,
+and incremental updates against sorting from scratch.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import sweep_and_prune
+from .common import best_of, report
+
+N = 50000
+
+#: The number of AABBs used when comparing against testing every pair.
+BRUTE_N = 5000
+
+
+def main():
+    rng = np.random.RandomState(0)
+    centres = rng.uniform(-100., 100., (N, 3))
+    extents = rng.uniform(.1, 1., (N, 3))
+    aabbs = np.stack([centres - extents, centres + extents], axis=1)
+
+    # testing every pair is too slow with all of the AABBs
+    subset = aabbs[:BRUTE_N]
+
+    def brute_force():
+        # a row of pairs at a time, a full N x N test would not fit in memory
+        return [np.flatnonzero(np.all((a[0] <= subset[i + 1:, 1]) & (subset[i + 1:, 0] <= a[1]), axis=-1)) for i, a in enumerate(subset)]
+
+    report('find_overlapping_pairs 5k',
+        brute_force,
+        lambda: sweep_and_prune.find_overlapping_pairs(subset),
+        labels=('brute', 'sap'))
+    print('{:<32} {:>10.3f} ms'.format(
+        'find_overlapping_pairs 50k',
+        best_of(lambda: sweep_and_prune.find_overlapping_pairs(aabbs)) * 1e3
+    ))
+
+    # a frame of movement
+    sap = sweep_and_prune.create_from_aabbs(aabbs)
+    moved = aabbs + rng.normal(scale=.05, size=(N, 1, 3))
+    report('update',
+        lambda: sweep_and_prune.create_from_aabbs(moved, axis=sap.axis),
+        lambda: sweep_and_prune.update(sap, moved),
+        labels=('create', 'update'))
+    report('update + overlapping_pairs',
+        lambda: sweep_and_prune.find_overlapping_pairs(moved, axis=sap.axis),
+        lambda: sweep_and_prune.overlapping_pairs(sweep_and_prune.update(sap, moved)),
+        labels=('create', 'update'))
+
+
+if __name__ == '__main__':
+    main()
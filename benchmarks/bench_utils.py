@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks the per-call overhead of the argument conversion decorators.
+
+Each decorated function is timed with list arguments, with ndarray
+arguments, with ndarray arguments inside pyrr.fast_path, and undecorated
+(via __wrapped__) with ndarray arguments.
+The overhead is the difference between the decorated and undecorated
+ndarray calls and should stay within OVERHEAD_BUDGET.
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from pyrr import fast_path, matrix44, plane, quaternion, ray
+from .common import best_of
+
+NUMBER = 10000
+
+#: The maximum acceptable overhead of the decorator per call, in microseconds.
+OVERHEAD_BUDGET = 2.0
+
+
+def bench(name, fn, args):
+    arrays = [np.asarray(a) for a in args]
+
+    listed = best_of(lambda: fn(*args), NUMBER, repeat=7) * 1e6
+    decorated = best_of(lambda: fn(*arrays), NUMBER, repeat=7) * 1e6
+    raw = best_of(lambda: fn.__wrapped__(*arrays), NUMBER, repeat=7) * 1e6
+    with fast_path():
+        fast = best_of(lambda: fn(*arrays), NUMBER, repeat=7) * 1e6
+    overhead = decorated - raw
+
+    print('{:<36} list {:>7.2f} us  array {:>7.2f} us  fast {:>7.2f} us  raw {:>7.2f} us  overhead {:>5.2f} us {}'.format(
+        name, listed, decorated, fast, raw, overhead,
+        '' if overhead <= OVERHEAD_BUDGET else '(over budget)'
+    ))
+
+
+def main():
+    q = [0., 0., 0., 1.]
+    v = [1., 2., 3.]
+    bench('matrix44.create_from_quaternion', matrix44.create_from_quaternion, [q])
+    bench('matrix44.create_from_translation', matrix44.create_from_translation, [v])
+    bench('matrix44.apply_to_vector', matrix44.apply_to_vector, [np.identity(4).tolist(), v])
+    bench('quaternion.cross', quaternion.cross, [q, q])
+    bench('quaternion.conjugate', quaternion.conjugate, [q])
+    bench('quaternion.exp', quaternion.exp, [q])
+    bench('ray.create', ray.create, [v, [0., 0., 1.]])
+    bench('ray.invert', ray.invert, [[v, [0., 0., 1.]]])
+    bench('plane.create_from_position', plane.create_from_position, [v, [0., 0., 1.]])
+    bench('plane.create_from_points', plane.create_from_points, [[0., 0., 0.], [1., 0., 0.], [0., 1., 0.]])
+
+
+if __name__ == '__main__':
+    main()
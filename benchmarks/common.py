@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks are run from the repository root, ie::
+
+    python -m benchmarks.bench_quaternion
+"""
+from __future__ import absolute_import, division, print_function
+import timeit
+
+
+def best_of(fn, number=1, repeat=3):
+    """Returns the fastest time, in seconds, of a single call to fn.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def report(name, loop_fn, batch_fn, number=1, repeat=3, labels=('loop', 'batch')):
+    """Times a per-element loop against the batched equivalent
+    and prints the speedup.
+
+    labels can be used to name the two timings when comparing
+    something other than a loop and a batch.
+    """
+    loop = best_of(loop_fn, number, repeat)
+    batch = best_of(batch_fn, number, repeat)
+    print('{:<32} {} {:>10.3f} ms  {} {:>10.3f} ms  x{:>8.1f}'.format(
+        name, labels[0], loop * 1e3, labels[1], batch * 1e3, loop / batch
+    ))
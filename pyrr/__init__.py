@@ -8,18 +8,24 @@ from .version import __version__
 __all__ = [
     'aabb',
     'aambb',
+    'bvh',
     'euler',
+    'frustum',
     'geometric_tests',
     'geometry',
     'integer',
+    'kdtree',
     'line',
     'matrix33',
     'matrix44',
+    'octree',
     'plane',
     'quaternion',
     'ray',
     'rectangle',
+    'spatial_hash',
     'sphere',
+    'sweep_and_prune',
     'trig',
     'utils',
     'vector',
@@ -30,23 +36,30 @@ __all__ = [
     'Quaternion',
     'Vector3',
     'Vector4',
+    'fast_path',
 ]
 
 from . import (
     aabb,
     aambb,
+    bvh,
     euler,
+    frustum,
     geometric_tests,
     geometry,
     integer,
+    kdtree,
     line,
     matrix33,
     matrix44,
+    octree,
     plane,
     quaternion,
     ray,
     rectangle,
+    spatial_hash,
     sphere,
+    sweep_and_prune,
     trig,
     utils,
     vector,
@@ -54,6 +67,8 @@ from . import (
     vector4,
 )
 
+from .utils import fast_path
+
 from .objects import (
     Matrix33,
     Matrix44,
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for building and querying a Bounding Volume Hierarchy
+(BVH) over an array of AABBs.
+
+A BVH is a binary tree of AABBs where each node encompasses its children.
+Queries only descend into nodes that they intersect, which avoids testing
+every AABB.
+
+The BVH is stored as a set of flat numpy arrays in a namedtuple (see BVH).
+Nodes are stored breadth first, node 0 being the root.
+The tree is built and queried a level at a time, so the work for all the
+nodes on a level, or all the queries in a batch, is done with numpy array
+operations rather than per node or per query Python code.
+
+AABBs are in the format used by the aabb module, ie. an array of AABBs
+has the shape (N,2,3). Rays are in the format used by the ray module.
+
+.. seealso: http://www.pbr-book.org/3ed-2018/Primitives_and_Intersection_Acceleration/Bounding_Volume_Hierarchies.html
+"""
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import numpy as np
+from .utils import _segments
+from . import geometric_tests
+
+
+class BVH(namedtuple('BVH', ['aabbs', 'bounds', 'children', 'start', 'count', 'indices', 'levels'])):
+    """The arrays that make up a BVH.
+
+    :ivar numpy.array aabbs: The (N,2,3) AABBs the BVH was built from.
+    :ivar numpy.array bounds: The (M,2,3) AABB of each node.
+    :ivar numpy.array children: The (M,2) indices of each node's children.
+        Leaf nodes have children of -1.
+    :ivar numpy.array start: The (M,) offset of each node's first AABB
+        within indices.
+    :ivar numpy.array count: The (M,) number of AABBs within each node.
+    :ivar numpy.array indices: The (N,) AABB indices, ordered so that each
+        node's AABBs are contiguous.
+    :ivar numpy.array levels: The offset of the first node of each level
+        of the tree, followed by the total number of nodes.
+    """
+    __slots__ = ()
+
+
+def _area(minimum, maximum):
+    """Returns the surface area of AABBs given their extents.
+    """
+    d = maximum - minimum
+    return 2. * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
+
+def _split(aabbs, centroids, indices, start, count, method, bins):
+    """Splits a set of nodes in two.
+
+    The AABBs of each node are sorted along the longest axis of their
+    centroids' bounds. indices is reordered in place.
+
+    :rtype: numpy.array
+    :return: The number of AABBs in the left child of each node.
+    """
+    n = len(start)
+    segment, offset, position = _segments(start, count)
+    primitives = indices[position]
+    centre = centroids[primitives]
+
+    # sort each node along the longest axis of its centroids
+    cmin = np.minimum.reduceat(centre, offset)
+    cmax = np.maximum.reduceat(centre, offset)
+    axis = np.argmax(cmax - cmin, axis=-1)
+    key = centre[np.arange(len(centre)), axis[segment]]
+    order = np.lexsort((key, segment))
+    primitives = primitives[order]
+    key = key[order]
+    indices[position] = primitives
+
+    median = count // 2
+    if method == 'median':
+        return median
+
+    # binned surface area heuristic
+    # the AABBs are sorted within each node, so the AABBs in each bin
+    # are contiguous
+    lo = cmin[np.arange(n), axis]
+    extent = cmax[np.arange(n), axis] - lo
+    scale = bins / np.where(extent > 0., extent, 1.)
+    b = np.clip(((key - lo[segment]) * scale[segment]).astype(int), 0, bins - 1)
+    group = segment * bins + b
+    group_start = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+    boxes = aabbs[primitives]
+    bin_min = np.full((n * bins, 3), np.inf)
+    bin_max = np.full((n * bins, 3), -np.inf)
+    bin_min[group[group_start]] = np.minimum.reduceat(boxes[:, 0], group_start)
+    bin_max[group[group_start]] = np.maximum.reduceat(boxes[:, 1], group_start)
+    bin_min = bin_min.reshape((n, bins, 3))
+    bin_max = bin_max.reshape((n, bins, 3))
+    bin_count = np.bincount(group, minlength=n * bins).reshape((n, bins))
+
+    # cost of splitting after each bin
+    left_count = np.cumsum(bin_count, axis=-1)[:, :-1]
+    right_count = count[:, np.newaxis] - left_count
+    left_area = _area(
+        np.minimum.accumulate(bin_min, axis=1)[:, :-1],
+        np.maximum.accumulate(bin_max, axis=1)[:, :-1],
+    )
+    right_area = _area(
+        np.minimum.accumulate(bin_min[:, ::-1], axis=1)[:, ::-1][:, 1:],
+        np.maximum.accumulate(bin_max[:, ::-1], axis=1)[:, ::-1][:, 1:],
+    )
+    valid = (left_count > 0) & (right_count > 0)
+    cost = np.where(valid, left_area, 0.) * left_count + np.where(valid, right_area, 0.) * right_count
+    cost[~valid] = np.inf
+
+    best = np.argmin(cost, axis=-1)
+    left = left_count[np.arange(n), best]
+
+    # nodes whose centroids all fall in one bin use the median
+    return np.where(np.isfinite(cost[np.arange(n), best]), left, median)
+
+def create_from_aabbs(aabbs, leaf_size=4, method='sah', bins=16, dtype=None):
+    """Builds a BVH from an array of AABBs.
+
+    :param numpy.array aabbs: The (N,2,3) AABBs to build the BVH from.
+        The AABBs are copied.
+    :param int leaf_size: The maximum number of AABBs in a leaf node.
+    :param str method: The method used to split nodes, either 'sah'
+        (binned surface area heuristic) or 'median'.
+        SAH produces faster queries, median builds faster.
+    :param int bins: The number of bins used by the surface area heuristic.
+    :rtype: BVH
+    :return: The BVH.
+    """
+    if method not in ('sah', 'median'):
+        raise ValueError('Unknown split method {}'.format(method))
+    if leaf_size < 1:
+        raise ValueError('leaf_size must be at least 1')
+
+    aabbs = np.array(aabbs, dtype=dtype)
+    n = len(aabbs)
+    centroids = (aabbs[:, 0] + aabbs[:, 1]) * 0.5
+    indices = np.arange(n)
+
+    start = np.zeros(1, dtype=int)
+    count = np.array([n])
+    starts, counts, children, levels = [], [], [], [0]
+    while len(start):
+        starts.append(start)
+        counts.append(count)
+        levels.append(levels[-1] + len(start))
+
+        split = count > leaf_size
+        child = np.full((len(start), 2), -1)
+        children.append(child)
+        if not np.any(split):
+            break
+
+        split_start, split_count = start[split], count[split]
+        left = _split(aabbs, centroids, indices, split_start, split_count, method, bins)
+
+        first = levels[-1] + 2 * np.arange(len(split_start))
+        child[split, 0] = first
+        child[split, 1] = first + 1
+
+        start = np.empty(2 * len(split_start), dtype=int)
+        count = np.empty(2 * len(split_start), dtype=int)
+        start[0::2] = split_start
+        start[1::2] = split_start + left
+        count[0::2] = left
+        count[1::2] = split_count - left
+
+    m = levels[-1]
+    bvh = BVH(
+        aabbs=aabbs,
+        bounds=np.empty((m, 2, 3), dtype=np.result_type(aabbs, float)),
+        children=np.concatenate(children),
+        start=np.concatenate(starts),
+        count=np.concatenate(counts),
+        indices=indices,
+        levels=np.array(levels),
+    )
+    return refit(bvh)
+
+def refit(bvh, aabbs=None):
+    """Updates the bounds of the BVH's nodes after the AABBs have moved.
+
+    The structure of the tree is not changed, so the BVH will become less
+    efficient if the AABBs move a large distance relative to one another.
+    In that case, the BVH should be rebuilt.
+
+    :param BVH bvh: The BVH to update, this is modified in place.
+    :param numpy.array aabbs: The new (N,2,3) AABBs. The AABBs must be in
+        the same order as those the BVH was built from.
+        If None, the BVH's aabbs array is assumed to have been modified
+        in place.
+    :rtype: BVH
+    :return: The BVH.
+    """
+    if aabbs is not None:
+        bvh.aabbs[...] = aabbs
+
+    bounds = bvh.bounds
+    bounds[:, 0] = np.inf
+    bounds[:, 1] = -np.inf
+
+    # leaves are the union of their AABBs
+    leaves = np.flatnonzero((bvh.children[:, 0] < 0) & (bvh.count > 0))
+    leaves = leaves[np.argsort(bvh.start[leaves])]
+    if len(leaves):
+        boxes = bvh.aabbs[bvh.indices]
+        bounds[leaves, 0] = np.minimum.reduceat(boxes[:, 0], bvh.start[leaves])
+        bounds[leaves, 1] = np.maximum.reduceat(boxes[:, 1], bvh.start[leaves])
+
+    # nodes are the union of their children, working up from the bottom level
+    for first, last in reversed(list(zip(bvh.levels[:-1], bvh.levels[1:]))):
+        nodes = np.arange(first, last)
+        nodes = nodes[bvh.children[nodes, 0] >= 0]
+        left, right = bvh.children[nodes, 0], bvh.children[nodes, 1]
+        bounds[nodes, 0] = np.minimum(bounds[left, 0], bounds[right, 0])
+        bounds[nodes, 1] = np.maximum(bounds[left, 1], bounds[right, 1])
+    return bvh
+
+def _traverse(bvh, n, test):
+    """Finds the AABBs which pass the test for each query.
+
+    :param int n: The number of queries.
+    :param function test: A function which takes an array of query indices
+        and an array of AABBs and returns a mask of those that pass.
+    :rtype: tuple
+    :return: The query indices and AABB indices of each pair that passes.
+    """
+    if n == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    query = np.arange(n)
+    node = np.zeros(n, dtype=int)
+    found_query, found_aabb = [], []
+    while len(query):
+        hit = test(query, bvh.bounds[node])
+        query, node = query[hit], node[hit]
+
+        # the AABBs within leaves become candidates
+        leaf = bvh.children[node, 0] < 0
+        leaf_query, leaf_node = query[leaf], node[leaf]
+        count = bvh.count[leaf_node]
+        segment, offset, position = _segments(bvh.start[leaf_node], count)
+        found_query.append(leaf_query[segment])
+        found_aabb.append(bvh.indices[position])
+
+        # queries descend into both children of other nodes
+        query = np.repeat(query[~leaf], 2)
+        node = bvh.children[node[~leaf]].ravel()
+
+    query = np.concatenate(found_query)
+    aabb = np.concatenate(found_aabb)
+    hit = test(query, bvh.aabbs[aabb])
+    return query[hit], aabb[hit]
+
+def intersect_rays(bvh, rays):
+    """Finds the AABBs hit by each ray.
+
+    :param BVH bvh: The BVH to query.
+    :param numpy.array rays: The (R,2,3) rays.
+    :rtype: tuple
+    :return: A tuple of (ray index, AABB index, t) arrays, with one entry
+        per hit. t is the distance along the ray to the AABB, or 0 if the
+        ray starts inside the AABB. Hits are sorted by ray and then by t.
+    """
+    rays = np.asarray(rays)
+
+    def test(query, aabbs):
+        return geometric_tests.rays_intersect_aabbs(rays[query], aabbs)[0]
+
+    ray, aabb = _traverse(bvh, len(rays), test)
+    t = np.maximum(geometric_tests.rays_intersect_aabbs(rays[ray], bvh.aabbs[aabb])[1], 0.)
+    order = np.lexsort((t, ray))
+    return ray[order], aabb[order], t[order]
+
+def intersect_rays_closest(bvh, rays):
+    """Finds the closest AABB hit by each ray.
+
+    :param BVH bvh: The BVH to query.
+    :param numpy.array rays: The (R,2,3) rays.
+    :rtype: tuple
+    :return: A tuple of (AABB index, t) arrays of shape (R,).
+        Rays which miss have an AABB index of -1 and a t of inf.
+    """
+    rays = np.asarray(rays)
+    ray, aabb, t = intersect_rays(bvh, rays)
+    first = np.ones(len(ray), dtype=bool)
+    first[1:] = ray[1:] != ray[:-1]
+
+    closest = np.full(len(rays), -1)
+    distance = np.full(len(rays), np.inf)
+    closest[ray[first]] = aabb[first]
+    distance[ray[first]] = t[first]
+    return closest, distance
+
+def intersect_points(bvh, points):
+    """Finds the AABBs which contain each point.
+
+    :param BVH bvh: The BVH to query.
+    :param numpy.array points: The (P,3) points.
+    :rtype: tuple
+    :return: A tuple of (point index, AABB index) arrays, with one entry
+        per point that is inside an AABB. Sorted by point.
+    """
+    points = np.asarray(points)
+
+    def test(query, aabbs):
+        p = points[query]
+        return np.all((aabbs[:, 0] <= p) & (p <= aabbs[:, 1]), axis=-1)
+
+    point, aabb = _traverse(bvh, len(points), test)
+    order = np.lexsort((aabb, point))
+    return point[order], aabb[order]
+
+def intersect_aabbs(bvh, aabbs):
+    """Finds the AABBs in the BVH which overlap each query AABB.
+
+    :param BVH bvh: The BVH to query.
+    :param numpy.array aabbs: The (B,2,3) AABBs to query with.
+    :rtype: tuple
+    :return: A tuple of (query index, AABB index) arrays, with one entry
+        per overlapping pair. Sorted by query.
+    """
+    aabbs = np.asarray(aabbs)
+
+    def test(query, other):
+        q = aabbs[query]
+        return np.all((q[:, 0] <= other[:, 1]) & (other[:, 0] <= q[:, 1]), axis=-1)
+
+    query, aabb = _traverse(bvh, len(aabbs), test)
+    order = np.lexsort((aabb, query))
+    return query[order], aabb[order]
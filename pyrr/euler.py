@@ -4,6 +4,7 @@
 Eulers represent 3 rotations: Pitch, Roll and Yaw.
 
 Eulers are represented using a numpy.array of shape (3,).
+Arrays of eulers have the shape (..., 3).
 """
 from __future__ import absolute_import, division, print_function
 import numpy as np
@@ -26,46 +27,128 @@ def create(roll=0., pitch=0., yaw=0., dtype=None):
     """Creates an array storing the specified euler angles.
 
     Input values are in radians.
+    If the values are arrays, an array of eulers with shape (..., 3)
+    is created.
 
     :param float pitch: The pitch in radians.
     :param float roll: The roll in radians.
     :param float yaw: The yaw in radians.
     :rtype: numpy.array
     """
-    return np.array((roll, pitch, yaw), dtype=dtype)
+    shape = np.broadcast(roll, pitch, yaw).shape
+    if not shape:
+        return np.array((roll, pitch, yaw), dtype=dtype)
+
+    eulers = np.stack(np.broadcast_arrays(roll, pitch, yaw), axis=-1)
+    return eulers if dtype is None else eulers.astype(dtype)
+
+
+def _create_from_rotation(i, theta, dtype):
+    theta = np.asarray(theta)
+    eulers = np.zeros(theta.shape + (3,), dtype=dtype or theta.dtype)
+    eulers[..., i] = theta
+    return eulers
 
 
 def create_from_x_rotation(theta, dtype=None):
-    return np.array([theta, 0., 0.], dtype=dtype)
+    return _create_from_rotation(index.roll, theta, dtype)
 
 
 def create_from_y_rotation(theta, dtype=None):
-    return np.array([0., theta, 0.], dtype=dtype)
+    return _create_from_rotation(index.pitch, theta, dtype)
 
 
 def create_from_z_rotation(theta, dtype=None):
-    return np.array([0., 0., theta], dtype=dtype)
+    return _create_from_rotation(index.yaw, theta, dtype)
+
+
+def create_from_matrix(mat, dtype=None):
+    """Extracts the euler angles from a rotation matrix.
+
+    This is the inverse of matrix33.create_from_eulers.
+    The matrix can be a matrix33 or matrix44 and may be an array
+    of matrices, ie. (N,3,3) will produce (N,3) eulers.
+
+    When the pitch is +/- 90 degrees (gimbal lock), the roll is
+    set to 0 and the rotation is expressed by the yaw.
+
+    :param numpy.array mat: The rotation matrix.
+    :rtype: numpy.array
+    :return: The eulers with shape (..., 3).
+    """
+    mat = np.asarray(mat)
+    dtype = dtype or mat.dtype
+
+    # matrix33.create_from_eulers stores sin(pitch) in [1,0]
+    sP = np.clip(mat[..., 1, 0], -1., 1.)
+    gimbal = np.abs(sP) > 1. - 1e-6
+
+    eulers = np.empty(mat.shape[:-2] + (3,), dtype=dtype)
+    eulers[..., index.roll] = np.where(gimbal, 0., np.arctan2(-mat[..., 1, 2], mat[..., 1, 1]))
+    eulers[..., index.pitch] = np.arcsin(sP)
+    eulers[..., index.yaw] = np.where(
+        gimbal,
+        np.arctan2(mat[..., 0, 2], mat[..., 2, 2]),
+        np.arctan2(-mat[..., 2, 0], mat[..., 0, 0])
+    )
+    return eulers
+
+
+def create_from_quaternion(quat, dtype=None):
+    """Extracts the euler angles from a quaternion.
+
+    This is the inverse of quaternion.create_from_eulers.
+    The quaternion may be an array of quaternions, ie. (N,4) will
+    produce (N,3) eulers. Quaternions are expected to be unit length.
+
+    When the pitch is +/- 90 degrees (gimbal lock), the roll is
+    set to 0 and the rotation is expressed by the yaw.
+
+    :param numpy.array quat: The quaternion.
+    :rtype: numpy.array
+    :return: The eulers with shape (..., 3).
+    """
+    quat = np.asarray(quat)
+    dtype = dtype or quat.dtype
+    x, y, z, w = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+
+    # quaternion.create_from_eulers is roll (x) * pitch (y) * yaw (z)
+    sP = np.clip(2. * (x * z + y * w), -1., 1.)
+    gimbal = np.abs(sP) > 1. - 1e-6
+
+    eulers = np.empty(quat.shape[:-1] + (3,), dtype=dtype)
+    eulers[..., index.roll] = np.where(
+        gimbal, 0.,
+        np.arctan2(2. * (x * w - y * z), 1. - 2. * (x * x + y * y))
+    )
+    eulers[..., index.pitch] = np.arcsin(sP)
+    eulers[..., index.yaw] = np.where(
+        gimbal,
+        np.arctan2(2. * (x * y + z * w), 1. - 2. * (x * x + z * z)),
+        np.arctan2(2. * (z * w - x * y), 1. - 2. * (y * y + z * z))
+    )
+    return eulers
 
 
 def roll(eulers):
     """Extracts the roll value from the euler.
 
-    :rtype: float.
+    :rtype: float, or an array for arrays of eulers.
     """
-    return eulers[0]
+    return np.asarray(eulers)[..., index.roll]
 
 
 def yaw(eulers):
     """Extracts the yaw value from the euler.
 
-    :rtype: float.
+    :rtype: float, or an array for arrays of eulers.
     """
-    return eulers[2]
+    return np.asarray(eulers)[..., index.yaw]
 
 
 def pitch(eulers):
     """Extracts the pitch value from the euler.
 
-    :rtype: float.
+    :rtype: float, or an array for arrays of eulers.
     """
-    return eulers[1]
+    return np.asarray(eulers)[..., index.pitch]
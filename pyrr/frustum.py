@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for the creation of view frustums and for culling
+bounding volumes against them.
+
+A frustum is represented using a numpy.array of shape (6,4).
+Each row is a plane in the format used by the plane module, in the
+order left, right, bottom, top, near, far.
+
+The plane normals point into the frustum, so a point is inside the frustum
+when it is in front of all 6 planes.
+
+.. seealso: http://www.cs.otago.ac.nz/postgrads/alexis/planeExtraction.pdf
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from .utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays
+
+
+class index:
+    #: The index of the left plane within the frustum
+    left = 0
+
+    #: The index of the right plane within the frustum
+    right = 1
+
+    #: The index of the bottom plane within the frustum
+    bottom = 2
+
+    #: The index of the top plane within the frustum
+    top = 3
+
+    #: The index of the near plane within the frustum
+    near = 4
+
+    #: The index of the far plane within the frustum
+    far = 5
+
+
+@parameters_as_numpy_arrays('mat')
+def create_from_matrix(mat, dtype=None, reverse_z=False):
+    """Extracts the frustum planes from a projection matrix.
+
+    If the matrix is a projection matrix, the planes are in view space.
+    If the matrix is a view matrix multiplied by a projection matrix
+    (view . projection), the planes are in world space.
+
+    Supports arrays of matrices, ie. an (N,4,4) array will produce
+    an (N,6,4) array of frustums.
+
+    Infinite far planes produce a far plane with a zero normal and a
+    distance of -inf, which every point is in front of.
+
+    :param numpy.array mat: The projection or view projection matrix.
+    :param numpy.dtype dtype: The dtype of the planes, the matrix's dtype
+        by default.
+    :param boolean reverse_z: Set to True if the matrix was created with
+        reverse_z, ie. depth is in the range [1,0] rather than [-1,1].
+    :rtype: numpy.array
+    :return: The frustum planes with shape (6,4).
+    """
+    # integer matrices are promoted so the planes can be normalized
+    mat = np.asarray(mat, dtype=np.result_type(mat, float))
+    dtype = dtype or mat.dtype
+
+    # row vectors are multiplied by the matrix, so each clip space
+    # coordinate is the dot product of the point with a column
+    x, y, z, w = mat[..., 0], mat[..., 1], mat[..., 2], mat[..., 3]
+    if reverse_z:
+        near, far = w - z, z
+    else:
+        near, far = w + z, w - z
+
+    # planes are in the form ax + by + cz + d >= 0
+    # which is the plane format with the distance negated
+    planes = np.stack([w + x, w - x, w + y, w - y, near, far], axis=-2)
+    planes[..., 3] *= -1.
+
+    # normalize the planes
+    # a zero length normal only occurs for an infinite far plane, its
+    # distance is set to -inf so everything is in front of it
+    length = np.sqrt(np.sum(planes[..., 0:3] ** 2, axis=-1))
+    infinite = length == 0.
+    planes /= np.where(infinite, 1., length)[..., np.newaxis]
+    planes[..., 3] = np.where(infinite, -np.inf, planes[..., 3])
+    return planes.astype(dtype, copy=False)
+
+def _classify(frustum, centres, radius):
+    """Classifies bounding volumes against the frustum.
+
+    The radius may be per volume, or per volume and plane.
+    """
+    # height of each centre above each plane, shape (N,6)
+    height = np.dot(centres, frustum[:, 0:3].T) - frustum[:, 3]
+
+    outside = np.any(height < -radius, axis=-1)
+    inside = np.all(height >= radius, axis=-1)
+    intersecting = ~(inside | outside)
+    return inside, outside, intersecting
+
+@all_parameters_as_numpy_arrays
+def classify_spheres(frustum, spheres):
+    """Classifies spheres as inside, outside or intersecting the frustum.
+
+    Spheres are in the format used by the sphere module.
+
+    :param numpy.array frustum: The frustum with shape (6,4).
+    :param numpy.array spheres: An array of spheres with shape (N,4).
+    :rtype: tuple
+    :return: A tuple of (inside, outside, intersecting) boolean arrays
+        with shape (N,).
+    """
+    return _classify(frustum, spheres[..., 0:3], spheres[..., 3:4])
+
+@all_parameters_as_numpy_arrays
+def classify_aabbs(frustum, aabbs):
+    """Classifies AABBs as inside, outside or intersecting the frustum.
+
+    AABBs are in the format used by the aabb module.
+
+    A box which is outside the frustum, but not entirely behind any
+    single plane, is reported as intersecting. This is the usual
+    conservative result for plane based culling.
+
+    :param numpy.array frustum: The frustum with shape (6,4).
+    :param numpy.array aabbs: An array of AABBs with shape (N,2,3).
+    :rtype: tuple
+    :return: A tuple of (inside, outside, intersecting) boolean arrays
+        with shape (N,).
+    """
+    centres = (aabbs[..., 0, :] + aabbs[..., 1, :]) * 0.5
+    extents = (aabbs[..., 1, :] - aabbs[..., 0, :]) * 0.5
+
+    # the projection of the box's extents onto each plane normal
+    radius = np.dot(extents, np.abs(frustum[:, 0:3]).T)
+    return _classify(frustum, centres, radius)
@@ -6,7 +6,7 @@ from __future__ import absolute_import, division, print_function
 import math
 import numpy as np
 from . import rectangle, vector, vector3, plane
-from .utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays, solve_quadratic_equation
+from .utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays, solve_quadratic_equation, solve_quadratic_equations
 
 """
 TODO: line_intersect_plane
@@ -306,6 +306,64 @@ def ray_intersect_aabb(ray, aabb):
     point = ray[0] + (ray[1] * t)
     return point
 
+@all_parameters_as_numpy_arrays
+def rays_intersect_aabbs(rays, aabbs, all_pairs=False):
+    """Calculates the intersection of arrays of rays and AABBs using
+    the slab test.
+
+    By default the rays and AABBs are paired, ie. ray i is tested against
+    AABB i, with the usual numpy broadcasting rules.
+    If all_pairs is True, every ray is tested against every AABB.
+
+    The entry and exit distances are the distances along the ray to
+    where the line of the ray enters and leaves the AABB. The entry
+    distance is negative when the ray starts inside the AABB.
+
+    Zero direction components are handled without producing NaNs, a ray
+    which is parallel to a slab hits it if its origin is within, or on
+    the boundary of, the slab.
+
+    :param numpy.array rays: The rays with shape (R,2,3).
+    :param numpy.array aabbs: The AABBs with shape (B,2,3).
+    :param boolean all_pairs: If True, test every ray against every AABB.
+    :rtype: tuple
+    :return: A tuple of (hit, tmin, tmax) arrays, with shape (R,)
+        or (R,B) when all_pairs is True. tmin and tmax are only
+        meaningful where hit is True.
+    """
+    origin, direction = rays[..., 0, :], rays[..., 1, :]
+
+    # the reciprocal is calculated once per ray
+    parallel = direction == 0.
+    inverse = 1. / np.where(parallel, 1., direction)
+    if all_pairs:
+        origin = origin[..., np.newaxis, :]
+        parallel = parallel[..., np.newaxis, :]
+        inverse = inverse[..., np.newaxis, :]
+
+    # integer rays and AABBs are subtracted as floats so the distances
+    # can be scaled in place
+    lower, upper = aabbs[..., 0, :], aabbs[..., 1, :]
+    dtype = np.result_type(lower, origin, inverse)
+    t1 = np.subtract(lower, origin, dtype=dtype)
+    t1 *= inverse
+    t2 = np.subtract(upper, origin, dtype=dtype)
+    t2 *= inverse
+    tnear = np.minimum(t1, t2)
+    tfar = np.maximum(t1, t2, out=t1)
+
+    # rays parallel to a slab either cover all of it or miss it entirely
+    if np.any(parallel):
+        inside = (origin >= lower) & (origin <= upper)
+        tnear = np.where(parallel, np.where(inside, -np.inf, np.inf), tnear)
+        tfar = np.where(parallel, np.where(inside, np.inf, -np.inf), tfar)
+
+    # reducing the last axis by hand is much faster than max / min
+    tmin = np.maximum(np.maximum(tnear[..., 0], tnear[..., 1]), tnear[..., 2])
+    tmax = np.minimum(np.minimum(tfar[..., 0], tfar[..., 1]), tfar[..., 2])
+    hit = (tmax >= tmin) & (tmax >= 0.)
+    return hit, tmin, tmax
+
 @all_parameters_as_numpy_arrays
 def point_height_above_plane(point, pl):
     """Calculates how high a point is above a plane.
@@ -401,6 +459,89 @@ def sphere_penetration_sphere(s1, s2):
         return 0.0
     return penetration
 
+def _sphere_squared_distances(s1, s2, all_pairs):
+    """Returns the squared distance between the centres of the spheres and
+    the sum of their radii.
+
+    The axes are accumulated in place one at a time, which avoids creating
+    an (N,M,3) array of deltas for all pairs. For all pairs, the spheres
+    are first split into contiguous columns, which are faster to
+    broadcast over than the columns of an (N,4) array.
+    """
+    # integer spheres are promoted so the distances can be written in place
+    dtype = np.result_type(s1, s2, float)
+    c1 = np.moveaxis(np.asarray(s1, dtype=dtype), -1, 0)
+    c2 = np.moveaxis(np.asarray(s2, dtype=dtype), -1, 0)
+    if all_pairs:
+        c1 = np.ascontiguousarray(c1)[..., np.newaxis]
+        c2 = np.ascontiguousarray(c2)
+
+    # a single pair of spheres produces numpy scalars, which can't be
+    # written to in place, so they are made 0 dimensional arrays
+    squared = np.asarray(np.subtract(c2[0], c1[0]))
+    squared *= squared
+    delta = np.asarray(np.subtract(c2[1], c1[1]))
+    delta *= delta
+    squared += delta
+    np.subtract(c2[2], c1[2], out=delta)
+    delta *= delta
+    squared += delta
+    return squared, c1[3] + c2[3]
+
+@all_parameters_as_numpy_arrays
+def spheres_intersect_spheres(s1, s2, all_pairs=False):
+    """Checks if arrays of spheres overlap.
+
+    By default the spheres are paired, ie. sphere i of s1 is tested against
+    sphere i of s2, with the usual numpy broadcasting rules.
+    If all_pairs is True, every sphere of s1 is tested against every
+    sphere of s2.
+
+    As with sphere_does_intersect_sphere, spheres which are touching
+    perfectly overlap, and squared distances are compared so no square
+    root is calculated.
+
+    :param numpy.array s1: The spheres with shape (N,4), or a single
+        sphere.
+    :param numpy.array s2: The spheres with shape (M,4), or a single
+        sphere.
+    :param boolean all_pairs: If True, test every sphere of s1 against
+        every sphere of s2.
+    :rtype: numpy.array
+    :return: A boolean array with shape (N,), or (N,M) when all_pairs
+        is True, which is True where the spheres overlap.
+    """
+    squared, radii = _sphere_squared_distances(s1, s2, all_pairs)
+    return squared <= radii * radii
+
+@all_parameters_as_numpy_arrays
+def spheres_penetration_spheres(s1, s2, all_pairs=False):
+    """Calculates the distance arrays of spheres have penetrated into one
+    another.
+
+    The spheres are paired, or tested as all pairs, as for
+    spheres_intersect_spheres. Squared distances are compared first, so
+    square roots are only calculated for the spheres which penetrate.
+
+    :param numpy.array s1: The spheres with shape (N,4), or a single
+        sphere.
+    :param numpy.array s2: The spheres with shape (M,4), or a single
+        sphere.
+    :param boolean all_pairs: If True, test every sphere of s1 against
+        every sphere of s2.
+    :rtype: numpy.array
+    :return: An array with shape (N,), or (N,M) when all_pairs is True,
+        of r1 + r2 - distance, as with sphere_penetration_sphere.
+        0.0 where the spheres do not penetrate.
+    """
+    squared, radii = _sphere_squared_distances(s1, s2, all_pairs)
+    penetrating = squared < radii * radii
+
+    penetration = np.zeros_like(squared)
+    np.sqrt(squared, out=penetration, where=penetrating)
+    np.subtract(radii, penetration, out=penetration, where=penetrating)
+    return penetration
+
 @all_parameters_as_numpy_arrays
 def ray_intersect_sphere(ray, sphere):
     """ Returns the intersection points of a ray and a sphere.
@@ -438,3 +579,234 @@ def ray_intersect_sphere(ray, sphere):
         if t >= 0:
             ret.append(ray_origin + ray_direction * t)
     return ret
+
+@all_parameters_as_numpy_arrays
+def rays_intersect_spheres(rays, spheres, all_pairs=False):
+    """Calculates the intersection of arrays of rays and spheres.
+
+    By default the rays and spheres are paired, ie. ray i is tested against
+    sphere i, with the usual numpy broadcasting rules.
+    If all_pairs is True, every ray is tested against every sphere.
+
+    The near and far distances are the distances along the ray to where
+    the line of the ray enters and leaves the sphere, in units of the ray's
+    direction, which does not need to be unit length. The near distance is
+    negative when the ray starts inside the sphere.
+
+    :param numpy.array rays: The rays with shape (N,2,3).
+    :param numpy.array spheres: The spheres with shape (M,4).
+    :param boolean all_pairs: If True, test every ray against every sphere.
+    :rtype: tuple
+    :return: A tuple of (hit, tnear, tfar) arrays, with shape (N,)
+        or (N,M) when all_pairs is True. tnear and tfar are NaN where
+        the line of the ray misses the sphere.
+    """
+    origin, direction = rays[..., 0, :], rays[..., 1, :]
+    a = np.sum(direction * direction, axis=-1)
+    if all_pairs:
+        origin = origin[..., np.newaxis, :]
+        direction = direction[..., np.newaxis, :]
+        a = a[..., np.newaxis]
+
+    # einsum is much faster than sum for dot products of 3 components
+    relative = origin - spheres[..., 0:3]
+    b = 2. * np.einsum('...i,...i->...', direction, relative)
+    c = np.einsum('...i,...i->...', relative, relative) - spheres[..., 3] * spheres[..., 3]
+
+    tnear, tfar, real = solve_quadratic_equations(a, b, c)
+    hit = real & (tfar >= 0.)
+    return hit, tnear, tfar
+
+def _mesh_triangles(triangles, indices):
+    """Returns a (T,3,3) array of triangles from a triangle array or
+    from vertex data and indices.
+    """
+    if indices is None:
+        return triangles
+    # only the position is used from the vertex data
+    return triangles[np.reshape(indices, (-1, 3)), 0:3]
+
+def _moller_trumbore(det, t, u, v, cull_backfaces):
+    """Tests the Moller-Trumbore determinant and the numerators of t, u
+    and v, so that only the hits need to be divided.
+
+    The arrays are modified in place.
+
+    :rtype: tuple
+    :return: The hit mask, and the determinant and numerators with the
+        sign of the determinant removed.
+    """
+    if not cull_backfaces:
+        # the arrays are temporaries, so are modified in place
+        sign = np.sign(det)
+        det *= sign
+        t *= sign
+        u *= sign
+        v *= sign
+    hit = det > 0.
+    hit &= t >= 0.
+    hit &= u >= 0.
+    hit &= v >= 0.
+    hit &= (u + v) <= det
+    return hit, det, t, u, v
+
+def _triangle_coefficients(triangles):
+    """Returns a matrix which transforms ray coordinates into the
+    Moller-Trumbore determinant and numerators of t, u and v against
+    each triangle.
+
+    Rays are represented by their direction d, origin o and moment o x d,
+    which makes each value a linear function of the ray::
+
+        det = -n.d
+        t = n.o - n.v0
+        u = e2.(o x d) - (e2 x v0).d
+        v = -e1.(o x d) - (v0 x e1).d
+
+    where n = e1 x e2. This lets a block of rays be tested against every
+    triangle with a single matrix multiply.
+
+    The triangles are moved to the origin, and the rays must be moved by
+    the same offset, to reduce the loss of precision.
+
+    :rtype: tuple
+    :return: The (10,4*T) matrix and the offset.
+    """
+    centre = np.mean(np.reshape(triangles, (-1, 3)), axis=0)
+    v0 = triangles[:, 0] - centre
+    e1 = triangles[:, 1] - triangles[:, 0]
+    e2 = triangles[:, 2] - triangles[:, 0]
+    n = vector3.cross(e1, e2)
+
+    coefficients = np.zeros((10, 4, len(triangles)), dtype=np.result_type(triangles, np.float32))
+    coefficients[0:3, 0] = -n.T
+    coefficients[3:6, 1] = n.T
+    coefficients[9, 1] = -np.einsum('ij,ij->i', n, v0)
+    coefficients[0:3, 2] = -vector3.cross(e2, v0).T
+    coefficients[6:9, 2] = e2.T
+    coefficients[0:3, 3] = -vector3.cross(v0, e1).T
+    coefficients[6:9, 3] = -e1.T
+    return np.reshape(coefficients, (10, -1)), centre
+
+def _ray_coordinates(rays, centre):
+    """Returns the (R,10) coordinates of rays used with _triangle_coefficients.
+    """
+    origin = rays[:, 0] - centre
+    direction = rays[:, 1]
+    return np.concatenate([
+        direction, origin, vector3.cross(origin, direction), np.ones((len(rays), 1))
+    ], axis=-1)
+
+@parameters_as_numpy_arrays('rays', 'triangles', 'indices')
+def rays_intersect_triangles(rays, triangles, indices=None, cull_backfaces=False, all_pairs=False):
+    """Calculates the intersection of arrays of rays and triangles using
+    the Moller-Trumbore algorithm.
+
+    By default the rays and triangles are paired, ie. ray i is tested
+    against triangle i, with the usual numpy broadcasting rules.
+    If all_pairs is True, every ray is tested against every triangle.
+
+    Triangles may be provided as a (T,3,3) array of vertices, or as vertex
+    data and indices, such as those returned by geometry.create_cube.
+    Only the first 3 values of each vertex are used.
+
+    Triangles are front facing when their vertices are counter clockwise
+    when viewed from the ray. Degenerate triangles are never hit.
+
+    :param numpy.array rays: The rays with shape (R,2,3).
+    :param numpy.array triangles: The triangles with shape (T,3,3),
+        or the vertex data if indices is provided.
+    :param numpy.array indices: The vertex indices of the triangles,
+        with shape (T*3,) or (T,3).
+    :param boolean cull_backfaces: If True, back facing triangles are
+        not hit.
+    :param boolean all_pairs: If True, test every ray against every triangle.
+    :rtype: tuple
+    :return: A tuple of (hit, t, barycentric) arrays, with shapes (R,), (R,)
+        and (R,3), or (R,T), (R,T) and (R,T,3) when all_pairs is True.
+        barycentric contains the weights of the triangle's three vertices
+        at the intersection point.
+        Where the ray misses, t is inf and barycentric is NaN.
+    """
+    triangles = _mesh_triangles(triangles, indices)
+    if all_pairs:
+        coefficients, centre = _triangle_coefficients(triangles)
+        values = np.dot(_ray_coordinates(rays, centre), coefficients)
+        det, t, u, v = np.rollaxis(np.reshape(values, (len(rays), 4, -1)), 1)
+    else:
+        origin, direction = rays[..., 0, :], rays[..., 1, :]
+        v0 = triangles[..., 0, :]
+        e1 = triangles[..., 1, :] - v0
+        e2 = triangles[..., 2, :] - v0
+        p = vector3.cross(direction, e2)
+        s = origin - v0
+        q = vector3.cross(s, e1)
+        det = np.einsum('...i,...i->...', e1, p)
+        t = np.einsum('...i,...i->...', e2, q)
+        u = np.einsum('...i,...i->...', s, p)
+        v = np.einsum('...i,...i->...', direction, q)
+
+    hit, det, t, u, v = _moller_trumbore(det, t, u, v, cull_backfaces)
+    inverse = np.where(hit, 1. / np.where(hit, det, 1.), np.nan)
+    t = np.where(hit, t * inverse, np.inf)
+    u, v = u * inverse, v * inverse
+    return hit, t, np.stack([1. - u - v, u, v], axis=-1)
+
+@parameters_as_numpy_arrays('rays', 'triangles', 'indices')
+def rays_closest_triangle(rays, triangles, indices=None, cull_backfaces=False, block_size=2 ** 20):
+    """Finds the closest triangle hit by each ray.
+
+    This is intended for ray casting against a mesh. Rays are tested in
+    blocks against all of the triangles, so the memory used is bounded
+    by block_size rather than the number of rays times triangles.
+
+    Every ray is tested against every triangle. When casting many rays
+    against a large mesh, it is much faster to build a BVH over the
+    triangles' AABBs (see the bvh module) and test the candidate pairs
+    it returns with rays_intersect_triangles.
+
+    See rays_intersect_triangles for the triangle formats.
+
+    :param numpy.array rays: The rays with shape (R,2,3).
+    :param numpy.array triangles: The triangles with shape (T,3,3),
+        or the vertex data if indices is provided.
+    :param numpy.array indices: The vertex indices of the triangles,
+        with shape (T*3,) or (T,3).
+    :param boolean cull_backfaces: If True, back facing triangles are
+        not hit.
+    :param int block_size: The approximate number of ray / triangle pairs
+        to test at once.
+    :rtype: tuple
+    :return: A tuple of (triangle, t, barycentric) arrays with shapes (R,),
+        (R,) and (R,3). Rays which miss have a triangle index of -1, a t of
+        inf and barycentrics of NaN.
+    """
+    triangles = _mesh_triangles(triangles, indices)
+    n, count = len(rays), len(triangles)
+    triangle = np.full(n, -1)
+    distance = np.full(n, np.inf)
+    barycentric = np.full((n, 3), np.nan)
+    if count == 0:
+        return triangle, distance, barycentric
+
+    coefficients, centre = _triangle_coefficients(triangles)
+    coordinates = _ray_coordinates(rays, centre)
+    step = max(1, block_size // count)
+    for first in range(0, n, step):
+        values = np.dot(coordinates[first:first + step], coefficients)
+        det, t, u, v = np.rollaxis(np.reshape(values, (len(values), 4, count)), 1)
+        hit, det, t, u, v = _moller_trumbore(det, t, u, v, cull_backfaces)
+
+        # only divide the hits
+        t = np.divide(t, det, out=np.full(t.shape, np.inf), where=hit)
+        closest = np.argmin(t, axis=-1)
+        rows = np.arange(len(values))
+        found = hit[rows, closest]
+        rows, closest = rows[found], closest[found]
+
+        index = first + rows
+        triangle[index] = closest
+        distance[index] = t[rows, closest]
+        u, v = u[rows, closest] / det[rows, closest], v[rows, closest] / det[rows, closest]
+        barycentric[index] = np.stack([1. - u - v, u, v], axis=-1)
+    return triangle, distance, barycentric
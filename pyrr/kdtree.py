@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for building a k-d tree over an array of points and
+finding the nearest points to a batch of query points.
+
+A k-d tree is a binary tree which recursively splits the points in half
+at the median along the axis on which they are most spread out. Each node
+stores the bounds of its points, and queries only descend into nodes whose
+bounds are close enough to the query point to contain a result.
+
+The tree is stored as a set of flat numpy arrays in a namedtuple (see
+KDTree). Nodes are stored breadth first, node 0 being the root, and the
+points are reordered so that each node's points are contiguous.
+The tree is built and queried a level at a time, so the work for all the
+nodes on a level, or all the queries in a batch, is done with numpy array
+operations rather than per node or per query Python code.
+
+Points are (N,3) arrays, as used by the vector3 module.
+
+.. seealso: https://en.wikipedia.org/wiki/K-d_tree
+"""
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import numpy as np
+from .utils import _closest, _segments
+
+
+class KDTree(namedtuple('KDTree', ['points', 'bounds', 'children', 'start', 'count', 'indices', 'levels'])):
+    """The arrays that make up a k-d tree.
+
+    :ivar numpy.array points: The (N,3) points, ordered so that each node's
+        points are contiguous.
+    :ivar numpy.array bounds: The (M,2,3) AABB of each node's points.
+    :ivar numpy.array children: The (M,2) indices of each node's children.
+        Leaf nodes have children of -1.
+    :ivar numpy.array start: The (M,) offset of each node's first point
+        within points.
+    :ivar numpy.array count: The (M,) number of points within each node.
+    :ivar numpy.array indices: The (N,) index of each point within the
+        array the tree was built from.
+    :ivar numpy.array levels: The offset of the first node of each level
+        of the tree, followed by the total number of nodes.
+    """
+    __slots__ = ()
+
+
+def create_from_points(points, leaf_size=8, dtype=None):
+    """Builds a k-d tree from an array of points.
+
+    :param numpy.array points: The (N,3) points to build the tree from.
+        The points are copied.
+    :param int leaf_size: The maximum number of points in a leaf node.
+    :rtype: KDTree
+    :return: The k-d tree.
+    """
+    if leaf_size < 1:
+        raise ValueError('leaf_size must be at least 1')
+
+    points = np.array(points, dtype=dtype)
+    n = len(points)
+    indices = np.arange(n)
+    # each axis is stored contiguously, which makes gathering the
+    # coordinates of each node's points much cheaper
+    axes = np.ascontiguousarray(points.T)
+
+    start = np.zeros(1, dtype=int)
+    count = np.array([n])
+    starts, counts, bounds, children, levels = [], [], [], [], [0]
+    while len(start):
+        starts.append(start)
+        counts.append(count)
+        levels.append(levels[-1] + len(start))
+
+        # the bounds of each node's points
+        segment, offset, position = _segments(start, count)
+        bound = np.empty((len(start), 2, 3), dtype=np.result_type(points, float))
+        bound[:, 0] = np.inf
+        bound[:, 1] = -np.inf
+        if len(position):
+            p = np.take(axes, position, axis=1)
+            bound[:, 0] = np.minimum.reduceat(p, offset, axis=1).T
+            bound[:, 1] = np.maximum.reduceat(p, offset, axis=1).T
+        bounds.append(bound)
+
+        split = count > leaf_size
+        child = np.full((len(start), 2), -1)
+        children.append(child)
+        if not np.any(split):
+            break
+
+        # sort the points of each node along its widest axis, the sort key
+        # is the point's node plus its position within the node's bounds,
+        # which sorts every node at once
+        split_start, split_count = start[split], count[split]
+        segment, offset, position = _segments(split_start, split_count)
+        lo, hi = bound[split, 0], bound[split, 1]
+        axis = np.argmax(hi - lo, axis=-1)
+        r = np.arange(len(axis))
+        lo, extent = lo[r, axis], (hi - lo)[r, axis]
+        scale = 0.5 / np.where(extent > 0., extent, 1.)
+        key = axes.ravel()[axis[segment] * n + position]
+        key = segment + (key - lo[segment]) * scale[segment]
+        order = position[np.argsort(key)]
+        axes[:, position] = np.take(axes, order, axis=1)
+        indices[position] = indices[order]
+
+        first = levels[-1] + 2 * r
+        child[split, 0] = first
+        child[split, 1] = first + 1
+
+        left = split_count // 2
+        start = np.empty(2 * len(split_start), dtype=int)
+        count = np.empty(2 * len(split_start), dtype=int)
+        start[0::2] = split_start
+        start[1::2] = split_start + left
+        count[0::2] = left
+        count[1::2] = split_count - left
+
+    return KDTree(
+        points=np.ascontiguousarray(axes.T),
+        bounds=np.concatenate(bounds),
+        children=np.concatenate(children),
+        start=np.concatenate(starts),
+        count=np.concatenate(counts),
+        indices=indices,
+        levels=np.array(levels),
+    )
+
+def _squared_distance_to_bounds(points, bounds):
+    """Returns the squared distance from each point to each AABB,
+    0 for points inside the AABB.
+    """
+    d = np.maximum(np.maximum(bounds[:, 0] - points, points - bounds[:, 1]), 0.)
+    return np.einsum('ij,ij->i', d, d)
+
+def _squared_distance(points, query, tree, position):
+    """Returns the squared distance between each query point and tree point.
+
+    np.take is used as it is much faster than fancy indexing for
+    large gathers.
+    """
+    d = np.take(points, query, axis=0) - np.take(tree.points, position, axis=0)
+    return np.einsum('ij,ij->i', d, d)
+
+def _traverse(tree, points, squared_radius):
+    """Finds the points within the leaves that are within a radius of
+    each query point.
+
+    :rtype: tuple
+    :return: The query indices and point positions of each candidate,
+        sorted by query.
+    """
+    query = np.arange(len(points))
+    node = np.zeros(len(points), dtype=int)
+    found_query, found_position = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)]
+    while len(query):
+        near = _squared_distance_to_bounds(
+            np.take(points, query, axis=0),
+            np.take(tree.bounds, node, axis=0),
+        ) <= squared_radius[query]
+        query, node = query[near], node[near]
+
+        # the points within leaves become candidates
+        leaf = tree.children[node, 0] < 0
+        segment, _, position = _segments(tree.start[node[leaf]], tree.count[node[leaf]])
+        found_query.append(query[leaf][segment])
+        found_position.append(position)
+
+        # queries descend into both children of other nodes
+        query = np.repeat(query[~leaf], 2)
+        node = tree.children[node[~leaf]].ravel()
+
+    query = np.concatenate(found_query)
+    position = np.concatenate(found_position)
+    order = np.argsort(query, kind='mergesort')
+    return query[order], position[order]
+
+def _blocks(n, block_size):
+    """Yields slices of block_size queries.
+    """
+    for first in range(0, n, block_size):
+        yield slice(first, first + block_size)
+
+def query_radius(tree, points, radius, block_size=2 ** 16):
+    """Finds the points within a radius of each query point.
+
+    :param KDTree tree: The tree to query.
+    :param numpy.array points: The (Q,3) query points.
+    :param numpy.array radius: The query radius, either a single value
+        or a (Q,) array.
+    :param int block_size: The number of queries processed at once,
+        which bounds the memory used.
+    :rtype: tuple
+    :return: A tuple of (query index, point index, distance) arrays, with
+        one entry per point found. Sorted by query and then by point.
+    """
+    points = np.asarray(points)
+    squared_radius = np.broadcast_to(radius, (len(points),)) ** 2
+
+    found_query, found_point, found_distance = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)], [np.empty(0, dtype=tree.points.dtype)]
+    for block in _blocks(len(points), block_size):
+        query, position = _traverse(tree, points[block], squared_radius[block])
+        squared = _squared_distance(points[block], query, tree, position)
+        inside = squared <= squared_radius[block][query]
+        found_query.append(query[inside] + block.start)
+        found_point.append(tree.indices[position[inside]])
+        found_distance.append(np.sqrt(squared[inside]))
+
+    query = np.concatenate(found_query)
+    point = np.concatenate(found_point)
+    distance = np.concatenate(found_distance)
+    order = np.lexsort((point, query))
+    return query[order], point[order], distance[order]
+
+def _nearest(tree, points, k):
+    n = len(points)
+    # descend towards each query point, through the closer child, to the
+    # smallest node that still contains k points. The k nearest of that
+    # node's points bound the distance to the k nearest points
+    node = np.zeros(n, dtype=int)
+    active = np.flatnonzero(tree.children[node, 0] >= 0)
+    while len(active):
+        children = tree.children[node[active]]
+        p = points[active]
+        left = _squared_distance_to_bounds(p, tree.bounds[children[:, 0]])
+        right = _squared_distance_to_bounds(p, tree.bounds[children[:, 1]])
+        child = np.where(left <= right, children[:, 0], children[:, 1])
+        descend = tree.count[child] >= k
+        active = active[descend]
+        node[active] = child[descend]
+        active = active[tree.children[node[active], 0] >= 0]
+
+    query = np.repeat(np.arange(n), tree.count[node])
+    _, _, position = _segments(tree.start[node], tree.count[node])
+    _, bound = _closest(query, position, _squared_distance(points, query, tree, position), n, k)
+
+    # the points within the bound are the only candidates
+    bound = bound[:, -1]
+    query, position = _traverse(tree, points, bound)
+    squared = _squared_distance(points, query, tree, position)
+    inside = squared <= bound[query]
+    position, squared = _closest(query[inside], position[inside], squared[inside], n, k)
+
+    nearest = np.where(position >= 0, tree.indices[position], -1)
+    return nearest, np.sqrt(squared)
+
+def query_nearest(tree, points, k=1, block_size=2 ** 16):
+    """Finds the k nearest points to each query point.
+
+    :param KDTree tree: The tree to query.
+    :param numpy.array points: The (Q,3) query points.
+    :param int k: The number of points to find.
+    :param int block_size: The number of queries processed at once,
+        which bounds the memory used.
+    :rtype: tuple
+    :return: A tuple of (point index, distance) arrays of shape (Q,k),
+        sorted by distance. If the tree contains fewer than k points, the
+        missing entries have an index of -1 and a distance of inf.
+    """
+    points = np.asarray(points)
+    if len(tree.points) == 0:
+        return np.full((len(points), k), -1), np.full((len(points), k), np.inf)
+
+    nearest, distances = [np.empty((0, k), dtype=int)], [np.empty((0, k), dtype=tree.points.dtype)]
+    for block in _blocks(len(points), block_size):
+        result = _nearest(tree, points[block], k)
+        nearest.append(result[0])
+        distances.append(result[1])
+    return np.concatenate(nearest), np.concatenate(distances)
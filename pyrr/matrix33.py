@@ -12,30 +12,42 @@ from . import vector, quaternion, euler
 from .utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays
 
 
-def create_identity(dtype=None):
+_identity = np.identity(3)
+
+
+def create_identity(dtype=None, out=None):
     """Creates a new matrix33 and sets it to
     an identity matrix.
 
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix representing an identity matrix with shape (3,3).
     """
-    return np.identity(3, dtype=dtype)
+    if out is None:
+        return np.identity(3, dtype=dtype)
+    out[...] = _identity
+    return out
 
-def create_from_matrix44(mat, dtype=None):
+def create_from_matrix44(mat, dtype=None, out=None):
     """Creates a Matrix33 from a Matrix44.
 
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3) with the input matrix rotation.
     """
     mat = np.asarray(mat)
-    return np.array(mat[0:3,0:3], dtype=dtype)
+    if out is None:
+        return np.array(mat[..., 0:3, 0:3], dtype=dtype)
+    out[...] = mat[..., 0:3, 0:3]
+    return out
 
 @parameters_as_numpy_arrays('eulers')
-def create_from_eulers(eulers, dtype=None):
+def create_from_eulers(eulers, dtype=None, out=None):
     """Creates a matrix from the specified Euler rotations.
 
     :param numpy.array eulers: A set of euler rotations in the format
         specified by the euler modules.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3) with the euler's rotation.
     """
@@ -50,76 +62,76 @@ def create_from_eulers(eulers, dtype=None):
     sY = np.sin(yaw)
     cY = np.cos(yaw)
 
-    return np.array(
-        [
-            # m1
-            [
-                cY * cP,
-                -cY * sP * cR + sY * sR,
-                cY * sP * sR + sY * cR,
-            ],
-            # m2
-            [
-                sP,
-                cP * cR,
-                -cP * sR,
-            ],
-            # m3
-            [
-                -sY * cP,
-                sY * sP * cR + cY * sR,
-                -sY * sP * sR + cY * cR,
-            ]
-        ],
-        dtype=dtype
-    )
+    mat = np.empty(np.shape(pitch) + (3,3), dtype=dtype) if out is None else out
+
+    # m1
+    mat[..., 0, 0] = cY * cP
+    mat[..., 0, 1] = -cY * sP * cR + sY * sR
+    mat[..., 0, 2] = cY * sP * sR + sY * cR
+    # m2
+    mat[..., 1, 0] = sP
+    mat[..., 1, 1] = cP * cR
+    mat[..., 1, 2] = -cP * sR
+    # m3
+    mat[..., 2, 0] = -sY * cP
+    mat[..., 2, 1] = sY * sP * cR + cY * sR
+    mat[..., 2, 2] = -sY * sP * sR + cY * cR
+    return mat
 
 
 @parameters_as_numpy_arrays('axis')
-def create_from_axis_rotation(axis, theta, dtype=None):
+def create_from_axis_rotation(axis, theta, dtype=None, out=None):
     """Creates a matrix from the specified theta rotation around an axis.
 
+    Supports arrays of axes and angles, ie. (N,3) axes and (N,) angles
+    will produce an (N,3,3) array of matrices.
+    Axes which are not unit length are normalized.
+
     :param numpy.array axis: A (3,) vector specifying the axis of rotation.
     :param float theta: A rotation specified in radians.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3).
     """
     dtype = dtype or axis.dtype
 
-    axis = vector.normalize(axis)
-    x,y,z = axis
+    axis = vector._normalize_non_unit(axis)
+    x, y, z = axis[..., 0], axis[..., 1], axis[..., 2]
+
+    s = np.sin(theta)
+    c = np.cos(theta)
+    t = 1 - c
 
-    s = np.sin(theta);
-    c = np.cos(theta);
-    t = 1 - c;
+    mat = np.empty(np.broadcast(x, s).shape + (3,3), dtype=dtype) if out is None else out
 
     # Construct the elements of the rotation matrix
-    return np.array(
-        [
-            [ x * x * t + c,     y * x * t + z * s, z * x * t - y * s],
-            [ x * y * t - z * s, y * y * t + c,     z * y * t + x * s],
-            [ x * z * t + y * s, y * z * t - x * s, z * z * t + c]
-        ],
-        dtype= dtype
-    )
+    mat[..., 0, 0] = x * x * t + c
+    mat[..., 0, 1] = y * x * t + z * s
+    mat[..., 0, 2] = z * x * t - y * s
+    mat[..., 1, 0] = x * y * t - z * s
+    mat[..., 1, 1] = y * y * t + c
+    mat[..., 1, 2] = z * y * t + x * s
+    mat[..., 2, 0] = x * z * t + y * s
+    mat[..., 2, 1] = y * z * t - x * s
+    mat[..., 2, 2] = z * z * t + c
+    return mat
 
 
 @parameters_as_numpy_arrays('quat')
-def create_from_quaternion(quat, dtype=None):
+def create_from_quaternion(quat, dtype=None, out=None):
     """Creates a matrix with the same rotation as a quaternion.
 
     :param quat: The quaternion to create the matrix from.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3) with the quaternion's rotation.
     """
     dtype = dtype or quat.dtype
 
-    # the quaternion must be normalized
-    if not np.isclose(np.linalg.norm(quat), 1.):
-        quat = quaternion.normalize(quat)
-
     # http://www.euclideanspace.com/maths/geometry/rotations/conversions/quaternionToMatrix/index.htm
-    qx, qy, qz, qw = quat[0], quat[1], quat[2], quat[3]
+    # the quaternion does not need to be normalized, each value is
+    # divided by the squared length of the quaternion (invs)
+    qx, qy, qz, qw = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
 
     sqw = qw**2
     sqx = qx**2
@@ -133,35 +145,33 @@ def create_from_quaternion(quat, dtype=None):
     qxw = qx * qw
 
     invs = 1 / (sqx + sqy + sqz + sqw)
-    m00 = ( sqx - sqy - sqz + sqw) * invs
-    m11 = (-sqx + sqy - sqz + sqw) * invs
-    m22 = (-sqx - sqy + sqz + sqw) * invs
-    m10 = 2.0 * (qxy + qzw) * invs
-    m01 = 2.0 * (qxy - qzw) * invs
-    m20 = 2.0 * (qxz - qyw) * invs
-    m02 = 2.0 * (qxz + qyw) * invs
-    m21 = 2.0 * (qyz + qxw) * invs
-    m12 = 2.0 * (qyz - qxw) * invs
-
-    return np.array([
-        [m00, m01, m02],
-        [m10, m11, m12],
-        [m20, m21, m22],
-    ], dtype=dtype)
+
+    mat = np.empty(quat.shape[:-1] + (3,3), dtype=dtype) if out is None else out
+    mat[..., 0, 0] = ( sqx - sqy - sqz + sqw) * invs
+    mat[..., 1, 1] = (-sqx + sqy - sqz + sqw) * invs
+    mat[..., 2, 2] = (-sqx - sqy + sqz + sqw) * invs
+    mat[..., 1, 0] = 2.0 * (qxy + qzw) * invs
+    mat[..., 0, 1] = 2.0 * (qxy - qzw) * invs
+    mat[..., 2, 0] = 2.0 * (qxz - qyw) * invs
+    mat[..., 0, 2] = 2.0 * (qxz + qyw) * invs
+    mat[..., 2, 1] = 2.0 * (qyz + qxw) * invs
+    mat[..., 1, 2] = 2.0 * (qyz - qxw) * invs
+    return mat
 
 
 @parameters_as_numpy_arrays('quat')
-def create_from_inverse_of_quaternion(quat, dtype=None):
+def create_from_inverse_of_quaternion(quat, dtype=None, out=None):
     """Creates a matrix with the inverse rotation of a quaternion.
 
     :param numpy.array quat: The quaternion to make the matrix from (shape 4).
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3) that respresents the inverse of
         the quaternion.
     """
     dtype = dtype or quat.dtype
 
-    x, y, z, w = quat
+    x, y, z, w = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
 
     x2 = x**2
     y2 = y**2
@@ -173,58 +183,60 @@ def create_from_inverse_of_quaternion(quat, dtype=None):
     xz = x * z
     yz = y * z
 
-    return np.array(
-        [
-            # m1
-            [
-                # m11 = 1.0 - 2.0 * (q.y * q.y + q.z * q.z)
-                1.0 - 2.0 * (y2 + z2),
-                # m21 = 2.0 * (q.x * q.y + q.w * q.z)
-                2.0 * (xy + wz),
-                # m31 = 2.0 * (q.x * q.z - q.w * q.y)
-                2.0 * (xz - wy),
-            ],
-            # m2
-            [
-                # m12 = 2.0 * (q.x * q.y - q.w * q.z)
-                2.0 * (xy - wz),
-                # m22 = 1.0 - 2.0 * (q.x * q.x + q.z * q.z)
-                1.0 - 2.0 * (x2 + z2),
-                # m32 = 2.0 * (q.y * q.z + q.w * q.x)
-                2.0 * (yz + wx),
-            ],
-            # m3
-            [
-                # m13 = 2.0 * ( q.x * q.z + q.w * q.y)
-                2.0 * (xz + wy),
-                # m23 = 2.0 * (q.y * q.z - q.w * q.x)
-                2.0 * (yz - wx),
-                # m33 = 1.0 - 2.0 * (q.x * q.x + q.y * q.y)
-                1.0 - 2.0 * (x2 + y2),
-            ]
-        ],
-        dtype=dtype
-    )
-
-def create_from_scale(scale, dtype=None):
+    mat = np.empty(quat.shape[:-1] + (3,3), dtype=dtype) if out is None else out
+
+    # m1
+    # m11 = 1.0 - 2.0 * (q.y * q.y + q.z * q.z)
+    mat[..., 0, 0] = 1.0 - 2.0 * (y2 + z2)
+    # m21 = 2.0 * (q.x * q.y + q.w * q.z)
+    mat[..., 0, 1] = 2.0 * (xy + wz)
+    # m31 = 2.0 * (q.x * q.z - q.w * q.y)
+    mat[..., 0, 2] = 2.0 * (xz - wy)
+
+    # m2
+    # m12 = 2.0 * (q.x * q.y - q.w * q.z)
+    mat[..., 1, 0] = 2.0 * (xy - wz)
+    # m22 = 1.0 - 2.0 * (q.x * q.x + q.z * q.z)
+    mat[..., 1, 1] = 1.0 - 2.0 * (x2 + z2)
+    # m32 = 2.0 * (q.y * q.z + q.w * q.x)
+    mat[..., 1, 2] = 2.0 * (yz + wx)
+
+    # m3
+    # m13 = 2.0 * ( q.x * q.z + q.w * q.y)
+    mat[..., 2, 0] = 2.0 * (xz + wy)
+    # m23 = 2.0 * (q.y * q.z - q.w * q.x)
+    mat[..., 2, 1] = 2.0 * (yz - wx)
+    # m33 = 1.0 - 2.0 * (q.x * q.x + q.y * q.y)
+    mat[..., 2, 2] = 1.0 - 2.0 * (x2 + y2)
+    return mat
+
+def create_from_scale(scale, dtype=None, out=None):
     """Creates an identity matrix with the scale set.
 
     :param numpy.array scale: The scale to apply as a vector (shape 3).
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (3,3) with the scale
         set to the specified vector.
     """
+    scale = np.asarray(scale)
+
     # apply the scale to the values diagonally
     # down the matrix
-    m = np.diagflat(scale)
-    if dtype:
-        m = m.astype(dtype)
-    return m
+    if out is None:
+        out = np.zeros(scale.shape[:-1] + (3,3), dtype=dtype or scale.dtype)
+    else:
+        out[...] = 0.
+    out[..., 0, 0] = scale[..., 0]
+    out[..., 1, 1] = scale[..., 1]
+    out[..., 2, 2] = scale[..., 2]
+    return out
 
-def create_from_x_rotation(theta, dtype=None):
+def create_from_x_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the X axis.
 
     :param float theta: The rotation, in radians, about the X-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (3,3) with the specified rotation about
         the X-axis.
@@ -234,19 +246,23 @@ def create_from_x_rotation(theta, dtype=None):
     cosT = np.cos(theta)
     sinT = np.sin(theta)
 
-    return np.array(
-        [
-            [ 1.0, 0.0, 0.0 ],
-            [ 0.0, cosT,-sinT ],
-            [ 0.0, sinT, cosT ]
-        ],
-        dtype=dtype
-    )
-
-def create_from_y_rotation(theta, dtype=None):
+    mat = np.empty(np.shape(theta) + (3,3), dtype=dtype) if out is None else out
+    mat[..., 0, 0] = 1.0
+    mat[..., 0, 1] = 0.0
+    mat[..., 0, 2] = 0.0
+    mat[..., 1, 0] = 0.0
+    mat[..., 1, 1] = cosT
+    mat[..., 1, 2] = -sinT
+    mat[..., 2, 0] = 0.0
+    mat[..., 2, 1] = sinT
+    mat[..., 2, 2] = cosT
+    return mat
+
+def create_from_y_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the Y axis.
 
     :param float theta: The rotation, in radians, about the Y-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (3,3) with the specified rotation about
         the Y-axis.
@@ -256,19 +272,23 @@ def create_from_y_rotation(theta, dtype=None):
     cosT = np.cos(theta)
     sinT = np.sin(theta)
 
-    return np.array(
-        [
-            [ cosT, 0.0,sinT ],
-            [ 0.0, 1.0, 0.0 ],
-            [-sinT, 0.0, cosT ]
-        ],
-        dtype=dtype
-    )
-
-def create_from_z_rotation(theta, dtype=None):
+    mat = np.empty(np.shape(theta) + (3,3), dtype=dtype) if out is None else out
+    mat[..., 0, 0] = cosT
+    mat[..., 0, 1] = 0.0
+    mat[..., 0, 2] = sinT
+    mat[..., 1, 0] = 0.0
+    mat[..., 1, 1] = 1.0
+    mat[..., 1, 2] = 0.0
+    mat[..., 2, 0] = -sinT
+    mat[..., 2, 1] = 0.0
+    mat[..., 2, 2] = cosT
+    return mat
+
+def create_from_z_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the Z axis.
 
     :param float theta: The rotation, in radians, about the Z-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (3,3) with the specified rotation about
         the Z-axis.
@@ -278,14 +298,17 @@ def create_from_z_rotation(theta, dtype=None):
     cosT = np.cos(theta)
     sinT = np.sin(theta)
 
-    return np.array(
-        [
-            [ cosT,-sinT, 0.0 ],
-            [ sinT, cosT, 0.0 ],
-            [ 0.0, 0.0, 1.0 ]
-        ],
-        dtype=dtype
-    )
+    mat = np.empty(np.shape(theta) + (3,3), dtype=dtype) if out is None else out
+    mat[..., 0, 0] = cosT
+    mat[..., 0, 1] = -sinT
+    mat[..., 0, 2] = 0.0
+    mat[..., 1, 0] = sinT
+    mat[..., 1, 1] = cosT
+    mat[..., 1, 2] = 0.0
+    mat[..., 2, 0] = 0.0
+    mat[..., 2, 1] = 0.0
+    mat[..., 2, 2] = 1.0
+    return mat
 
 @parameters_as_numpy_arrays('vec')
 def apply_to_vector(mat, vec):
@@ -335,7 +358,7 @@ def inverse(mat):
     """
     return np.linalg.inv(mat)
 
-def create_direction_scale(direction, scale):
+def create_direction_scale(direction, scale, out=None):
     """Creates a matrix which can apply a directional scaling to a set of vectors.
 
     An example usage for this is to flatten a mesh against a
@@ -345,6 +368,7 @@ def create_direction_scale(direction, scale):
     :param float scale: a float value for the scaling along the specified direction.
         A scale of 0.0 will flatten the vertices into a single plane with the direction being the
         plane's normal.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: The scaling matrix.
     """
@@ -374,34 +398,27 @@ def create_direction_scale(direction, scale):
     z2 = z**2
 
     scaleMinus1 = scale - 1.
-    return np.array(
-        [
-            # m1
-            [
-                # m11 = 1 + (k - 1)n.x^2
-                1. + scaleMinus1 * x2,
-                # m12 = (k - 1)n.x n.y^2
-                scaleMinus1 * x * y2,
-                # m13 = (k - 1)n.x n.z
-                scaleMinus1 * x * z
-            ],
-            # m2
-            [
-                # m21 = (k - 1)n.x n.y
-                scaleMinus1 * x * y,
-                # m22 = 1 + (k - 1)n.y
-                1. + scaleMinus1 * y,
-                # m23 = (k - 1)n.y n.z
-                scaleMinus1 * y * z
-            ],
-            # m3
-            [
-                # m31 = (k - 1)n.x n.z
-                scaleMinus1 * x * z,
-                # m32 = (k - 1)n.y n.z
-                scaleMinus1 * y * z,
-                # m33 = 1 + (k - 1)n.z^2
-                1. + scaleMinus1 * z2
-            ]
-        ]
-    )
+
+    mat = np.empty((3,3)) if out is None else out
+    # m1
+    # m11 = 1 + (k - 1)n.x^2
+    mat[0, 0] = 1. + scaleMinus1 * x2
+    # m12 = (k - 1)n.x n.y^2
+    mat[0, 1] = scaleMinus1 * x * y2
+    # m13 = (k - 1)n.x n.z
+    mat[0, 2] = scaleMinus1 * x * z
+    # m2
+    # m21 = (k - 1)n.x n.y
+    mat[1, 0] = scaleMinus1 * x * y
+    # m22 = 1 + (k - 1)n.y
+    mat[1, 1] = 1. + scaleMinus1 * y
+    # m23 = (k - 1)n.y n.z
+    mat[1, 2] = scaleMinus1 * y * z
+    # m3
+    # m31 = (k - 1)n.x n.z
+    mat[2, 0] = scaleMinus1 * x * z
+    # m32 = (k - 1)n.y n.z
+    mat[2, 1] = scaleMinus1 * y * z
+    # m33 = 1 + (k - 1)n.z^2
+    mat[2, 2] = 1. + scaleMinus1 * z2
+    return mat
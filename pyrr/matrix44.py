@@ -15,25 +15,53 @@ from . import quaternion
 from .utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays
 
 
-def create_identity(dtype=None):
+_identity = np.identity(4)
+
+
+def _create_affine(shape, dtype, out):
+    """Returns a matrix with the bottom row and right column set as
+    per an identity matrix.
+    The upper 3x3 is left for the caller to fill in.
+    """
+    mat = np.empty(shape + (4,4), dtype=dtype) if out is None else out
+    mat[..., 0:3, 3] = 0.
+    mat[..., 3, 0:3] = 0.
+    mat[..., 3, 3] = 1.
+    return mat
+
+def _create_zeros(shape, dtype, out):
+    """Returns a matrix with all values set to 0.
+    """
+    if out is None:
+        return np.zeros(shape + (4,4), dtype=dtype)
+    out[...] = 0.
+    return out
+
+def create_identity(dtype=None, out=None):
     """Creates a new matrix44 and sets it to
     an identity matrix.
 
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix representing an identity matrix with shape (4,4).
     """
-    return np.identity(4, dtype=dtype)
+    if out is None:
+        return np.identity(4, dtype=dtype)
+    out[...] = _identity
+    return out
 
-def create_from_matrix33(mat, dtype=None):
+def create_from_matrix33(mat, dtype=None, out=None):
     """Creates a Matrix44 from a Matrix33.
 
     The translation will be 0,0,0.
 
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) with the input matrix rotation.
     """
-    mat4 = np.identity(4, dtype=dtype)
-    mat4[0:3, 0:3] = mat
+    mat = np.asarray(mat)
+    mat4 = _create_affine(mat.shape[:-2], dtype, out)
+    mat4[..., 0:3, 0:3] = mat
     return mat4
 
 def create_matrix33_view(mat):
@@ -48,189 +76,253 @@ def create_matrix33_view(mat):
     return mat[0:3, 0:3]
 
 @parameters_as_numpy_arrays('eulers')
-def create_from_eulers(eulers, dtype=None):
+def create_from_eulers(eulers, dtype=None, out=None):
     """Creates a matrix from the specified Euler rotations.
 
     :param numpy.array eulers: A set of euler rotations in the format
         specified by the euler modules.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) with the euler's rotation.
     """
     dtype = dtype or eulers.dtype
-    # set to identity matrix
-    # this will populate our extra rows for us
-    mat = create_identity(dtype)
+    mat = _create_affine(eulers.shape[:-1], dtype, out)
 
     # we'll use Matrix33 for our conversion
-    mat[0:3, 0:3] = matrix33.create_from_eulers(eulers, dtype)
+    matrix33.create_from_eulers(eulers, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
 @parameters_as_numpy_arrays('axis')
-def create_from_axis_rotation(axis, theta, dtype=None):
+def create_from_axis_rotation(axis, theta, dtype=None, out=None):
     """Creates a matrix from the specified rotation theta around an axis.
 
+    Supports arrays of axes and angles, ie. (N,3) axes and (N,) angles
+    will produce an (N,4,4) array of matrices.
+
     :param numpy.array axis: A (3,) vector.
     :param float theta: A rotation in radians.
+    :param numpy.array out: Optional array to store the result in.
 
     :rtype: numpy.array
     :return: A matrix with shape (4,4).
     """
     dtype = dtype or axis.dtype
-    # set to identity matrix
-    # this will populate our extra rows for us
-    mat = create_identity(dtype)
+    mat = _create_affine(np.broadcast(axis[..., 0], theta).shape, dtype, out)
 
     # we'll use Matrix33 for our conversion
-    mat[0:3, 0:3] = matrix33.create_from_axis_rotation(axis, theta, dtype)
+    matrix33.create_from_axis_rotation(axis, theta, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
 @parameters_as_numpy_arrays('quat')
-def create_from_quaternion(quat, dtype=None):
+def create_from_quaternion(quat, dtype=None, out=None):
     """Creates a matrix with the same rotation as a quaternion.
 
     :param quat: The quaternion to create the matrix from.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) with the quaternion's rotation.
     """
     dtype = dtype or quat.dtype
-    # set to identity matrix
-    # this will populate our extra rows for us
-    mat = create_identity(dtype)
+    mat = _create_affine(quat.shape[:-1], dtype, out)
 
     # we'll use Matrix33 for our conversion
-    mat[0:3, 0:3] = matrix33.create_from_quaternion(quat, dtype)
+    matrix33.create_from_quaternion(quat, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
 @parameters_as_numpy_arrays('quat')
-def create_from_inverse_of_quaternion(quat, dtype=None):
+def create_from_inverse_of_quaternion(quat, dtype=None, out=None):
     """Creates a matrix with the inverse rotation of a quaternion.
 
     This can be used to go from object space to inertial space.
 
     :param numpy.array quat: The quaternion to make the matrix from (shape 4).
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) that respresents the inverse of
         the quaternion.
     """
     dtype = dtype or quat.dtype
-    # set to identity matrix
-    # this will populate our extra rows for us
-    mat = create_identity(dtype)
+    mat = _create_affine(quat.shape[:-1], dtype, out)
 
     # we'll use Matrix33 for our conversion
-    mat[0:3, 0:3] = matrix33.create_from_inverse_of_quaternion(quat, dtype)
+    matrix33.create_from_inverse_of_quaternion(quat, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
 @parameters_as_numpy_arrays('vec')
-def create_from_translation(vec, dtype=None):
+def create_from_translation(vec, dtype=None, out=None):
     """Creates an identity matrix with the translation set.
 
     :param numpy.array vec: The translation vector (shape 3 or 4).
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) that represents a matrix
         with the translation set to the specified vector.
     """
     dtype = dtype or vec.dtype
-    mat = create_identity(dtype)
-    mat[3, 0:3] = vec[:3]
+    mat = _create_affine(vec.shape[:-1], dtype, out)
+    mat[..., 0:3, 0:3] = _identity[0:3, 0:3]
+    mat[..., 3, 0:3] = vec[..., :3]
     return mat
 
-def create_from_scale(scale, dtype=None):
+def create_from_scale(scale, dtype=None, out=None):
     """Creates an identity matrix with the scale set.
 
     :param numpy.array scale: The scale to apply as a vector (shape 3).
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with shape (4,4) with the scale
         set to the specified vector.
     """
-    # we need to expand 'scale' into it's components
-    # because numpy isn't flattening them properly.
-    m = np.diagflat([scale[0], scale[1], scale[2], 1.0])
-    if dtype:
-        m = m.astype(dtype)
-    return m
+    scale = np.asarray(scale)
+    mat = _create_zeros(scale.shape[:-1], dtype, out)
+    mat[..., 0, 0] = scale[..., 0]
+    mat[..., 1, 1] = scale[..., 1]
+    mat[..., 2, 2] = scale[..., 2]
+    mat[..., 3, 3] = 1.
+    return mat
 
-def create_from_x_rotation(theta, dtype=None):
+@parameters_as_numpy_arrays('translation', 'quat', 'scale')
+def create_from_trs(translation, quat, scale=None, dtype=None, out=None):
+    """Creates a matrix from a translation, rotation and scale.
+
+    The result is equivalent to multiplying the scale, rotation and
+    translation matrices together (S . R . T), but is built in a single
+    pass without creating the intermediate matrices.
+
+    Supports arrays of transforms, ie. (N,3) translations, (N,4) quaternions
+    and (N,3) scales will produce an (N,4,4) array of matrices.
+    The inputs are broadcast against one another.
+
+    :param numpy.array translation: The translation vector (shape 3).
+    :param numpy.array quat: The rotation quaternion (shape 4).
+    :param numpy.array scale: The scale vector (shape 3).
+        If None, no scale is applied.
+    :param numpy.array out: Optional array to store the result in.
+    :rtype: numpy.array
+    :return: A matrix with shape (4,4) representing the transform.
+    """
+    if dtype is None:
+        # integer inputs are promoted so translations aren't truncated
+        dtype = np.result_type(translation, quat, translation if scale is None else scale)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.float64
+    shape = np.broadcast(
+        translation[..., 0],
+        quat[..., 0],
+        1. if scale is None else scale[..., 0]
+    ).shape
+    mat = _create_affine(shape, dtype, out)
+
+    # the rotation is written straight into the upper 3x3
+    # and each row is then scaled in place
+    matrix33.create_from_quaternion(quat, dtype, out=mat[..., 0:3, 0:3])
+    if scale is not None:
+        mat[..., 0:3, 0:3] *= scale[..., 0:3, np.newaxis]
+    mat[..., 3, 0:3] = translation[..., 0:3]
+    return mat
+
+def create_from_x_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the X axis.
 
     :param float theta: The rotation, in radians, about the X-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (4,4) with the specified rotation about
         the X-axis.
 
     .. seealso:: http://en.wikipedia.org/wiki/Rotation_matrix#In_three_dimensions
     """
-    mat = create_identity(dtype)
-    mat[0:3, 0:3] = matrix33.create_from_x_rotation(theta, dtype)
+    mat = _create_affine(np.shape(theta), dtype, out)
+
+    # we'll use Matrix33 for our conversion
+    matrix33.create_from_x_rotation(theta, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
-def create_from_y_rotation(theta, dtype=None):
+def create_from_y_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the Y axis.
 
     :param float theta: The rotation, in radians, about the Y-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (4,4) with the specified rotation about
         the Y-axis.
 
     .. seealso:: http://en.wikipedia.org/wiki/Rotation_matrix#In_three_dimensions
     """
-    mat = create_identity(dtype)
-    mat[0:3, 0:3] = matrix33.create_from_y_rotation(theta, dtype)
+    mat = _create_affine(np.shape(theta), dtype, out)
+
+    # we'll use Matrix33 for our conversion
+    matrix33.create_from_y_rotation(theta, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
-def create_from_z_rotation(theta, dtype=None):
+def create_from_z_rotation(theta, dtype=None, out=None):
     """Creates a matrix with the specified rotation about the Z axis.
 
     :param float theta: The rotation, in radians, about the Z-axis.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A matrix with the shape (4,4) with the specified rotation about
         the Z-axis.
 
     .. seealso:: http://en.wikipedia.org/wiki/Rotation_matrix#In_three_dimensions
     """
-    mat = create_identity(dtype)
-    mat[0:3, 0:3] = matrix33.create_from_z_rotation(theta, dtype)
+    mat = _create_affine(np.shape(theta), dtype, out)
+
+    # we'll use Matrix33 for our conversion
+    matrix33.create_from_z_rotation(theta, dtype, out=mat[..., 0:3, 0:3])
     return mat
 
-@all_parameters_as_numpy_arrays
-def apply_to_vector(mat, vec):
+@parameters_as_numpy_arrays('mat', 'vec')
+def apply_to_vector(mat, vec, affine=False):
     """Apply a matrix to a vector.
 
     The matrix's rotation and translation are applied to the vector.
     Supports multiple matrices and vectors.
 
+    Matrices and vectors are broadcast against one another, so a single
+    matrix can be applied to an array of vectors, or an array of matrices
+    with shape (N,4,4) can be applied to an array of vectors of shape (N,3)
+    or (N,4), in which case vector i is multiplied by matrix i.
+    To apply every vector to every matrix, pass vectors with shape
+    (N,1,3) or (N,1,4).
+
+    3D vectors are treated as points (w = 1.) and have the perspective
+    divide applied. Vectors with a resulting w of ~0 are set to infinity.
+
     :param numpy.array mat: The rotation / translation matrix.
         Can be a list of matrices.
     :param numpy.array vec: The vector to modify.
         Can be a numpy.array of vectors. ie. numpy.array([[x1,...], [x2,...], ...])
+    :param boolean affine: If True, the matrix is assumed to be affine
+        and the perspective divide is skipped for 3D vectors.
     :rtype: numpy.array
     :return: The vectors rotated by the specified matrix.
     """
-    size = vec.shape[len(vec.shape) - 1]
+    size = vec.shape[-1]
     if size == 3:
-        # convert to a vec4
-        if len(vec.shape) == 1:
-            vec4 = np.array([vec[0], vec[1], vec[2], 1.], dtype=vec.dtype)
-            vec4 = np.dot(vec4, mat)
-            if np.abs(vec4[3]) < 1e-8:
-                vec4[:] = [np.inf, np.inf, np.inf, np.inf]
-            else:
-                vec4 /= vec4[3]
-            return vec4[:3]
-        else:
-            vec4 = np.array([[v[0], v[1], v[2], 1.] for v in vec], dtype=vec.dtype)
-            vec4 = np.dot(vec4, mat)
-            for i in range(vec4.shape[0]):
-                if np.abs(vec4[i,3])<1e-8:
-                    vec4[i,:] = [np.inf, np.inf, np.inf, np.inf]
-                else:
-                    vec4[i,:] /= vec4[i,3]
-            return vec4[:,:3]
+        if affine:
+            return _multiply_vectors(vec, mat[..., :3, :3]) + mat[..., 3, :3]
+
+        # apply the matrix as if w = 1.
+        vec4 = _multiply_vectors(vec, mat[..., :3, :]) + mat[..., 3, :]
+
+        # perspective divide, vectors with w ~= 0 are sent to infinity
+        w = vec4[..., 3:]
+        near_zero = np.abs(w) < 1e-8
+        return np.where(near_zero, np.inf, vec4[..., :3] / np.where(near_zero, 1., w))
     elif size == 4:
-        return np.dot(vec, mat)
+        return _multiply_vectors(vec, mat)
     else:
         raise ValueError("Vector size unsupported")
 
+def _multiply_vectors(vec, mat):
+    """Multiplies row vectors by matrices, broadcasting over any
+    leading dimensions.
+    """
+    if mat.ndim == 2:
+        return np.dot(vec, mat)
+    return np.matmul(vec[..., np.newaxis, :], mat)[..., 0, :]
+
 def multiply(m1, m2):
     """Multiply two matricies, m1 . m2.
 
@@ -246,22 +338,33 @@ def multiply(m1, m2):
     """
     return np.dot(m1, m2)
 
-def create_perspective_projection(fovy, aspect, near, far, dtype=None):
+@parameters_as_numpy_arrays('fovy', 'aspect', 'near', 'far')
+def create_perspective_projection(fovy, aspect, near, far, dtype=None, out=None, reverse_z=False):
     """Creates perspective projection matrix.
 
     .. seealso:: http://www.opengl.org/sdk/docs/man2/xhtml/gluPerspective.xml
     .. seealso:: http://www.geeks3d.com/20090729/howto-perspective-projection-matrix-in-opengl/
 
+    The parameters may be arrays, in which case an array of matrices
+    with shape (N,4,4) is returned.
+
     :param float fovy: field of view in y direction in degrees
     :param float aspect: aspect ratio of the view (width / height)
     :param float near: distance from the viewer to the near clipping plane (only positive)
-    :param float far: distance from the viewer to the far clipping plane (only positive)
+    :param float far: distance from the viewer to the far clipping plane (only positive).
+        May be numpy.inf for an infinite far plane.
+    :param numpy.array out: Optional array to store the result in.
+    :param boolean reverse_z: If True, depth is mapped to the range [1,0]
+        from the near to the far plane, instead of [-1,1].
     :rtype: numpy.array
     :return: A projection matrix representing the specified perpective.
     """
     ymax = near * np.tan(fovy * np.pi / 360.0)
     xmax = ymax * aspect
-    return create_perspective_projection_from_bounds(-xmax, xmax, -ymax, ymax, near, far, dtype=dtype)
+    return create_perspective_projection_from_bounds(
+        -xmax, xmax, -ymax, ymax, near, far,
+        dtype=dtype, out=out, reverse_z=reverse_z
+    )
 
 def create_perspective_projection_matrix(fovy, aspect, near, far, dtype=None):    # TDOO: mark as deprecated
     """Creates perspective projection matrix.
@@ -278,6 +381,7 @@ def create_perspective_projection_matrix(fovy, aspect, near, far, dtype=None):
     """
     return create_perspective_projection(fovy, aspect, near, far, dtype)
 
+@parameters_as_numpy_arrays('left', 'right', 'bottom', 'top', 'near', 'far')
 def create_perspective_projection_from_bounds(
     left,
     right,
@@ -285,11 +389,16 @@ def create_perspective_projection_from_bounds(
     top,
     near,
     far,
-    dtype=None
+    dtype=None,
+    out=None,
+    reverse_z=False
 ):
     """Creates a perspective projection matrix using the specified near
     plane dimensions.
 
+    The parameters may be arrays, in which case an array of matrices
+    with shape (N,4,4) is returned.
+
     :param float left: The left of the near plane relative to the plane's centre.
     :param float right: The right of the near plane relative to the plane's centre.
     :param float top: The top of the near plane relative to the plane's centre.
@@ -298,6 +407,10 @@ def create_perspective_projection_from_bounds(
         It is recommended that the near plane is set to 1.0 or above to avoid rendering issues
         at close range.
     :param float far: The distance of the far plane from the camera's origin.
+        May be numpy.inf for an infinite far plane.
+    :param numpy.array out: Optional array to store the result in.
+    :param boolean reverse_z: If True, depth is mapped to the range [1,0]
+        from the near to the far plane, instead of [-1,1].
     :rtype: numpy.array
     :return: A projection matrix representing the specified perspective.
 
@@ -317,20 +430,40 @@ def create_perspective_projection_from_bounds(
     D = -2*far*near/(far-near)
     E = 2*near/(right-left)
     F = 2*near/(top-bottom)
+
+    As far approaches infinity, C = -1 and D = -2*near.
+
+    With reverse_z:
+    C = near/(far-near)
+    D = far*near/(far-near)
+
+    As far approaches infinity, C = 0 and D = near.
     """
     A = (right + left) / (right - left)
     B = (top + bottom) / (top - bottom)
-    C = -(far + near) / (far - near)
-    D = -2. * far * near / (far - near)
     E = 2. * near / (right - left)
     F = 2. * near / (top - bottom)
 
-    return np.array((
-        (  E, 0., 0., 0.),
-        ( 0.,  F, 0., 0.),
-        (  A,  B,  C,-1.),
-        ( 0., 0.,  D, 0.),
-    ), dtype=dtype)
+    # infinite far planes use the limit of C and D
+    # far is replaced so the unused terms do not produce inf / inf
+    infinite = np.isinf(far)
+    far = np.where(infinite, 2. * near + 1., far)
+    if reverse_z:
+        C = np.where(infinite, 0., near / (far - near))
+        D = np.where(infinite, near, far * near / (far - near))
+    else:
+        C = np.where(infinite, -1., -(far + near) / (far - near))
+        D = np.where(infinite, -2. * near, -2. * far * near / (far - near))
+
+    mat = _create_zeros(np.broadcast(A, B, C, D, E, F).shape, dtype, out)
+    mat[..., 0, 0] = E
+    mat[..., 1, 1] = F
+    mat[..., 2, 0] = A
+    mat[..., 2, 1] = B
+    mat[..., 2, 2] = C
+    mat[..., 2, 3] = -1.
+    mat[..., 3, 2] = D
+    return mat
 
 def create_perspective_projection_matrix_from_bounds(
     left, right, bottom, top, near, far, dtype=None):    # TDOO: mark as deprecated
@@ -369,6 +502,7 @@ def create_perspective_projection_matrix_from_bounds(
         left, right, bottom, top, near, far, dtype
     )
 
+@parameters_as_numpy_arrays('left', 'right', 'bottom', 'top', 'near', 'far')
 def create_orthogonal_projection(
     left,
     right,
@@ -376,10 +510,15 @@ def create_orthogonal_projection(
     top,
     near,
     far,
-    dtype=None
+    dtype=None,
+    out=None,
+    reverse_z=False
 ):
     """Creates an orthogonal projection matrix.
 
+    The parameters may be arrays, in which case an array of matrices
+    with shape (N,4,4) is returned.
+
     :param float left: The left of the near plane relative to the plane's centre.
     :param float right: The right of the near plane relative to the plane's centre.
     :param float top: The top of the near plane relative to the plane's centre.
@@ -388,6 +527,9 @@ def create_orthogonal_projection(
         It is recommended that the near plane is set to 1.0 or above to avoid rendering issues
         at close range.
     :param float far: The distance of the far plane from the camera's origin.
+    :param numpy.array out: Optional array to store the result in.
+    :param boolean reverse_z: If True, depth is mapped to the range [1,0]
+        from the near to the far plane, instead of [-1,1].
     :rtype: numpy.array
     :return: A projection matrix representing the specified orthogonal perspective.
 
@@ -407,6 +549,10 @@ def create_orthogonal_projection(
     Tx = (right + left) / (right - left)
     Ty = (top + bottom) / (top - bottom)
     Tz = (far + near) / (far - near)
+
+    With reverse_z:
+    C = 1 / (far - near)
+    Tz = far / (far - near)
     """
     rml = right - left
     tmb = top - bottom
@@ -414,17 +560,24 @@ def create_orthogonal_projection(
 
     A = 2. / rml
     B = 2. / tmb
-    C = -2. / fmn
     Tx = -(right + left) / rml
     Ty = -(top + bottom) / tmb
-    Tz = -(far + near) / fmn
-
-    return np.array((
-        ( A, 0., 0., 0.),
-        (0.,  B, 0., 0.),
-        (0., 0.,  C, 0.),
-        (Tx, Ty, Tz, 1.),
-    ), dtype=dtype)
+    if reverse_z:
+        C = 1. / fmn
+        Tz = far / fmn
+    else:
+        C = -2. / fmn
+        Tz = -(far + near) / fmn
+
+    mat = _create_zeros(np.broadcast(A, B, C, Tx, Ty, Tz).shape, dtype, out)
+    mat[..., 0, 0] = A
+    mat[..., 1, 1] = B
+    mat[..., 2, 2] = C
+    mat[..., 3, 0] = Tx
+    mat[..., 3, 1] = Ty
+    mat[..., 3, 2] = Tz
+    mat[..., 3, 3] = 1.
+    return mat
 
 def create_orthogonal_projection_matrix(
     left, right, bottom, top, near, far, dtype=None):    # TDOO: mark as deprecated
@@ -462,15 +615,21 @@ def create_orthogonal_projection_matrix(
         left, right, bottom, top, near, far, dtype
     )
 
-def create_look_at(eye, target, up, dtype=None):
+def create_look_at(eye, target, up, dtype=None, out=None):
     """Creates a look at matrix according to OpenGL standards.
 
     :param numpy.array eye: Position of the camera in world coordinates.
     :param numpy.array target: The position in world coordinates that the
         camera is looking at.
     :param numpy.array up: The up vector of the camera.
+    :param numpy.array out: Optional array to store the result in.
     :rtype: numpy.array
     :return: A look at matrix that can be used as a viewMatrix
+
+    Supports arrays of cameras, ie. (N,3) eye, target and up vectors
+    will produce an (N,4,4) array of matrices.
+    The vectors are broadcast against one another, so a single up vector
+    can be used for every camera.
     """
 
     eye = np.asarray(eye)
@@ -481,12 +640,14 @@ def create_look_at(eye, target, up, dtype=None):
     side = vector.normalize(np.cross(forward, up))
     up = vector.normalize(np.cross(side, forward))
 
-    return np.array((
-            (side[0], up[0], -forward[0], 0.),
-            (side[1], up[1], -forward[1], 0.),
-            (side[2], up[2], -forward[2], 0.),
-            (-np.dot(side, eye), -np.dot(up, eye), np.dot(forward, eye), 1.0)
-        ), dtype=dtype)
+    mat = _create_affine(side.shape[:-1], dtype, out)
+    mat[..., 0:3, 0] = side
+    mat[..., 0:3, 1] = up
+    mat[..., 0:3, 2] = -forward
+    mat[..., 3, 0] = -np.sum(side * eye, axis=-1)
+    mat[..., 3, 1] = -np.sum(up * eye, axis=-1)
+    mat[..., 3, 2] = np.sum(forward * eye, axis=-1)
+    return mat
 
 
 def inverse(m):
@@ -502,11 +663,88 @@ def inverse(m):
     """
     return np.linalg.inv(m)
 
+@parameters_as_numpy_arrays('m')
+def inverse_affine(m, out=None):
+    """Returns the inverse of an affine matrix.
+
+    The matrix is assumed to be affine, ie. the right column is (0,0,0,1).
+    The upper 3x3 is inverted in closed form and the translation is
+    transformed by the inverted 3x3. This is considerably faster than
+    a general matrix inverse.
+
+    Supports arrays of matrices with shape (N,4,4).
+    The upper 3x3 must not be singular.
+
+    :param numpy.array m: An affine matrix.
+    :param numpy.array out: Optional array to store the result in.
+        This may be m itself to invert the matrix in place.
+    :rtype: numpy.array
+    :return: The inverse of the specified matrix.
+    """
+    # the inverse of a 3x3 is its adjugate divided by its determinant
+    # the columns of the adjugate are the cross products of the rows
+    a, b, c = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    d, e, f = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    g, h, i = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+
+    c00 = e * i - f * h
+    c10 = f * g - d * i
+    c20 = d * h - e * g
+    c01 = h * c - i * b
+    c11 = i * a - g * c
+    c21 = g * b - h * a
+    c02 = b * f - c * e
+    c12 = c * d - a * f
+    c22 = a * e - b * d
+    invdet = 1. / (a * c00 + b * c10 + c * c20)
+    translation = -m[..., 3, 0:3]
+
+    mat = _create_affine(m.shape[:-2], np.result_type(m, float), out)
+    mat[..., 0, 0] = c00 * invdet
+    mat[..., 1, 0] = c10 * invdet
+    mat[..., 2, 0] = c20 * invdet
+    mat[..., 0, 1] = c01 * invdet
+    mat[..., 1, 1] = c11 * invdet
+    mat[..., 2, 1] = c21 * invdet
+    mat[..., 0, 2] = c02 * invdet
+    mat[..., 1, 2] = c12 * invdet
+    mat[..., 2, 2] = c22 * invdet
+    mat[..., 3, 0:3] = _multiply_vectors(translation, mat[..., 0:3, 0:3])
+    return mat
+
+@parameters_as_numpy_arrays('m')
+def inverse_rigid(m, out=None):
+    """Returns the inverse of a rigid body matrix.
+
+    The matrix is assumed to contain only a rotation and a translation,
+    such as a view matrix. The rotation is transposed and the translation
+    is transformed by the transposed rotation.
+    Matrices with scale or skew will not be inverted correctly, use
+    inverse_affine for these.
+
+    Supports arrays of matrices with shape (N,4,4).
+
+    :param numpy.array m: A rigid body matrix.
+    :param numpy.array out: Optional array to store the result in.
+        This may be m itself to invert the matrix in place.
+    :rtype: numpy.array
+    :return: The inverse of the specified matrix.
+    """
+    translation = -m[..., 3, 0:3]
+
+    mat = _create_affine(m.shape[:-2], np.result_type(m, float), out)
+    mat[..., 0:3, 0:3] = np.swapaxes(m[..., 0:3, 0:3], -1, -2)
+    mat[..., 3, 0:3] = _multiply_vectors(translation, mat[..., 0:3, 0:3])
+    return mat
+
 
 def decompose(m):
     """Decomposes an affine transformation matrix into its scale, rotation and
     translation components.
 
+    Supports arrays of matrices, ie. an (N,4,4) array will produce
+    (N,3) scales, (N,4) rotations and (N,3) translations.
+
     :param numpy.array m: A matrix.
     :return: tuple (scale, rotation, translation)
         numpy.array scale vector3
@@ -515,14 +753,15 @@ def decompose(m):
     """
     m = np.asarray(m)
 
-    scale = np.linalg.norm(m[:3, :3], axis=1)
+    scale = np.linalg.norm(m[..., :3, :3], axis=-1)
 
-    det = np.linalg.det(m)
-    if det < 0:
-        scale[0] *= -1
+    # a negative determinant means the matrix contains a reflection
+    # which is folded into the x scale
+    det = np.linalg.det(m[..., :3, :3])
+    scale[..., 0] = np.where(det < 0, -scale[..., 0], scale[..., 0])
 
-    position = m[3, :3]
+    position = m[..., 3, :3]
 
-    rotation = m[:3, :3] * (1 / scale)[:, None]
+    rotation = m[..., :3, :3] * (1 / scale)[..., np.newaxis]
 
     return scale, quaternion.create_from_matrix(rotation), position
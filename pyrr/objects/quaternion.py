@@ -266,6 +266,12 @@ class Quaternion(BaseQuaternion):
         """
         return Quaternion(quaternion.lerp(self, other, t))
 
+    def nlerp(self, other, t):
+        """Interpolates between quat1 and quat2 by t along the shortest path.
+        The parameter t is clamped to the range [0, 1]
+        """
+        return Quaternion(quaternion.nlerp(self, other, t))
+
     def slerp(self, other, t):
         """Spherically interpolates between quat1 and quat2 by t.
         The parameter t is clamped to the range [0, 1]
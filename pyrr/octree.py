@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for storing objects with AABBs in a loose octree
+and querying them.
+
+An octree recursively divides a cube into 8 child cubes. Each object is
+stored in a single node, at the depth where the node is about the size
+of the object and in the node whose cube contains the object's centre.
+
+In a loose octree, each node's bounds are enlarged by the looseness
+factor. With the default looseness of 2, a node's bounds extend half its
+width beyond its cube on every side, so an object always fits the node
+chosen for it. Placing an object therefore only requires its size and
+centre, rather than a search down the tree, and small movements rarely
+change the node an object is stored in. This makes insert, remove and
+move cheap.
+
+Nodes and objects are stored in flat numpy arrays rather than Python
+objects. Objects are AABBs in the format used by the aabb module, an
+AAMBB may also be used as it is an AABB. Each object is identified by a
+non-negative integer id chosen by the caller.
+
+Queries traverse the tree a level at a time for a whole batch of queries,
+only descending into nodes whose bounds pass the query and which contain
+objects.
+
+.. seealso: https://anteru.net/blog/2008/loose-octrees/
+"""
+from __future__ import absolute_import, division, print_function
+import numpy as np
+from .utils import _segments
+from . import frustum as frustum_module
+from . import geometric_tests
+
+
+class Octree(object):
+    """The arrays that make up a loose octree.
+
+    Use the functions in this module to modify the octree, rather than
+    modifying the arrays directly.
+
+    :ivar numpy.array centre: The centre of the root node.
+    :ivar float half_size: Half of the width of the root node.
+    :ivar int max_depth: The maximum depth of the tree, the root being 0.
+    :ivar float looseness: The factor the nodes' bounds are enlarged by.
+    :ivar numpy.array ids: The id of the object in each slot, or -1 if the
+        slot is free.
+    :ivar numpy.array aabbs: The (S,2,3) AABB of the object in each slot.
+    :ivar numpy.array node: The node containing the object in each slot.
+    :ivar numpy.array slots: The slot of each object id, or -1.
+    :ivar numpy.array keys: The key of each node, see _key.
+    :ivar numpy.array bounds: The (M,2,3) loose bounds of each node.
+    :ivar numpy.array parent: The parent of each node, -1 for the root.
+    :ivar numpy.array children: The (M,8) children of each node, -1 for none.
+    :ivar numpy.array count: The number of objects within each node and
+        its descendants.
+    """
+    __slots__ = (
+        'centre', 'half_size', 'max_depth', 'looseness',
+        'ids', 'aabbs', 'node', 'slots',
+        'keys', 'bounds', 'parent', 'children', 'count',
+        '_key_order', '_objects',
+    )
+
+    def __init__(self, centre, half_size, max_depth, looseness, dtype):
+        self.centre = centre
+        self.half_size = half_size
+        self.max_depth = max_depth
+        self.looseness = looseness
+
+        self.ids = np.empty(0, dtype=int)
+        self.aabbs = np.empty((0, 2, 3), dtype=dtype)
+        self.node = np.empty(0, dtype=int)
+        self.slots = np.empty(0, dtype=int)
+
+        # the root node
+        self.keys = np.zeros(1, dtype=np.int64)
+        self.bounds = np.array([[
+            centre - looseness * half_size,
+            centre + looseness * half_size,
+        ]], dtype=dtype)
+        self.parent = np.full(1, -1)
+        self.children = np.full((1, 8), -1)
+        self.count = np.zeros(1, dtype=int)
+
+        self._key_order = np.zeros(1, dtype=int)
+        self._objects = None
+
+    def __len__(self):
+        return int(self.count[0])
+
+
+# node keys pack the depth and the integer coordinates of the node's cube
+_BITS = 16
+
+def _key(depth, cells):
+    cells = cells.astype(np.int64)
+    return (
+        (np.asarray(depth, dtype=np.int64) << (3 * _BITS)) |
+        (cells[..., 0] << (2 * _BITS)) |
+        (cells[..., 1] << _BITS) |
+        cells[..., 2]
+    )
+
+def _decode(keys):
+    mask = (1 << _BITS) - 1
+    depth = keys >> (3 * _BITS)
+    cells = np.stack([(keys >> (2 * _BITS)) & mask, (keys >> _BITS) & mask, keys & mask], axis=-1)
+    return depth, cells
+
+def create(bounds, max_depth=8, looseness=2., dtype=None):
+    """Creates an empty loose octree.
+
+    :param numpy.array bounds: An AABB of the region objects will usually
+        be in. The root node is the cube which encloses it. Objects
+        outside of the root node are stored in the root node.
+    :param int max_depth: The maximum depth of the tree, at most 16.
+    :param float looseness: The factor the nodes' bounds are enlarged by,
+        which must be greater than 1.
+    :param numpy.dtype dtype: The dtype of the stored AABBs, float64 by
+        default.
+    :rtype: Octree
+    :return: The octree.
+    """
+    if not 0 <= max_depth <= _BITS:
+        raise ValueError('max_depth must be between 0 and {}'.format(_BITS))
+    if looseness <= 1.:
+        raise ValueError('looseness must be greater than 1')
+
+    bounds = np.asarray(bounds, dtype=dtype or np.float64)
+    centre = (bounds[0] + bounds[1]) * 0.5
+    half_size = float(np.max(bounds[1] - bounds[0])) * 0.5
+    return Octree(centre, half_size, max_depth, float(looseness), bounds.dtype)
+
+def _place(octree, aabbs):
+    """Returns the depth and cell of the node each AABB belongs in.
+    """
+    centre = (aabbs[:, 0] + aabbs[:, 1]) * 0.5
+    extent = np.max(aabbs[:, 1] - aabbs[:, 0], axis=-1) * 0.5
+
+    # an object fits a node if its centre is within the node's cube
+    # and its extent is not larger than the node's extra looseness
+    room = (octree.looseness - 1.) * octree.half_size
+    with np.errstate(divide='ignore'):
+        depth = np.floor(np.log2(room / extent))
+    depth = np.clip(np.nan_to_num(depth, posinf=octree.max_depth), 0, octree.max_depth).astype(np.int64)
+
+    # objects outside of the root are stored in the root
+    relative = (centre - (octree.centre - octree.half_size)) / (2. * octree.half_size)
+    inside = np.all((relative >= 0.) & (relative < 1.), axis=-1)
+    depth[~inside] = 0
+
+    size = (1 << depth)[:, np.newaxis]
+    cells = np.clip(np.floor(relative * size), 0, size - 1).astype(np.int64)
+    return depth, cells
+
+def _lookup(octree, keys):
+    """Returns the index of each node key, and whether it was found.
+    """
+    sorted_keys = octree.keys[octree._key_order]
+    index = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    found = sorted_keys[index] == keys
+    return octree._key_order[index], found
+
+def _create_nodes(octree, depth, cells):
+    """Creates any missing nodes, and their ancestors, and returns the
+    index of each node.
+    """
+    keys = _key(depth, cells)
+    index, found = _lookup(octree, keys)
+    if np.all(found):
+        return index
+
+    depth, cells = depth[~found], cells[~found]
+    for d in range(1, int(np.max(depth)) + 1):
+        # the ancestors at depth d which don't exist yet
+        below = depth >= d
+        ancestors = np.unique(_key(d, cells[below] >> (depth[below] - d)[:, np.newaxis]))
+        new = ancestors[~_lookup(octree, ancestors)[1]]
+        if len(new) == 0:
+            continue
+        _, new_cells = _decode(new)
+        parent = _lookup(octree, _key(d - 1, new_cells >> 1))[0]
+
+        half_size = octree.half_size / (1 << d)
+        centre = octree.centre - octree.half_size + (new_cells + 0.5) * (2. * half_size)
+        first = len(octree.keys)
+        nodes = np.arange(first, first + len(new))
+
+        octree.keys = np.concatenate([octree.keys, new])
+        octree.bounds = np.concatenate([octree.bounds, np.stack([
+            centre - octree.looseness * half_size,
+            centre + octree.looseness * half_size,
+        ], axis=1).astype(octree.bounds.dtype)])
+        octree.parent = np.concatenate([octree.parent, parent])
+        octree.children = np.concatenate([octree.children, np.full((len(new), 8), -1)])
+        octree.count = np.concatenate([octree.count, np.zeros(len(new), dtype=int)])
+        octree.children[parent, (new_cells[:, 0] & 1) << 2 | (new_cells[:, 1] & 1) << 1 | (new_cells[:, 2] & 1)] = nodes
+        octree._key_order = np.argsort(octree.keys, kind='mergesort')
+
+    return _lookup(octree, keys)[0]
+
+def _add_counts(octree, nodes, delta):
+    """Adds delta to the count of each node and its ancestors.
+    """
+    while len(nodes):
+        np.add.at(octree.count, nodes, delta)
+        nodes = octree.parent[nodes]
+        nodes = nodes[nodes >= 0]
+
+def _slots(octree, ids):
+    """Returns the slots of the objects, which must be in the octree.
+    """
+    ids = np.asarray(ids, dtype=int)
+    valid = (ids >= 0) & (ids < len(octree.slots))
+    slots = np.where(valid, octree.slots[np.where(valid, ids, 0)], -1)
+    if np.any(slots < 0):
+        raise ValueError('Objects {} are not in the octree'.format(ids[slots < 0]))
+    return slots
+
+def insert(octree, ids, aabbs):
+    """Inserts objects into the octree.
+
+    :param Octree octree: The octree, this is modified in place.
+    :param numpy.array ids: The (N,) ids of the objects. Ids are non-negative
+        integers which must not already be in the octree. The memory used
+        grows with the largest id.
+    :param numpy.array aabbs: The (N,2,3) AABBs of the objects.
+    :rtype: Octree
+    :return: The octree.
+    """
+    ids = np.asarray(ids, dtype=int)
+    aabbs = np.asarray(aabbs)
+    if len(ids) == 0:
+        return octree
+    if np.any(ids < 0):
+        raise ValueError('Object ids must be non-negative')
+    if len(np.unique(ids)) != len(ids):
+        raise ValueError('Object ids must be unique')
+
+    if np.max(ids) >= len(octree.slots):
+        octree.slots = np.concatenate([octree.slots, np.full(np.max(ids) + 1 - len(octree.slots), -1)])
+    if np.any(octree.slots[ids] >= 0):
+        raise ValueError('Objects {} are already in the octree'.format(ids[octree.slots[ids] >= 0]))
+
+    # reuse free slots, growing the arrays if there aren't enough
+    free = np.flatnonzero(octree.ids < 0)
+    if len(free) < len(ids):
+        grow = max(len(ids) - len(free), len(octree.ids))
+        octree.ids = np.concatenate([octree.ids, np.full(grow, -1)])
+        octree.aabbs = np.concatenate([octree.aabbs, np.zeros((grow, 2, 3), dtype=octree.aabbs.dtype)])
+        octree.node = np.concatenate([octree.node, np.full(grow, -1)])
+        free = np.flatnonzero(octree.ids < 0)
+    slots = free[:len(ids)]
+
+    nodes = _create_nodes(octree, *_place(octree, aabbs))
+    octree.ids[slots] = ids
+    octree.slots[ids] = slots
+    octree.aabbs[slots] = aabbs
+    octree.node[slots] = nodes
+    _add_counts(octree, nodes, 1)
+    octree._objects = None
+    return octree
+
+def remove(octree, ids):
+    """Removes objects from the octree.
+
+    Nodes which become empty are kept, but are skipped by queries.
+
+    :param Octree octree: The octree, this is modified in place.
+    :param numpy.array ids: The (N,) ids of the objects to remove.
+    :rtype: Octree
+    :return: The octree.
+    """
+    slots = _slots(octree, ids)
+    _add_counts(octree, octree.node[slots], -1)
+    octree.slots[octree.ids[slots]] = -1
+    octree.ids[slots] = -1
+    octree.node[slots] = -1
+    octree._objects = None
+    return octree
+
+def move(octree, ids, aabbs):
+    """Updates the AABBs of objects in the octree.
+
+    Objects are only moved to another node if they leave their node's
+    cube or change size significantly.
+
+    :param Octree octree: The octree, this is modified in place.
+    :param numpy.array ids: The (N,) ids of the objects to move.
+    :param numpy.array aabbs: The new (N,2,3) AABBs of the objects.
+    :rtype: Octree
+    :return: The octree.
+    """
+    slots = _slots(octree, ids)
+    aabbs = np.asarray(aabbs)
+    octree.aabbs[slots] = aabbs
+
+    nodes = _create_nodes(octree, *_place(octree, aabbs))
+    changed = nodes != octree.node[slots]
+    if np.any(changed):
+        _add_counts(octree, octree.node[slots[changed]], -1)
+        _add_counts(octree, nodes[changed], 1)
+        octree.node[slots[changed]] = nodes[changed]
+        octree._objects = None
+    return octree
+
+def _objects(octree):
+    """Returns the slots of the objects sorted by node, and the offset
+    and number of objects of each node within them.
+
+    This is rebuilt when objects have changed node since the last query.
+    """
+    if octree._objects is None:
+        used = np.flatnonzero(octree.ids >= 0)
+        order = used[np.argsort(octree.node[used], kind='mergesort')]
+        count = np.bincount(octree.node[order], minlength=len(octree.keys))
+        octree._objects = (order, np.cumsum(count) - count, count)
+    return octree._objects
+
+def _traverse(octree, n, test):
+    """Finds the objects whose AABBs pass the test for each query.
+
+    :param int n: The number of queries.
+    :param function test: A function which takes an array of query indices
+        and an array of AABBs and returns a mask of those that pass.
+    :rtype: tuple
+    :return: The query indices and object slots of each pair that passes.
+    """
+    order, start, count = _objects(octree)
+    query = np.arange(n)
+    node = np.zeros(n, dtype=int)
+    found_query, found_slot = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)]
+    while len(query):
+        # objects outside of the root are stored in the root,
+        # so it is always searched
+        hit = test(query, octree.bounds[node]) | (node == 0)
+        query, node = query[hit], node[hit]
+
+        segment, _, position = _segments(start[node], count[node])
+        found_query.append(query[segment])
+        found_slot.append(order[position])
+
+        # descend into children which contain objects
+        children = octree.children[node]
+        valid = children >= 0
+        valid[valid] = octree.count[children[valid]] > 0
+        query = np.repeat(query, np.sum(valid, axis=-1))
+        node = children[valid]
+
+    query = np.concatenate(found_query)
+    slot = np.concatenate(found_slot)
+    hit = test(query, octree.aabbs[slot])
+    return query[hit], slot[hit]
+
+def intersect_aabbs(octree, aabbs):
+    """Finds the objects which overlap each query AABB.
+
+    :param Octree octree: The octree to query.
+    :param numpy.array aabbs: The (B,2,3) AABBs to query with.
+    :rtype: tuple
+    :return: A tuple of (query index, object id) arrays, with one entry
+        per overlapping pair. Sorted by query and then by id.
+    """
+    aabbs = np.asarray(aabbs)
+
+    def test(query, other):
+        q = aabbs[query]
+        return np.all((q[:, 0] <= other[:, 1]) & (other[:, 0] <= q[:, 1]), axis=-1)
+
+    query, slot = _traverse(octree, len(aabbs), test)
+    ids = octree.ids[slot]
+    order = np.lexsort((ids, query))
+    return query[order], ids[order]
+
+def intersect_rays(octree, rays):
+    """Finds the objects hit by each ray.
+
+    :param Octree octree: The octree to query.
+    :param numpy.array rays: The (R,2,3) rays.
+    :rtype: tuple
+    :return: A tuple of (ray index, object id, t) arrays, with one entry
+        per hit. t is the distance along the ray to the object's AABB,
+        or 0 if the ray starts inside it. Sorted by ray and then by t.
+    """
+    rays = np.asarray(rays)
+
+    def test(query, aabbs):
+        return geometric_tests.rays_intersect_aabbs(rays[query], aabbs)[0]
+
+    ray, slot = _traverse(octree, len(rays), test)
+    t = np.maximum(geometric_tests.rays_intersect_aabbs(rays[ray], octree.aabbs[slot])[1], 0.)
+    ids = octree.ids[slot]
+    order = np.lexsort((t, ray))
+    return ray[order], ids[order], t[order]
+
+def intersect_frustum(octree, frustum):
+    """Finds the objects which are inside or intersect a frustum.
+
+    As with frustum.classify_aabbs, objects near the frustum's corners
+    may be reported even though they are just outside of it.
+
+    :param Octree octree: The octree to query.
+    :param numpy.array frustum: The (6,4) frustum planes, see the frustum
+        module.
+    :rtype: numpy.array
+    :return: The sorted ids of the objects.
+    """
+    frustum = np.asarray(frustum)
+
+    def test(query, aabbs):
+        return ~frustum_module.classify_aabbs(frustum, aabbs)[1]
+
+    _, slot = _traverse(octree, 1, test)
+    return np.sort(octree.ids[slot])
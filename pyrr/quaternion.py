@@ -21,79 +21,149 @@ class index:
     w = 3
 
 
-def create(x=0., y=0., z=0., w=1., dtype=None):
-    return np.array([x, y, z, w], dtype=dtype)
-
-def create_from_x_rotation(theta, dtype=None):
-    thetaOver2 = theta * 0.5
-
-    return np.array(
-        [
-            np.sin(thetaOver2),
-            0.0,
-            0.0,
-            np.cos(thetaOver2)
-        ],
-        dtype=dtype
-    )
+def _create_zeros(shape, dtype, out):
+    """Returns an array of quaternions with all values set to 0.
+    """
+    if out is None:
+        return np.zeros(shape + (4,), dtype=dtype)
+    out[...] = 0.
+    return out
+
+def create(x=0., y=0., z=0., w=1., dtype=None, out=None):
+    if out is None:
+        shape = np.broadcast(x, y, z, w).shape
+        if not shape:
+            return np.array([x, y, z, w], dtype=dtype)
+        out = np.empty(shape + (4,), dtype=dtype or np.result_type(x, y, z, w))
+    out[..., 0] = x
+    out[..., 1] = y
+    out[..., 2] = z
+    out[..., 3] = w
+    return out
+
+def create_from_x_rotation(theta, dtype=None, out=None):
+    thetaOver2 = np.asarray(theta) * 0.5
+
+    quat = _create_zeros(thetaOver2.shape, dtype, out)
+    quat[..., 0] = np.sin(thetaOver2)
+    quat[..., 3] = np.cos(thetaOver2)
+    return quat
 
-def create_from_y_rotation(theta, dtype=None):
-    thetaOver2 = theta * 0.5
+def create_from_y_rotation(theta, dtype=None, out=None):
+    thetaOver2 = np.asarray(theta) * 0.5
 
-    return np.array(
-        [
-            0.0,
-            np.sin(thetaOver2),
-            0.0,
-            np.cos(thetaOver2)
-        ],
-        dtype=dtype
-    )
+    quat = _create_zeros(thetaOver2.shape, dtype, out)
+    quat[..., 1] = np.sin(thetaOver2)
+    quat[..., 3] = np.cos(thetaOver2)
+    return quat
 
-def create_from_z_rotation(theta, dtype=None):
-    thetaOver2 = theta * 0.5
+def create_from_z_rotation(theta, dtype=None, out=None):
+    thetaOver2 = np.asarray(theta) * 0.5
 
-    return np.array(
-        [
-            0.0,
-            0.0,
-            np.sin(thetaOver2),
-            np.cos(thetaOver2)
-        ],
-        dtype=dtype
-    )
+    quat = _create_zeros(thetaOver2.shape, dtype, out)
+    quat[..., 2] = np.sin(thetaOver2)
+    quat[..., 3] = np.cos(thetaOver2)
+    return quat
 
 @parameters_as_numpy_arrays('axis')
-def create_from_axis_rotation(axis, theta, dtype=None):
+def create_from_axis_rotation(axis, theta, dtype=None, out=None):
+    """Creates a quaternion from a rotation of theta around an axis.
+
+    Supports arrays of axes and angles, ie. (N,3) axes and (N,) angles
+    will produce an (N,4) array of quaternions.
+    Axes which are not unit length are normalized.
+    """
     dtype = dtype or axis.dtype
-    # make sure the vector is normalized
-    if not np.isclose(np.linalg.norm(axis), 1.):
-        axis = vector.normalize(axis)
+    # make sure the vectors are normalized
+    axis = vector._normalize_non_unit(axis)
 
-    thetaOver2 = theta * 0.5
+    thetaOver2 = np.asarray(theta) * 0.5
     sinThetaOver2 = np.sin(thetaOver2)
 
-    return np.array(
-        [
-            sinThetaOver2 * axis[0],
-            sinThetaOver2 * axis[1],
-            sinThetaOver2 * axis[2],
-            np.cos(thetaOver2)
-        ],
-        dtype=dtype
+    return create(
+        sinThetaOver2 * axis[..., 0],
+        sinThetaOver2 * axis[..., 1],
+        sinThetaOver2 * axis[..., 2],
+        np.cos(thetaOver2),
+        dtype=dtype,
+        out=out
     )
 
 @parameters_as_numpy_arrays('axis')
-def create_from_axis(axis, dtype=None):
+def create_from_axis(axis, dtype=None, out=None):
+    """Creates a quaternion from an axis scaled by the rotation angle,
+    ie. a rotation vector.
+
+    Supports arrays of rotation vectors with shape (..., 3).
+    A zero length axis produces an identity quaternion.
+    """
     dtype = dtype or axis.dtype
-    theta = np.linalg.norm(axis)
-    return create_from_axis_rotation(axis, theta, dtype)
+    theta = np.sqrt(np.sum(axis * axis, axis=-1))
+
+    # the axis is normalized as part of the scale, sin(theta / 2) / theta
+    thetaOver2 = theta * 0.5
+    scale = np.sin(thetaOver2) / np.where(theta > 0., theta, 1.)
+
+    return create(
+        scale * axis[..., 0],
+        scale * axis[..., 1],
+        scale * axis[..., 2],
+        np.cos(thetaOver2),
+        dtype=dtype,
+        out=out
+    )
+
+def _create_from_matrices(mat, dtype=None, out=None):
+    """Creates quaternions from an array of rotation matrices.
+
+    This is the batched equivalent of create_from_matrix. Each matrix is
+    converted with the same branch the scalar version would select, using
+    masks instead of Python branches.
+    """
+    dtype = dtype or mat.dtype
+
+    m00, m01, m02 = mat[..., 0, 0], mat[..., 0, 1], mat[..., 0, 2]
+    m10, m11, m12 = mat[..., 1, 0], mat[..., 1, 1], mat[..., 1, 2]
+    m20, m21, m22 = mat[..., 2, 0], mat[..., 2, 1], mat[..., 2, 2]
+    trace = m00 + m11 + m22
+
+    # select the branch for the largest of the trace and diagonal terms
+    b0 = trace > 0
+    b1 = ~b0 & (m00 > m11) & (m00 > m22)
+    b2 = ~b0 & ~b1 & (m11 > m22)
+
+    # every branch divides by s, which is 4 * the largest component
+    # that component is written as (s * s / 4) / s so the divide can be shared
+    ss = 1.0 + np.where(b0, trace,
+        np.where(b1, m00 - m11 - m22,
+        np.where(b2, m11 - m00 - m22,
+            m22 - m00 - m11)))
+    s = 2.0 * np.sqrt(ss)
+
+    d21, d02, d10 = m21 - m12, m02 - m20, m10 - m01
+    s01, s02, s12 = m01 + m10, m02 + m20, m12 + m21
+
+    quat = np.empty(mat.shape[:-2] + (4,), dtype=dtype) if out is None else out
+    quat[..., 0] = np.where(b0, d21, np.where(b1, ss, np.where(b2, s01, s02))) / s
+    quat[..., 1] = np.where(b0, d02, np.where(b1, s01, np.where(b2, ss, s12))) / s
+    quat[..., 2] = np.where(b0, d10, np.where(b1, s02, np.where(b2, s12, ss))) / s
+    quat[..., 3] = np.where(b0, ss, np.where(b1, d21, np.where(b2, d02, d10))) / s
+    return quat
 
 @parameters_as_numpy_arrays('mat')
-def create_from_matrix(mat, dtype=None):
+def create_from_matrix(mat, dtype=None, out=None):
+    """Creates a quaternion from a rotation matrix.
+
+    The matrix can be a matrix33 or matrix44.
+    Supports arrays of matrices, ie. an (N,3,3) or (N,4,4) array
+    will produce an (N,4) array of quaternions.
+    """
     # http://www.euclideanspace.com/maths/geometry/rotations/conversions/matrixToQuaternion/index.htm
     # optimised "alternative version" does not produce correct results
     # see issue #42
+    if mat.ndim > 2:
+        return _create_from_matrices(mat, dtype, out)
+
     dtype = dtype or mat.dtype
 
     trace = mat[0][0] + mat[1][1] + mat[2][2]
@@ -122,11 +192,10 @@ def create_from_matrix(mat, dtype=None):
         qz = 0.25 * s
         qw = (mat[1][0] - mat[0][1]) / s
 
-    quat = np.array([qx, qy, qz, qw], dtype=dtype)
-    return quat
+    return create(qx, qy, qz, qw, dtype=dtype, out=out)
 
 @parameters_as_numpy_arrays('eulers')
-def create_from_eulers(eulers, dtype=None):
+def create_from_eulers(eulers, dtype=None, out=None):
     """Creates a quaternion from a set of Euler angles.
 
     Eulers are an array of length 3 in the following order:
@@ -148,18 +217,17 @@ def create_from_eulers(eulers, dtype=None):
     sY = np.sin(halfYaw)
     cY = np.cos(halfYaw)
 
-    return np.array(
-        [
-            (sR * cP * cY) + (cR * sP * sY),
-            (cR * sP * cY) - (sR * cP * sY),
-            (cR * cP * sY) + (sR * sP * cY),
-            (cR * cP * cY) - (sR * sP * sY),
-        ],
-        dtype=dtype
+    return create(
+        (sR * cP * cY) + (cR * sP * sY),
+        (cR * sP * cY) - (sR * cP * sY),
+        (cR * cP * sY) + (sR * sP * cY),
+        (cR * cP * cY) - (sR * sP * sY),
+        dtype=dtype,
+        out=out
     )
 
 @parameters_as_numpy_arrays('eulers')
-def create_from_inverse_of_eulers(eulers, dtype=None):
+def create_from_inverse_of_eulers(eulers, dtype=None, out=None):
     """Creates a quaternion from the inverse of a set of Euler angles.
 
     Eulers are an array of length 3 in the following order:
@@ -181,18 +249,17 @@ def create_from_inverse_of_eulers(eulers, dtype=None):
     sinYaw = np.sin(halfYaw)
     cosYaw = np.cos(halfYaw)
 
-    return np.array(
-        [
-            # x = cy * sp * cr + sy * cp * sr
-            (cosYaw * sinPitch * cosRoll) + (sinYaw * cosPitch * sinRoll),
-            # y = -cy * sp * sr + sy * cp * cr
-            (-cosYaw * sinPitch * sinRoll) + (sinYaw * cosPitch * cosRoll),
-            # z = -sy * sp * cr + cy * cp * sr
-            (-sinYaw * sinPitch * cosRoll) + (cosYaw * cosPitch * sinRoll),
-            # w = cy * cp * cr + sy * sp * sr
-            (cosYaw * cosPitch * cosRoll) + (sinYaw * sinPitch * sinRoll)
-        ],
-        dtype=dtype
+    return create(
+        # x = cy * sp * cr + sy * cp * sr
+        (cosYaw * sinPitch * cosRoll) + (sinYaw * cosPitch * sinRoll),
+        # y = -cy * sp * sr + sy * cp * cr
+        (-cosYaw * sinPitch * sinRoll) + (sinYaw * cosPitch * cosRoll),
+        # z = -sy * sp * cr + cy * cp * sr
+        (-sinYaw * sinPitch * cosRoll) + (cosYaw * cosPitch * sinRoll),
+        # w = cy * cp * cr + sy * sp * sr
+        (cosYaw * cosPitch * cosRoll) + (sinYaw * sinPitch * sinRoll),
+        dtype=dtype,
+        out=out
     )
 
 @all_parameters_as_numpy_arrays
@@ -203,66 +270,91 @@ def cross(quat1, quat2):
 
     This is NOT the same as a vector cross-product.
     Quaternion cross-product is the equivalent of matrix multiplication.
+
+    Supports arrays of quaternions with shape (..., 4). The two
+    arguments are broadcast against one another.
     """
-    q1x, q1y, q1z, q1w = quat1
-    q2x, q2y, q2z, q2w = quat2
-
-    return np.array(
-        [
-             q1x * q2w + q1y * q2z - q1z * q2y + q1w * q2x,
-            -q1x * q2z + q1y * q2w + q1z * q2x + q1w * q2y,
-             q1x * q2y - q1y * q2x + q1z * q2w + q1w * q2z,
-            -q1x * q2x - q1y * q2y - q1z * q2z + q1w * q2w,
-        ],
-        dtype=quat1.dtype
-    )
+    q1x, q1y, q1z, q1w = quat1[..., 0], quat1[..., 1], quat1[..., 2], quat1[..., 3]
+    q2x, q2y, q2z, q2w = quat2[..., 0], quat2[..., 1], quat2[..., 2], quat2[..., 3]
+
+    result = np.empty(np.broadcast(quat1, quat2).shape, dtype=quat1.dtype)
+    result[..., 0] =  q1x * q2w + q1y * q2z - q1z * q2y + q1w * q2x
+    result[..., 1] = -q1x * q2z + q1y * q2w + q1z * q2x + q1w * q2y
+    result[..., 2] =  q1x * q2y - q1y * q2x + q1z * q2w + q1w * q2z
+    result[..., 3] = -q1x * q2x - q1y * q2y - q1z * q2z + q1w * q2w
+    return result
 
 def lerp(quat1, quat2, t):
     """Interpolates between quat1 and quat2 by t.
     The parameter t is clamped to the range [0, 1]
+
+    Supports arrays of quaternions with shape (N, 4).
+    t may be a scalar or an array of shape (N,).
     """
 
     quat1 = np.asarray(quat1)
     quat2 = np.asarray(quat2)
 
-    t = np.clip(t, 0, 1)
+    t = np.clip(t, 0, 1)[..., np.newaxis]
     return normalize(quat1 * (1 - t) + quat2 * t)
 
+def nlerp(quat1, quat2, t):
+    """Interpolates between quat1 and quat2 by t along the shortest path.
+    The parameter t is clamped to the range [0, 1]
+
+    This is the same as lerp, except quat2 is negated where required so
+    that the interpolation does not take the long way around the sphere.
+
+    Supports arrays of quaternions with shape (N, 4).
+    t may be a scalar or an array of shape (N,).
+    """
+
+    quat1 = np.asarray(quat1)
+    quat2 = np.asarray(quat2)
+
+    dot = vector4.dot(quat1, quat2)[..., np.newaxis]
+    quat3 = np.where(dot < 0.0, -quat2, quat2)
+    return lerp(quat1, quat3, t)
+
 def slerp(quat1, quat2, t):
     """Spherically interpolates between quat1 and quat2 by t.
     The parameter t is clamped to the range [0, 1]
+
+    Supports arrays of quaternions with shape (N, 4).
+    t may be a scalar or an array of shape (N,).
     """
 
     quat1 = np.asarray(quat1)
     quat2 = np.asarray(quat2)
 
     t = np.clip(t, 0, 1)
-    dot = vector4.dot(quat1, quat2)
+    dot = vector4.dot(quat1, quat2)[..., np.newaxis]
 
-    if dot < 0.0:
-        dot = -dot
-        quat3 = -quat2
+    # take the shortest path
+    quat3 = np.where(dot < 0.0, -quat2, quat2)
+    dot = np.fabs(dot)
 
-    else:
-        quat3 = quat2
+    # small angles use lerp to avoid dividing by sin(angle) ~= 0
+    small = dot >= 0.95
+    angle = np.arccos(np.where(small, 0.0, dot))
+    sin_angle = np.where(small, 1.0, np.sin(angle))
 
-    if dot < 0.95:
-        angle = np.arccos(dot)
-        res = (quat1 * np.sin(angle * (1 - t)) + quat3 * np.sin(angle * t)) / np.sin(angle)
+    t_ = t[..., np.newaxis]
+    res = (quat1 * np.sin(angle * (1 - t_)) + quat3 * np.sin(angle * t_)) / sin_angle
 
-    else:
-        res = lerp(quat1, quat2, t)
-
-    return res
+    return np.where(small, lerp(quat1, quat3, t), res)
 
+@all_parameters_as_numpy_arrays
 def is_zero_length(quat):
     """Checks if a quaternion is zero length.
 
-    :param numpy.array quat: The quaternion to check.
-    :rtype: boolean.
+    :param numpy.array quat: The quaternion(s) to check.
+    :rtype: boolean, numpy.array
     :return: True if the quaternion is zero length, otherwise False.
+        If an array of quaternions was passed, the result will be
+        an array of booleans.
     """
-    return quat[0] == quat[1] == quat[2] == quat[3] == 0.0
+    return np.all(quat == 0.0, axis=-1)
 
 def is_non_zero_length(quat):
     """Checks if a quaternion is not zero length.
@@ -270,13 +362,13 @@ def is_non_zero_length(quat):
     This is the opposite to 'is_zero_length'.
     This is provided for readability.
 
-    :param numpy.array quat: The quaternion to check.
-    :rtype: boolean
+    :param numpy.array quat: The quaternion(s) to check.
+    :rtype: boolean, numpy.array
     :return: False if the quaternion is zero length, otherwise True.
 
     .. seealso:: is_zero_length
     """
-    return not is_zero_length(quat)
+    return np.logical_not(is_zero_length(quat))
 
 def squared_length(quat):
     """Calculates the squared length of a quaternion.
@@ -325,46 +417,42 @@ def normalise(quat):    # TODO: mark as deprecated
     """
     return vector4.normalize(quat)
 
+@all_parameters_as_numpy_arrays
 def rotation_angle(quat):
     """Calculates the rotation around the quaternion's axis.
 
-    :param numpy.array quat: The quaternion.
-    :rtype: float.
+    :param numpy.array quat: The quaternion(s).
+    :rtype: float, numpy.array
     :return: The quaternion's rotation about the its axis in radians.
     """
     # extract the W component
-    thetaOver2 = np.arccos(quat[3])
+    thetaOver2 = np.arccos(quat[..., 3])
     return thetaOver2 * 2.0
 
 @all_parameters_as_numpy_arrays
 def rotation_axis(quat):
     """Calculates the axis of the quaternion's rotation.
 
-    :param numpy.array quat: The quaternion.
-    :rtype: numpy.array.
+    :param numpy.array quat: The quaternion(s).
+    :rtype: numpy.array
     :return: The quaternion's rotation axis.
     """
     # extract W component
-    sinThetaOver2Sq = 1.0 - (quat[3] ** 2)
+    sinThetaOver2Sq = 1.0 - (quat[..., 3] ** 2)
 
     # check for zero before we sqrt
-    if sinThetaOver2Sq <= 0.0:
-        # identity quaternion or numerical imprecision.
-        # return a valid vector
-        # we'll treat -Z as the default
-        return np.array([0.0, 0.0, -1.0], dtype=quat.dtype)
-
-    oneOverSinThetaOver2 = 1.0 / np.sqrt(sinThetaOver2Sq)
+    # identity quaternions or numerical imprecision
+    # will return a valid vector, we'll treat -Z as the default
+    valid = sinThetaOver2Sq > 0.0
+    oneOverSinThetaOver2 = 1.0 / np.sqrt(np.where(valid, sinThetaOver2Sq, 1.0))
 
     # we use the x,y,z values
-    return np.array(
-        [
-            quat[0] * oneOverSinThetaOver2,
-            quat[1] * oneOverSinThetaOver2,
-            quat[2] * oneOverSinThetaOver2
-        ],
-        dtype=quat.dtype
+    axis = np.where(
+        valid[..., np.newaxis],
+        quat[..., :3] * oneOverSinThetaOver2[..., np.newaxis],
+        [0.0, 0.0, -1.0]
     )
+    return axis.astype(quat.dtype, copy=False)
 
 def dot(quat1, quat2):
     """Calculate the dot product of quaternions.
@@ -384,49 +472,36 @@ def dot(quat1, quat2):
 def conjugate(quat):
     """Calculates a quaternion with the opposite rotation.
 
-    :param numpy.array quat: The quaternion.
+    :param numpy.array quat: The quaternion(s).
     :rtype: numpy.array.
     :return: A quaternion representing the conjugate.
     """
 
     # invert x,y,z and leave w as is
-    return np.array(
-        [
-            -quat[0],
-            -quat[1],
-            -quat[2],
-            quat[3]
-        ],
-        dtype=quat.dtype
-    )
+    result = np.array(quat, copy=True)
+    result[..., :3] = -quat[..., :3]
+    return result
 
 @parameters_as_numpy_arrays('quat')
 def exp(quat):
     """Calculate the exponential of the quaternion
 
-    :param numpy.array quat: The quaternion.
+    :param numpy.array quat: The quaternion(s).
     :rtype: numpy.array.
     :return: The exponential of the quaternion
     """
-    e = np.exp(quat[3])
-    vector_norm = np.linalg.norm(quat[:3])
-
-    if np.isclose(vector_norm, 0):
-        return np.array(
-            [0, 0, 0, e],
-            dtype = quat.dtype
-        )
-
-    s = np.sin(vector_norm) / vector_norm
-    return e * np.array(
-        [
-            quat[0] * s,
-            quat[1] * s,
-            quat[2] * s,
-            np.cos(vector_norm),
-        ],
-        dtype = quat.dtype
-    )
+    e = np.exp(quat[..., 3])
+    vector_norm = np.linalg.norm(quat[..., :3], axis=-1)
+
+    # quaternions without a vector part only scale w
+    zero = np.isclose(vector_norm, 0)
+    safe_norm = np.where(zero, 1.0, vector_norm)
+    s = np.where(zero, 0.0, np.sin(vector_norm) / safe_norm)
+
+    result = np.empty(quat.shape, dtype=quat.dtype)
+    result[..., :3] = quat[..., :3] * (e * s)[..., np.newaxis]
+    result[..., 3] = e * np.where(zero, 1.0, np.cos(vector_norm))
+    return result
 
 @parameters_as_numpy_arrays('quat')
 def power(quat, exponent):
@@ -434,33 +509,25 @@ def power(quat, exponent):
 
     The quaternion is **not** changed in place.
 
-    :param numpy.array quat: The quaternion.
+    Identity quaternions are returned unchanged.
+
+    :param numpy.array quat: The quaternion(s).
     :param float scalar: The exponent.
     :rtype: numpy.array.
     :return: A quaternion representing the original quaternion
         to the specified power.
     """
     # check for identify quaternion
-    if np.fabs(quat[3]) > 0.9999:
-        # assert for the time being
-        assert False
-        print("rotation axis was identity")
-
-        return quat
+    identity = np.fabs(quat[..., 3]) > 0.9999
 
-    alpha = np.arccos(quat[3])
+    alpha = np.arccos(np.where(identity, 0.0, quat[..., 3]))
     newAlpha = alpha * exponent
     multi = np.sin(newAlpha) / np.sin(alpha)
 
-    return np.array(
-        [
-            quat[0] * multi,
-            quat[1] * multi,
-            quat[2] * multi,
-            np.cos(newAlpha)
-        ],
-        dtype=quat.dtype
-    )
+    result = np.empty(np.broadcast(quat[..., 3], newAlpha).shape + (4,), dtype=quat.dtype)
+    result[..., :3] = quat[..., :3] * multi[..., np.newaxis]
+    result[..., 3] = np.cos(newAlpha)
+    return np.where(identity[..., np.newaxis], quat, result)
 
 def inverse(quat):
     """Calculates the inverse quaternion.
@@ -469,11 +536,11 @@ def inverse(quat):
     the conjugate of the quaternion divided
     by the magnitude of the original quaternion.
 
-    :param numpy.array quat: The quaternion to invert.
+    :param numpy.array quat: The quaternion(s) to invert.
     :rtype: numpy.array.
     :return: The inverse of the quaternion.
     """
-    return conjugate(quat) / length(quat)
+    return conjugate(quat) / length(quat)[..., np.newaxis]
 
 @all_parameters_as_numpy_arrays
 def negate(quat):
@@ -487,32 +554,67 @@ def negate(quat):
     """
     return quat * -1.0
 
+@all_parameters_as_numpy_arrays
 def is_identity(quat):
-    return np.allclose(quat, [0.,0.,0.,1.])
+    """Checks if a quaternion has no rotation (0.,0.,0.,1.).
+
+    :param numpy.array quat: The quaternion(s) to check.
+    :rtype: boolean, numpy.array
+    :return: True if the quaternion is the identity, otherwise False.
+        If an array of quaternions was passed, the result will be
+        an array of booleans.
+    """
+    return np.all(np.isclose(quat, [0.,0.,0.,1.]), axis=-1)
 
 @all_parameters_as_numpy_arrays
-def apply_to_vector(quat, vec):
+def apply_to_vector(quat, vec, out=None):
     """Rotates a vector by a quaternion.
 
-    :param numpy.array quat: The quaternion.
-    :param numpy.array vec: The vector.
+    The quaternion is expected to be unit length.
+
+    Supports a single quaternion applied to an array of vectors, or
+    an array of quaternions of shape (N, 4) applied to an array of
+    vectors of shape (N, 3) or (N, 4).
+    The W component of 4D vectors is not modified.
+
+    :param numpy.array quat: The quaternion(s).
+    :param numpy.array vec: The vector(s).
+    :param numpy.array out: Optional array to store the result in.
+        Must have the broadcast shape of quat and vec. May be vec, to
+        rotate the vectors in place.
     :rtype: numpy.array
     :return: The vector rotated by the quaternion.
     :raise ValueError: raised if the vector is an unsupported size
     """
-    def apply(quat, vec4):
-        result = cross(quat, cross(vec4, conjugate(quat)))
-        return result
-
-    if vec.size == 3:
-        # convert to vector4
-        # ignore w component by setting it to 0.
-        vec = np.array([vec[0], vec[1], vec[2], 0.0], dtype=vec.dtype)
-        vec = apply(quat, vec)
-        vec = vec[:3]
-        return vec
-    elif vec.size == 4:
-        vec = apply(quat, vec)
-        return vec
-    else:
+    size = vec.shape[-1]
+    if size not in (3, 4):
         raise ValueError("Vector size unsupported")
+
+    if out is None:
+        out = np.empty(np.broadcast(quat[..., :1], vec).shape, dtype=np.result_type(quat, vec, float))
+
+    # v' = v + 2w(q x v) + 2q x (q x v)
+    # which is the same as
+    # t = 2(q x v)
+    # v' = v + wt + q x t
+    # where:
+    # q is the x,y,z component of the quaternion
+    # w is the w component of the quaternion
+    q = quat[..., :3]
+    w = quat[..., 3:]
+    v = vec[..., :3]
+    # the result is written before v is read, so rotating in place needs a copy
+    if np.shares_memory(out, vec):
+        v = v.copy()
+
+    t = vector3.cross(q, v)
+    t += t
+
+    result = out[..., :3]
+    np.multiply(w, t, out=result)
+    result += v
+    result += vector3.cross(q, t)
+
+    if size == 4:
+        out[..., 3] = vec[..., 3]
+    return out
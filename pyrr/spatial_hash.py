@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for bucketing points and spheres into a uniform grid
+and finding their neighbours.
+
+Each point is assigned to the cube shaped cell which contains it. The
+integer coordinates of the cell are hashed into a single integer key and
+the points are sorted by key, so the points within a cell are contiguous
+and a cell is found with a binary search. Only cells which contain points
+are stored.
+
+Queries look up the cells around each query point, and the candidates
+within those cells are then tested exactly. All of the queries in a batch
+are processed together with numpy array operations.
+
+The cell size should be around the typical query distance. Much smaller
+cells cause many cells to be looked up per query, much larger cells cause
+many candidates to be tested.
+
+Spheres are in the format used by the sphere module, ie. an array of
+spheres has the shape (N,4). Spheres are bucketed by their centre.
+
+.. seealso: https://matthias-research.github.io/pages/tenMinutePhysics/11-hashing.pdf
+"""
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import numpy as np
+from .utils import _closest, _segments
+
+
+class SpatialHash(namedtuple('SpatialHash', ['points', 'radii', 'cell_size', 'order', 'keys', 'start', 'count', 'lower', 'upper'])):
+    """The arrays that make up a spatial hash grid.
+
+    :ivar numpy.array points: The (N,3) points, or sphere centres.
+    :ivar numpy.array radii: The (N,) sphere radii, zero for points.
+    :ivar float cell_size: The width of each cell.
+    :ivar numpy.array order: The (N,) point indices, sorted by cell key.
+    :ivar numpy.array keys: The sorted keys of the occupied cells.
+    :ivar numpy.array start: The offset of each cell's first point
+        within order.
+    :ivar numpy.array count: The number of points within each cell.
+    :ivar numpy.array lower: The (3,) lowest coordinates of the occupied
+        cells.
+    :ivar numpy.array upper: The (3,) highest coordinates of the occupied
+        cells.
+    """
+    __slots__ = ()
+
+
+# cell coordinates are packed into 21 bits each, which hashes every cell
+# to a unique key and avoids having to handle collisions
+_BITS = 21
+_LIMIT = 2 ** (_BITS - 1)
+
+def _cells(points, cell_size):
+    """Returns the integer coordinates of the cells containing the points.
+    """
+    return np.floor(points / cell_size).astype(np.int64)
+
+def _hash(cells):
+    """Returns the key of each cell, and whether the cell is within
+    the range of cells that can be stored.
+    """
+    valid = np.all((cells >= -_LIMIT) & (cells < _LIMIT), axis=-1)
+    cells = cells + _LIMIT
+    keys = (cells[..., 0] << (2 * _BITS)) | (cells[..., 1] << _BITS) | cells[..., 2]
+    return keys, valid
+
+def _create(points, radii, cell_size):
+    cells = _cells(points, cell_size)
+    keys, valid = _hash(cells)
+    if not np.all(valid):
+        raise ValueError('Points are too far from the origin for the cell size')
+
+    if len(cells):
+        lower, upper = np.min(cells, axis=0), np.max(cells, axis=0)
+    else:
+        lower, upper = np.zeros(3, dtype=np.int64), np.full(3, -1, dtype=np.int64)
+
+    order = np.argsort(keys, kind='mergesort')
+    keys, start, count = np.unique(keys[order], return_index=True, return_counts=True)
+    return SpatialHash(
+        points=points,
+        radii=radii,
+        cell_size=float(cell_size),
+        order=order,
+        keys=keys,
+        start=start,
+        count=count,
+        lower=lower,
+        upper=upper,
+    )
+
+def create_from_points(points, cell_size, dtype=None):
+    """Creates a spatial hash grid from an array of points.
+
+    :param numpy.array points: The (N,3) points. The points are copied.
+    :param float cell_size: The width of each cell.
+    :rtype: SpatialHash
+    :return: The spatial hash grid.
+    """
+    points = np.array(points, dtype=dtype)
+    return _create(points, np.zeros(len(points), dtype=points.dtype), cell_size)
+
+def create_from_spheres(spheres, cell_size=None, dtype=None):
+    """Creates a spatial hash grid from an array of spheres.
+
+    :param numpy.array spheres: The (N,4) spheres. The spheres are copied.
+    :param float cell_size: The width of each cell. If None, the diameter
+        of the largest sphere is used.
+    :rtype: SpatialHash
+    :return: The spatial hash grid.
+    """
+    spheres = np.array(spheres, dtype=dtype)
+    if cell_size is None:
+        cell_size = 2. * np.max(spheres[:, 3]) if len(spheres) else 1.
+    return _create(spheres[:, 0:3].copy(), spheres[:, 3].copy(), cell_size)
+
+def _search_boxes(grid, cells, n):
+    """Returns the first cell and the size of the range of occupied cells
+    within n cells of each cell, and the number of cells in each range.
+    """
+    n = np.reshape(n, (-1, 1))
+    first = np.maximum(cells - n, grid.lower)
+    size = np.maximum(np.minimum(cells + n, grid.upper) - first + 1, 0)
+    return first, size, np.prod(size, axis=-1)
+
+def _costs(grid, count):
+    """Returns the approximate number of cells looked up and candidates
+    tested for searches of count cells.
+    """
+    per_cell = len(grid.points) / len(grid.keys)
+    return np.where(count >= len(grid.keys), len(grid.points), count * max(per_cell, 1.))
+
+def _candidates(grid, cells, n):
+    """Finds the grid's points within n cells of each query point's cell.
+
+    Only the cells within the range of occupied cells are looked up, so
+    queries far from the grid's points don't look up empty cells.
+
+    :param numpy.array cells: The (Q,3) cells of the query points.
+    :param numpy.array n: The number of cells to search on each axis,
+        either a single value or a (Q,) array.
+    :rtype: tuple
+    :return: The query indices and point indices of each candidate,
+        sorted by query.
+    """
+    first, size, count = _search_boxes(grid, cells, n)
+
+    # looking up more cells than are occupied costs more than testing
+    # every point in the grid
+    everything = count >= len(grid.keys)
+    count = np.where(everything, 0, count)
+
+    # each query's cells are numbered within its range and converted to
+    # cell coordinates
+    query, _, local = _segments(np.zeros(len(cells), dtype=int), count)
+    size = size[query]
+    cell = first[query]
+    cell[:, 2] += local % size[:, 2]
+    local //= size[:, 2]
+    cell[:, 1] += local % size[:, 1]
+    cell[:, 0] += local // size[:, 1]
+
+    # look up the cells, cells which aren't in the grid are empty
+    keys, _ = _hash(cell)
+    index = np.minimum(np.searchsorted(grid.keys, keys), len(grid.keys) - 1)
+    found = grid.keys[index] == keys
+    query, index = query[found], index[found]
+
+    segment, _, position = _segments(grid.start[index], grid.count[index])
+    query, point = query[segment], grid.order[position]
+
+    everything = np.flatnonzero(everything)
+    if len(everything):
+        query = np.concatenate([query, np.repeat(everything, len(grid.points))])
+        point = np.concatenate([point, np.tile(np.arange(len(grid.points)), len(everything))])
+        order = np.argsort(query, kind='mergesort')
+        query, point = query[order], point[order]
+    return query, point
+
+def _blocks(costs, block_size):
+    """Yields slices of queries, sized so that the total cost of each
+    block is around block_size.
+    """
+    total = np.cumsum(costs)
+    first = 0
+    while first < len(costs):
+        last = np.searchsorted(total, total[first] - costs[first] + block_size, side='right')
+        last = max(last, first + 1)
+        yield slice(first, last)
+        first = last
+
+def _reach(grid, distance):
+    """Returns the number of cells on each axis that are within the
+    distance of a cell.
+    """
+    # the search is limited to the occupied cells, so larger values
+    # don't need to be represented
+    return np.minimum(np.ceil(distance / grid.cell_size), 2 * _LIMIT).astype(np.int64)
+
+def query_radius(grid, points, radius, block_size=2 ** 22):
+    """Finds the points, or spheres, within a radius of each query point.
+
+    Spheres are found if they intersect the query sphere, ie. the
+    distance between the centres is not greater than the sum of
+    the radii.
+
+    :param SpatialHash grid: The grid to query.
+    :param numpy.array points: The (Q,3) query points.
+    :param numpy.array radius: The query radius, either a single value
+        or a (Q,) array.
+    :param int block_size: The approximate number of candidates to test
+        at once, which bounds the memory used.
+    :rtype: tuple
+    :return: A tuple of (query index, point index, distance) arrays, with
+        one entry per point found. Sorted by query and then by point.
+    """
+    points = np.asarray(points)
+    radius = np.broadcast_to(radius, (len(points),))
+    if len(points) == 0 or len(grid.points) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=grid.points.dtype)
+
+    cells = _cells(points, grid.cell_size)
+    n = _reach(grid, radius + np.max(grid.radii))
+    costs = _costs(grid, _search_boxes(grid, cells, n)[2])
+
+    found_query, found_point, found_distance = [], [], []
+    for block in _blocks(costs, block_size):
+        query, point = _candidates(grid, cells[block], n[block])
+        query += block.start
+        distance = np.sqrt(np.sum((points[query] - grid.points[point]) ** 2, axis=-1))
+        inside = distance <= radius[query] + grid.radii[point]
+        found_query.append(query[inside])
+        found_point.append(point[inside])
+        found_distance.append(distance[inside])
+
+    query = np.concatenate(found_query)
+    point = np.concatenate(found_point)
+    distance = np.concatenate(found_distance)
+    order = np.lexsort((point, query))
+    return query[order], point[order], distance[order]
+
+def _nearest(grid, points, k, n, block_size):
+    """Finds the k nearest points to each query point by searching
+    n cells around each query point, and searching further for the
+    queries which are unresolved.
+
+    The queries are re-blocked for each round of searching, so the memory
+    used is bounded by block_size however far the search grows.
+    """
+    nearest = np.full((len(points), k), -1)
+    distances = np.full((len(points), k), np.inf)
+    cells = _cells(points, grid.cell_size)
+    n = np.full(len(points), n, dtype=np.int64)
+
+    remaining = np.arange(len(points))
+    while len(remaining):
+        # searches which don't reach the occupied cells find nothing, and
+        # searches which span all of them find every point
+        c = cells[remaining]
+        gap = np.maximum(np.maximum(grid.lower - c, c - grid.upper), 0).max(axis=-1)
+        extent = np.maximum(c - grid.lower, grid.upper - c).max(axis=-1)
+        n[remaining] = np.minimum(np.maximum(n[remaining], gap), extent)
+
+        count = _search_boxes(grid, c, n[remaining])[2]
+        covered = (n[remaining] >= extent) | (count >= len(grid.keys))
+
+        unresolved = [np.empty(0, dtype=int)]
+        for block in _blocks(_costs(grid, count), block_size):
+            index = remaining[block]
+            query, point = _candidates(grid, cells[index], n[index])
+            squared = np.sum((points[index][query] - grid.points[point]) ** 2, axis=-1)
+            found, found_squared = _closest(query, point, squared, len(index), k)
+
+            # the distance from each query point to the nearest point
+            # outside of the cells searched
+            c = cells[index]
+            p = points[index]
+            m = n[index][:, np.newaxis]
+            margin = np.minimum(
+                p - (c - m) * grid.cell_size,
+                (c + m + 1) * grid.cell_size - p,
+            ).min(axis=-1)
+            done = covered[block] | (found_squared[:, -1] <= margin ** 2)
+
+            nearest[index[done]] = found[done]
+            distances[index[done]] = np.sqrt(found_squared[done])
+
+            # the k closest points found bound the distance to the k
+            # nearest, so a search which reaches them resolves the query.
+            # Queries which found fewer than k points search twice as far
+            index, m, kth = index[~done], m[~done, 0], found_squared[~done, -1]
+            n[index] = np.where(
+                np.isfinite(kth),
+                np.maximum(_reach(grid, np.sqrt(kth)), m + 1),
+                2 * m,
+            )
+            unresolved.append(index)
+        remaining = np.concatenate(unresolved)
+    return nearest, distances
+
+def query_nearest(grid, points, k=1, block_size=2 ** 22):
+    """Finds the k nearest points to each query point.
+
+    For spheres, the distance to the sphere's centre is used.
+
+    Each query point searches the cells around it, starting with a
+    distance estimated from the density of the grid. Queries that haven't
+    found k points which are closer than any point that could lie outside
+    of the cells searched search again, out to the distance of the k
+    closest points found, or twice as far if fewer than k were found.
+
+    :param SpatialHash grid: The grid to query.
+    :param numpy.array points: The (Q,3) query points.
+    :param int k: The number of points to find.
+    :param int block_size: The approximate number of candidates to test
+        at once, which bounds the memory used.
+    :rtype: tuple
+    :return: A tuple of (point index, distance) arrays of shape (Q,k),
+        sorted by distance. If the grid contains fewer than k points, the
+        missing entries have an index of -1 and a distance of inf.
+    """
+    points = np.asarray(points)
+    if len(grid.points) == 0 or len(points) == 0:
+        return np.full((len(points), k), -1), np.full((len(points), k), np.inf)
+
+    # the number of cells that a sphere containing k points would span,
+    # if the points were spread evenly through the occupied cells
+    per_cell = len(grid.points) / len(grid.keys)
+    n = max(1, int(np.ceil(np.cbrt(3. * k / (4. * np.pi * per_cell)))))
+    return _nearest(grid, points, k, n, block_size)
+
+def query_pairs(grid, distance=0., block_size=2 ** 22):
+    """Finds the pairs of points, or spheres, within a distance of each
+    other.
+
+    Spheres are paired if the gap between them is not greater than the
+    distance, so a distance of 0 finds the intersecting spheres.
+
+    :param SpatialHash grid: The grid to query.
+    :param float distance: The maximum distance.
+    :param int block_size: The approximate number of candidates to test
+        at once, which bounds the memory used.
+    :rtype: numpy.array
+    :return: The (K,2) indices of each pair, with the lower index first.
+        The pairs are sorted.
+    """
+    query, point, _ = query_radius(grid, grid.points, distance + grid.radii, block_size)
+    lower = query < point
+    return np.stack([query[lower], point[lower]], axis=-1)
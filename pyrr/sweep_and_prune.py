@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Provide functions for finding the overlapping pairs within an array
+of AABBs using sort and sweep (sweep and prune).
+
+The AABBs are sorted by their minimum along one axis. Each AABB can then
+only overlap the AABBs that follow it in the sorted order, up to the
+first whose minimum is greater than its maximum. These candidates are
+found with a binary search and tested on all 3 axes, so the overlapping
+pairs are found without testing every pair or per AABB Python code.
+
+Between frames, the AABBs move a small distance, so the previous order
+is nearly sorted. update re-sorts the previous order with a sort which
+is close to linear time on nearly sorted data.
+
+AABBs are in the format used by the aabb module, ie. an array of AABBs
+has the shape (N,2,3).
+
+.. seealso: https://en.wikipedia.org/wiki/Sweep_and_prune
+"""
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import numpy as np
+
+
+class SweepAndPrune(namedtuple('SweepAndPrune', ['aabbs', 'axis', 'order'])):
+    """The state of a sweep and prune broadphase.
+
+    :ivar numpy.array aabbs: The (N,2,3) AABBs.
+    :ivar int axis: The axis the AABBs are sorted along.
+    :ivar numpy.array order: The (N,) AABB indices, sorted by
+        their minimum along the axis.
+    """
+    __slots__ = ()
+
+
+def _sort(aabbs, axis, order):
+    """Sorts order by the AABBs' minimums along the axis.
+
+    Numpy's stable sort is a timsort for floating point values, which is
+    close to linear time when the order is already nearly sorted.
+    """
+    return order[np.argsort(aabbs[order, 0, axis], kind='mergesort')]
+
+def create_from_aabbs(aabbs, axis=None, dtype=None):
+    """Creates a sweep and prune broadphase from an array of AABBs.
+
+    :param numpy.array aabbs: The (N,2,3) AABBs. The AABBs are copied.
+    :param int axis: The axis to sort the AABBs along. If None, the axis
+        along which the AABBs' centres are most spread out is used.
+        Sorting along an axis on which the AABBs overlap a lot, such as
+        the vertical axis of objects resting on a floor, produces many
+        candidate pairs.
+    :rtype: SweepAndPrune
+    :return: The broadphase.
+    """
+    aabbs = np.array(aabbs, dtype=dtype)
+    if axis is None:
+        if len(aabbs):
+            axis = int(np.argmax(np.var(aabbs[:, 0] + aabbs[:, 1], axis=0)))
+        else:
+            axis = 0
+    order = np.argsort(aabbs[:, 0, axis], kind='mergesort')
+    return SweepAndPrune(aabbs=aabbs, axis=axis, order=order)
+
+def update(sap, aabbs=None):
+    """Re-sorts the broadphase after the AABBs have moved.
+
+    The previous order is re-sorted, which is much cheaper than sorting
+    from scratch when the AABBs have only moved a small distance.
+
+    :param SweepAndPrune sap: The broadphase to update, this is modified
+        in place.
+    :param numpy.array aabbs: The new (N,2,3) AABBs. The AABBs must be in
+        the same order as those the broadphase was created with.
+        If None, the broadphase's aabbs array is assumed to have been
+        modified in place.
+    :rtype: SweepAndPrune
+    :return: The broadphase.
+    """
+    if aabbs is not None:
+        sap.aabbs[...] = aabbs
+    sap.order[...] = _sort(sap.aabbs, sap.axis, sap.order)
+    return sap
+
+def overlapping_pairs(sap, block_size=2 ** 22):
+    """Finds the pairs of AABBs which overlap.
+
+    AABBs which touch are considered to overlap.
+
+    :param SweepAndPrune sap: The broadphase.
+    :param int block_size: The approximate number of candidate pairs to
+        test at once, which bounds the memory used.
+    :rtype: numpy.array
+    :return: The (K,2) indices of each overlapping pair, with the lower
+        index first. The pairs are sorted.
+    """
+    boxes = sap.aabbs[sap.order]
+    n = len(boxes)
+
+    # contiguous arrays of the minimums and maximums on each axis
+    lower = np.ascontiguousarray(boxes[:, 0].T)
+    upper = np.ascontiguousarray(boxes[:, 1].T)
+
+    # each AABB's candidates are those after it in the sorted order whose
+    # minimum is not greater than its maximum
+    end = np.searchsorted(lower[sap.axis], upper[sap.axis], side='right')
+    count = np.maximum(end - np.arange(n) - 1, 0)
+    total = np.cumsum(count)
+
+    pairs = []
+    first = 0
+    while first < n:
+        # the candidates of AABBs first to last are tested together
+        last = max(first + 1, int(np.searchsorted(total, total[first] - count[first] + block_size, side='right')))
+        last = min(last, n)
+        block = count[first:last]
+
+        a = np.repeat(np.arange(first, last), block)
+        offset = np.cumsum(block) - block
+        b = a + 1 + np.arange(len(a)) - np.repeat(offset, block)
+
+        # the candidates overlap on the sorted axis, so only the other
+        # axes are tested, discarding pairs as they fail each axis
+        for axis in range(3):
+            if axis != sap.axis:
+                overlap = (lower[axis, a] <= upper[axis, b]) & (lower[axis, b] <= upper[axis, a])
+                a, b = a[overlap], b[overlap]
+        pairs.append(np.stack([a, b], axis=-1))
+        first = last
+
+    if not pairs:
+        return np.empty((0, 2), dtype=int)
+    pairs = sap.order[np.concatenate(pairs)]
+    pairs.sort(axis=-1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+def find_overlapping_pairs(aabbs, axis=None):
+    """Finds the pairs of AABBs which overlap within an array of AABBs.
+
+    This is a convenience for creating a broadphase and calling
+    overlapping_pairs. For AABBs which move between frames, keep the
+    broadphase and use update instead.
+
+    :param numpy.array aabbs: The (N,2,3) AABBs.
+    :param int axis: The axis to sort the AABBs along, see
+        create_from_aabbs.
+    :rtype: numpy.array
+    :return: The (K,2) indices of each overlapping pair, with the lower
+        index first. The pairs are sorted.
+    """
+    return overlapping_pairs(create_from_aabbs(aabbs, axis))
@@ -2,25 +2,72 @@
 """Provides common utility functions.
 """
 import inspect
+import threading
+from contextlib import contextmanager
 from functools import wraps
 import numpy as np
 
 
+class _FastPath(threading.local):
+    """When enabled, the argument conversion decorators pass arguments
+    straight through to the decorated function.
+
+    The flag is per thread, so a fast_path block in one thread doesn't
+    affect code running in other threads.
+    """
+    enabled = False
+
+_fast_path = _FastPath()
+
+
+@contextmanager
+def fast_path(enabled=True):
+    """Disables the conversion of arguments to numpy arrays.
+
+    Within this context, functions decorated with
+    all_parameters_as_numpy_arrays and parameters_as_numpy_arrays
+    do not inspect or convert their arguments.
+    Only plain numpy arrays may be passed to these functions, lists
+    and the object API classes (Vector3, Quaternion, etc) are not
+    supported.
+
+    This only affects the current thread.
+    ::
+
+        with pyrr.fast_path():
+            for i in range(1000):
+                q = quaternion.cross(q, dq)
+
+    :param boolean enabled: Set to False to re-enable argument conversion
+        within an enclosing fast_path block.
+    """
+    previous = _fast_path.enabled
+    _fast_path.enabled = enabled
+    try:
+        yield
+    finally:
+        _fast_path.enabled = previous
+
+
 def all_parameters_as_numpy_arrays(fn):
     """Converts all of a function's arguments to numpy arrays.
 
     Used as a decorator to reduce duplicate code.
+
+    Arguments that are already numpy arrays are passed through as is.
     """
     # wraps allows us to pass the docstring back
     # or the decorator will hide the function from our doc generator
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        args = list(args)
-        for i, v in enumerate(args):
-            if v is not None:
-                args[i] = np.asarray(v)
+        if _fast_path.enabled:
+            return fn(*args, **kwargs)
+        args = [
+            v if v is None or type(v) is np.ndarray else np.asarray(v)
+            for v in args
+        ]
         for k,v in kwargs.items():
-            if v is not None:
+            if v is not None and type(v) is not np.ndarray:
                 kwargs[k] = np.asarray(v)
         return fn(*args, **kwargs)
     return wrapper
@@ -39,6 +86,10 @@ def parameters_as_numpy_arrays(*args_to_convert):
             pass
 
         myfunc(1, [2,2], optional=[3,3,3])
+
+    Arguments that are already numpy arrays are passed through as is.
+    The arrays are not copied, so the decorated function must not
+    modify them in place.
     """
     def decorator(fn):
         # wraps allows us to pass the docstring back
@@ -49,32 +100,83 @@ def parameters_as_numpy_arrays(*args_to_convert):
         except AttributeError:
             getfullargspec = inspect.getargspec
 
+        # get the arguments of the function we're decorating
+        # this is done once here rather than on every call
+        fn_args = getfullargspec(fn).args
+
+        # the positions of the arguments to convert when
+        # they are passed in the *args list
+        indices = tuple(
+            i for i, k in enumerate(fn_args)
+            if k in args_to_convert
+        )
+        names = frozenset(args_to_convert)
+
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            # get the arguments of the function we're decorating
-            fn_args = getfullargspec(fn)
+            if _fast_path.enabled:
+                return fn(*args, **kwargs)
 
             # convert any values that are specified
             # if the argument isn't in our list, just pass it through
 
             # convert the *args list
-            # we zip the args with the argument names we received from
-            # the inspect function
             args = list(args)
-            for i, (k, v) in enumerate(zip(fn_args.args, args)):
-                if k in args_to_convert and v is not None:
-                    args[i] = np.array(v)
+            for i in indices:
+                if i >= len(args):
+                    break
+                v = args[i]
+                if v is not None and type(v) is not np.ndarray:
+                    args[i] = np.asarray(v)
 
             # convert the **kwargs dict
             for k,v in kwargs.items():
-                if k in args_to_convert and v is not None:
-                    kwargs[k] = np.array(v)
+                if k in names and v is not None and type(v) is not np.ndarray:
+                    kwargs[k] = np.asarray(v)
 
             # pass the converted values to our function
             return fn(*args, **kwargs)
         return wrapper
     return decorator
 
+def _segments(start, count):
+    """Returns the segment each element belongs to, the offset of each
+    segment within the concatenated elements, and the position of each
+    element within the original array.
+
+    Used by the spatial structures to expand (start, count) ranges into
+    the indices of their elements without a Python loop.
+    """
+    segment = np.repeat(np.arange(len(start)), count)
+    offset = np.cumsum(count) - count
+    position = np.arange(len(segment)) - offset[segment] + start[segment]
+    return segment, offset, position
+
+def _closest(query, position, squared, n, k):
+    """Selects the k closest candidates of each query.
+
+    The candidates must be sorted by query. They are scattered into a row
+    per query, padded with inf, and the k closest of each row are selected.
+
+    :rtype: tuple
+    :return: The (n,k) positions and squared distances, sorted by distance.
+    """
+    start = np.searchsorted(query, np.arange(n))
+    rank = np.arange(len(query)) - start[query]
+    width = max(k, int(np.max(rank)) + 1 if len(rank) else k)
+    candidates = np.full((n, width), -1)
+    candidates_squared = np.full((n, width), np.inf)
+    candidates[query, rank] = position
+    candidates_squared[query, rank] = squared
+
+    if width > k:
+        closest = np.argpartition(candidates_squared, k - 1, axis=-1)[:, :k]
+    else:
+        closest = np.broadcast_to(np.arange(k), (n, k))
+    rows = np.arange(n)[:, np.newaxis]
+    closest = closest[rows, np.argsort(candidates_squared[rows, closest], axis=-1)]
+    return candidates[rows, closest], candidates_squared[rows, closest]
+
 def solve_quadratic_equation(a, b, c):
     """Quadratic equation solver.
     Solve function of form f(x) = ax^2 + bx + c
@@ -93,7 +195,7 @@ def solve_quadratic_equation(a, b, c):
         # Why not use simple form:
         # s1 = (-b + math.sqrt(delta)) / (2 * a)
         # s2 = (-b - math.sqrt(delta)) / (2 * a)
-        q = -0.5 * (b + np.math.sqrt(delta)) if b > 0 else -0.5 * (b - np.math.sqrt(delta))
+        q = -0.5 * (b + np.sqrt(delta)) if b > 0 else -0.5 * (b - np.sqrt(delta))
         s1 = q / a
         s2 = c / q
         return [s1, s2]
@@ -103,3 +205,36 @@ def solve_quadratic_equation(a, b, c):
     else:
         # No solution exists
         return list()
+
+def solve_quadratic_equations(a, b, c):
+    """Vectorized quadratic equation solver.
+    Solves functions of form f(x) = ax^2 + bx + c for arrays of coefficients.
+
+    Uses the same numerically stable form as solve_quadratic_equation.
+    The coefficients are broadcast against each other and a must be non-zero.
+
+    :param numpy.array a: Quadratic parts of the equations.
+    :param numpy.array b: Linear parts of the equations.
+    :param numpy.array c: Static parts of the equations.
+    :rtype: tuple
+    :return: A tuple of (x0, x1, real) arrays. x0 and x1 are the smaller and
+        larger solutions, which are equal if there is one solution.
+        real is False where no real solution exists, in which case
+        x0 and x1 are NaN.
+    """
+    a, b, c = np.asarray(a), np.asarray(b), np.asarray(c)
+    delta = b * b - 4. * a * c
+    real = delta >= 0.
+
+    # q has the same sign as b to avoid subtracting similar values
+    root = np.sqrt(np.where(real, delta, 0.))
+    q = -0.5 * (b + np.where(b > 0., root, -root))
+
+    # q is only zero when b and c are, in which case both solutions are zero
+    zero = q == 0.
+    s1 = q / a
+    s2 = c / np.where(zero, 1., q)
+
+    x0 = np.where(real, np.minimum(s1, s2), np.nan)
+    x1 = np.where(real, np.maximum(s1, s2), np.nan)
+    return x0, x1, real
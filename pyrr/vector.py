@@ -36,7 +36,17 @@ def normalize(vec):
     # always want an array, even a 0-d array.
     return (vec.T  / np.sqrt(np.sum(vec**2,axis=-1))).T
 
+def _normalize_non_unit(vec):
+    """Normalizes only the vectors which are not already unit length.
 
+    Vectors which are unit length are returned unchanged, and if every
+    vector is unit length no division is performed at all.
+    """
+    sq = np.sum(vec * vec, axis=-1)[..., np.newaxis]
+    needs_normalize = np.abs(sq - 1.) > 1e-5
+    if not np.any(needs_normalize):
+        return vec
+    return np.where(needs_normalize, vec / np.sqrt(sq), vec)
 
 @all_parameters_as_numpy_arrays
 def normalise(vec):    # TODO: mark as deprecated
@@ -0,0 +1,7 @@
+import numpy as np
+
+
+def random_aabbs(rng, n, size=10., extent=(.1, 1.)):
+    centres = rng.uniform(-size, size, (n,3))
+    extents = rng.uniform(extent[0], extent[1], (n,3))
+    return np.stack([centres - extents, centres + extents], axis=1)
@@ -0,0 +1,171 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import bvh, geometric_tests
+from .helpers import random_aabbs
+
+
+class test_bvh(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.aabbs = random_aabbs(self.rng, 500)
+
+    def check_tree(self, tree):
+        # every aabb is in exactly one leaf, and nodes contain their aabbs
+        np.testing.assert_equal(np.sort(tree.indices), np.arange(len(tree.aabbs)))
+        for node in range(len(tree.bounds)):
+            aabbs = tree.aabbs[tree.indices[tree.start[node]:tree.start[node] + tree.count[node]]]
+            np.testing.assert_almost_equal(tree.bounds[node, 0], np.min(aabbs[:, 0], axis=0))
+            np.testing.assert_almost_equal(tree.bounds[node, 1], np.max(aabbs[:, 1], axis=0))
+
+    def test_import(self):
+        import pyrr
+        pyrr.bvh
+        from pyrr import bvh
+
+    def test_create_from_aabbs(self):
+        for method in ('sah', 'median'):
+            tree = bvh.create_from_aabbs(self.aabbs, leaf_size=4, method=method)
+            self.check_tree(tree)
+            leaves = tree.children[:, 0] < 0
+            self.assertTrue(np.all(tree.count[leaves] <= 4))
+            self.assertTrue(np.all(tree.count[~leaves] > 4))
+            self.assertEqual(tree.levels[-1], len(tree.bounds))
+
+    def test_create_from_aabbs_single(self):
+        tree = bvh.create_from_aabbs(self.aabbs[:1])
+        self.assertEqual(len(tree.bounds), 1)
+        np.testing.assert_almost_equal(tree.bounds[0], self.aabbs[0])
+
+    def test_create_from_aabbs_coincident(self):
+        # identical centroids can't be binned, fall back to the median
+        aabbs = np.tile([[[0., 0., 0.], [1., 1., 1.]]], (20,1,1))
+        tree = bvh.create_from_aabbs(aabbs, leaf_size=2)
+        self.check_tree(tree)
+
+    def test_create_from_aabbs_invalid_method(self):
+        self.assertRaises(ValueError, lambda: bvh.create_from_aabbs(self.aabbs, method='foo'))
+
+    def test_create_from_aabbs_invalid_leaf_size(self):
+        self.assertRaises(ValueError, lambda: bvh.create_from_aabbs(self.aabbs, leaf_size=0))
+
+    def test_create_from_aabbs_int(self):
+        centres = self.rng.randint(-20, 20, (200,3))
+        aabbs = np.stack([centres, centres + self.rng.randint(1, 4, (200,3))], axis=1)
+        tree = bvh.create_from_aabbs(aabbs)
+        self.check_tree(tree)
+        self.assertTrue(tree.bounds.dtype == float)
+
+        boxes = [[[-5, -5, -5], [5, 5, 5]]]
+        query, aabb = bvh.intersect_aabbs(tree, boxes)
+        expected = np.flatnonzero(np.all((aabbs[:, 0] <= 5) & (-5 <= aabbs[:, 1]), axis=-1))
+        np.testing.assert_equal(np.sort(aabb), expected)
+
+        ray, aabb, t = bvh.intersect_rays(tree, [[[0, 0, -50], [0, 0, 1]]])
+        hit = geometric_tests.rays_intersect_aabbs(np.array([[[0, 0, -50], [0, 0, 1]]]), aabbs, all_pairs=True)[0][0]
+        np.testing.assert_equal(np.sort(aabb), np.flatnonzero(hit))
+
+    def test_refit(self):
+        tree = bvh.create_from_aabbs(self.aabbs)
+        moved = self.aabbs + self.rng.uniform(-2., 2., (500,1,3))
+        bvh.refit(tree, moved)
+        np.testing.assert_almost_equal(tree.aabbs, moved)
+        self.check_tree(tree)
+
+    def test_intersect_points(self):
+        tree = bvh.create_from_aabbs(self.aabbs)
+        points = self.rng.uniform(-10., 10., (300,3))
+        point, aabb = bvh.intersect_points(tree, points)
+
+        a = self.aabbs
+        expected = np.argwhere(np.all((a[None, :, 0] <= points[:, None]) & (points[:, None] <= a[None, :, 1]), axis=-1))
+        np.testing.assert_equal(point, expected[:, 0])
+        np.testing.assert_equal(aabb, expected[:, 1])
+
+    def test_intersect_aabbs(self):
+        tree = bvh.create_from_aabbs(self.aabbs, method='median')
+        boxes = random_aabbs(self.rng, 50)
+        query, aabb = bvh.intersect_aabbs(tree, boxes)
+
+        a = self.aabbs
+        expected = np.argwhere(np.all(
+            (boxes[:, None, 0] <= a[None, :, 1]) & (a[None, :, 0] <= boxes[:, None, 1]), axis=-1
+        ))
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(aabb, expected[:, 1])
+
+    def test_intersect_rays(self):
+        tree = bvh.create_from_aabbs(self.aabbs)
+        rays = np.stack([self.rng.uniform(-15., 15., (100,3)), self.rng.normal(size=(100,3))], axis=1)
+        ray, aabb, t = bvh.intersect_rays(tree, rays)
+        self.assertTrue(len(ray) > 0)
+        self.assertTrue(np.all(t >= 0.))
+
+        # compare against testing every pair
+        hit = np.zeros((100,500), dtype=bool)
+        hit[ray, aabb] = True
+        expected = geometric_tests.rays_intersect_aabbs(rays, self.aabbs, all_pairs=True)[0]
+        np.testing.assert_equal(hit, expected)
+
+        # the hit point lies on or within the aabb
+        points = rays[ray, 0] + rays[ray, 1] * t[:, np.newaxis]
+        self.assertTrue(np.all(points >= self.aabbs[aabb, 0] - 1e-6))
+        self.assertTrue(np.all(points <= self.aabbs[aabb, 1] + 1e-6))
+
+    def test_intersect_rays_axis_aligned(self):
+        # rays parallel to an axis, including one on the boundary
+        tree = bvh.create_from_aabbs([
+            [[1., 1., 1.], [4., 4., 4.]],
+            [[-4., -4., -4.], [-1., -1., -1.]],
+        ])
+        rays = np.array([
+            [[1., 0., 0.], [0., 1., 1.]],
+            [[2., 2., 0.], [0., 0., 1.]],
+            [[2., 2., 0.], [0., 0., -1.]],
+            [[0., 0., 0.], [-1., 0., 0.]],
+        ])
+        ray, aabb, t = bvh.intersect_rays(tree, rays)
+        np.testing.assert_equal(ray, [0, 1])
+        np.testing.assert_equal(aabb, [0, 0])
+        np.testing.assert_almost_equal(t, [1., 1.])
+
+    def test_intersect_rays_closest(self):
+        tree = bvh.create_from_aabbs([
+            [[-1., -1., 5.], [1., 1., 6.]],
+            [[-1., -1., 2.], [1., 1., 3.]],
+            [[-1., -1., -1.], [1., 1., 1.]],
+        ])
+        rays = np.array([
+            [[0., 0., 1.5], [0., 0., 1.]],
+            [[0., 0., 0.], [0., 0., 1.]],
+            [[5., 0., 0.], [0., 0., 1.]],
+        ])
+        aabb, t = bvh.intersect_rays_closest(tree, rays)
+        np.testing.assert_equal(aabb, [1, 2, -1])
+        np.testing.assert_almost_equal(t, [.5, 0., np.inf])
+
+    def test_intersect_empty(self):
+        tree = bvh.create_from_aabbs(self.aabbs)
+        query, aabb = bvh.intersect_aabbs(tree, np.empty((0,2,3)))
+        self.assertEqual(len(query), 0)
+        self.assertEqual(len(aabb), 0)
+
+        point, aabb = bvh.intersect_points(tree, np.empty((0,3)))
+        self.assertEqual(len(point), 0)
+
+        ray, aabb, t = bvh.intersect_rays(tree, np.empty((0,2,3)))
+        self.assertEqual(len(ray), 0)
+
+        closest, distance = bvh.intersect_rays_closest(tree, np.empty((0,2,3)))
+        self.assertEqual(len(closest), 0)
+
+        # rays which all miss
+        closest, distance = bvh.intersect_rays_closest(tree, [[[50., 50., 50.], [0., 0., 1.]]])
+        np.testing.assert_equal(closest, [-1])
+        np.testing.assert_equal(distance, [np.inf])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ try:
 except:
     import unittest
 import numpy as np
-from pyrr import euler
+from pyrr import euler, matrix33, matrix44, quaternion
 
 
 class test_euler(unittest.TestCase):
@@ -20,6 +20,48 @@ class test_euler(unittest.TestCase):
         self.assertEqual(euler.yaw(e), 3.)
         self.assertTrue(np.array_equal(e, [1., 2., 3.]))
 
+    def test_create_batch(self):
+        e = euler.create(roll=[1., 4.], pitch=[2., 5.], yaw=3.)
+        self.assertEqual(e.shape, (2,3))
+        np.testing.assert_almost_equal(e, [[1., 2., 3.], [4., 5., 3.]], decimal=5)
+        np.testing.assert_almost_equal(euler.roll(e), [1., 4.], decimal=5)
+        np.testing.assert_almost_equal(euler.pitch(e), [2., 5.], decimal=5)
+        np.testing.assert_almost_equal(euler.yaw(e), [3., 3.], decimal=5)
+
+    def test_create_from_rotation(self):
+        np.testing.assert_almost_equal(euler.create_from_x_rotation(1.), [1., 0., 0.], decimal=5)
+        np.testing.assert_almost_equal(euler.create_from_y_rotation(1.), [0., 1., 0.], decimal=5)
+        np.testing.assert_almost_equal(euler.create_from_z_rotation([1., 2.]), [[0., 0., 1.], [0., 0., 2.]], decimal=5)
+
+    def test_create_from_matrix(self):
+        e = np.random.uniform(-1.5, 1.5, (16,3))
+        result = euler.create_from_matrix(matrix33.create_from_eulers(e))
+        self.assertEqual(result.shape, (16,3))
+        np.testing.assert_almost_equal(result, e, decimal=5)
+        np.testing.assert_almost_equal(euler.create_from_matrix(matrix44.create_from_eulers(e[0])), e[0], decimal=5)
+
+    def test_create_from_matrix_gimbal_lock(self):
+        e = np.array([[.3, np.pi / 2., .5], [.3, -np.pi / 2., .5]])
+        m = matrix33.create_from_eulers(e)
+        result = euler.create_from_matrix(m)
+        np.testing.assert_almost_equal(euler.roll(result), [0., 0.], decimal=5)
+        np.testing.assert_almost_equal(matrix33.create_from_eulers(result), m, decimal=5)
+
+    def test_create_from_quaternion(self):
+        e = np.random.uniform(-1.5, 1.5, (16,3))
+        result = euler.create_from_quaternion(quaternion.create_from_eulers(e))
+        self.assertEqual(result.shape, (16,3))
+        np.testing.assert_almost_equal(result, e, decimal=5)
+
+    def test_create_from_quaternion_gimbal_lock(self):
+        e = np.array([[.3, np.pi / 2., .5], [.3, -np.pi / 2., .5]])
+        q = quaternion.create_from_eulers(e)
+        result = euler.create_from_quaternion(q)
+        np.testing.assert_almost_equal(euler.roll(result), [0., 0.], decimal=5)
+        np.testing.assert_almost_equal(
+            matrix33.create_from_quaternion(quaternion.create_from_eulers(result)),
+            matrix33.create_from_quaternion(q), decimal=5)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import frustum, matrix44, plane
+
+
+class test_frustum(unittest.TestCase):
+    def setUp(self):
+        self.projection = matrix44.create_perspective_projection(90, 1., 1., 10.)
+
+    def test_import(self):
+        import pyrr
+        pyrr.frustum
+        from pyrr import frustum
+
+    def test_create_from_matrix(self):
+        result = frustum.create_from_matrix(self.projection)
+        self.assertEqual(result.shape, (6,4))
+        s = np.sqrt(.5)
+        np.testing.assert_almost_equal(result[frustum.index.left], [s, 0., -s, 0.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.right], [-s, 0., -s, 0.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.bottom], [0., s, -s, 0.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.top], [0., -s, -s, 0.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.near], [0., 0., -1., 1.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.far], [0., 0., 1., -10.], decimal=5)
+
+        # the planes are in the plane module's format
+        np.testing.assert_almost_equal(plane.position(result[frustum.index.near]), [0., 0., -1.], decimal=5)
+
+    def test_create_from_matrix_view_projection(self):
+        view = matrix44.create_from_translation([0., 0., -5.])
+        result = frustum.create_from_matrix(matrix44.multiply(view, self.projection))
+        np.testing.assert_almost_equal(result[frustum.index.near], [0., 0., -1., -4.], decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.far], [0., 0., 1., -5.], decimal=5)
+
+    def test_create_from_matrix_reverse_z(self):
+        m = matrix44.create_perspective_projection(90, 1., 1., 10., reverse_z=True)
+        result = frustum.create_from_matrix(m, reverse_z=True)
+        np.testing.assert_almost_equal(result, frustum.create_from_matrix(self.projection), decimal=5)
+
+    def test_create_from_matrix_infinite_far(self):
+        m = matrix44.create_perspective_projection(90, 1., 1., np.inf)
+        result = frustum.create_from_matrix(m)
+        np.testing.assert_almost_equal(result[frustum.index.far, 0:3], [0., 0., 0.], decimal=5)
+        inside, outside, intersecting = frustum.classify_spheres(result, [[0., 0., -1e6, 100.]])
+        self.assertTrue(inside[0])
+
+    def test_create_from_matrix_int(self):
+        m = [[2,0,0,0],[0,2,0,0],[0,0,1,0],[0,0,0,1]]
+        result = frustum.create_from_matrix(m)
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result, frustum.create_from_matrix(np.array(m, dtype=float)), decimal=5)
+        np.testing.assert_almost_equal(result[frustum.index.left], [1., 0., 0., -.5], decimal=5)
+
+    def test_create_from_matrix_batch(self):
+        m = matrix44.create_perspective_projection([60., 90.], 1., 1., 10.)
+        result = frustum.create_from_matrix(m)
+        self.assertEqual(result.shape, (2,6,4))
+        np.testing.assert_almost_equal(result[1], frustum.create_from_matrix(self.projection), decimal=5)
+
+    def test_classify_spheres(self):
+        f = frustum.create_from_matrix(self.projection)
+        spheres = np.array([
+            [0., 0., -5., 1.],
+            [0., 0., 5., 1.],
+            [0., 0., -1., .5],
+            [100., 0., -5., 1.],
+            [0., 0., -10.5, 1.],
+        ])
+        inside, outside, intersecting = frustum.classify_spheres(f, spheres)
+        np.testing.assert_equal(inside, [True, False, False, False, False])
+        np.testing.assert_equal(outside, [False, True, False, True, False])
+        np.testing.assert_equal(intersecting, [False, False, True, False, True])
+
+    def test_classify_aabbs(self):
+        f = frustum.create_from_matrix(self.projection)
+        aabbs = np.array([
+            [[-1., -1., -6.], [1., 1., -4.]],
+            [[-1., -1., 4.], [1., 1., 6.]],
+            [[-1., -1., -2.], [1., 1., 0.]],
+            [[-20., -1., -6.], [20., 1., -4.]],
+        ])
+        inside, outside, intersecting = frustum.classify_aabbs(f, aabbs)
+        np.testing.assert_equal(inside, [True, False, False, False])
+        np.testing.assert_equal(outside, [False, True, False, False])
+        np.testing.assert_equal(intersecting, [False, False, True, True])
+
+    def test_classify_aabbs_against_points(self):
+        # boxes reported as inside or outside must agree with their corners
+        f = frustum.create_from_matrix(self.projection)
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-15., 15., (200,3))
+        extents = rng.uniform(.1, 2., (200,3))
+        aabbs = np.stack([centres - extents, centres + extents], axis=1)
+        inside, outside, intersecting = frustum.classify_aabbs(f, aabbs)
+
+        corners = np.stack([
+            np.stack([aabbs[:, i, 0], aabbs[:, j, 1], aabbs[:, k, 2]], axis=-1)
+            for i in (0, 1) for j in (0, 1) for k in (0, 1)
+        ], axis=1)
+        heights = np.dot(corners, f[:, 0:3].T) - f[:, 3]
+        corners_inside = np.all(heights >= 0., axis=-1)
+        self.assertTrue(np.all(np.all(corners_inside, axis=-1)[inside]))
+        self.assertFalse(np.any(corners_inside[outside]))
+        np.testing.assert_equal(inside ^ outside ^ intersecting, True)
+
+
+if __name__ == '__main__':
+    unittest.main()
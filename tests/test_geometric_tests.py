@@ -6,7 +6,7 @@ except:
     import unittest
 import numpy as np
 from pyrr import geometric_tests as gt
-from pyrr import line, plane, ray, sphere
+from pyrr import geometry, line, plane, ray, sphere
 
 
 class test_geometric_tests(unittest.TestCase):
@@ -209,6 +209,60 @@ class test_geometric_tests(unittest.TestCase):
         result = gt.ray_intersect_aabb(r, a)
         self.assertTrue(np.array_equal(result, [1.0, 1.0, 1.0]))
 
+    def test_rays_intersect_aabbs(self):
+        a = np.array([
+            [[-1.0,-1.0,-1.0], [ 1.0, 1.0, 1.0]],
+            [[-1.0,-1.0,-1.0], [ 1.0, 1.0, 1.0]],
+            [[-1.0,-1.0,-1.0], [ 1.0, 1.0, 1.0]],
+            [[-1.0,-1.0,-1.0], [ 1.0, 1.0, 1.0]],
+            [[ 1.0, 1.0, 1.0], [ 4.0, 4.0, 4.0]],
+            [[ 1.0, 1.0, 1.0], [ 4.0, 4.0, 4.0]],
+        ])
+        r = np.array([
+            [[ 0.5, 0.5, 0.0], [ 0.0, 0.0,-1.0]],
+            [[ 2.0, 2.0, 2.0], [-1.0,-1.0,-1.0]],
+            [[ 2.0, 2.0, 2.0], [ 1.0, 1.0, 1.0]],
+            [[ 2.0, 0.0, 0.0], [ 0.0, 0.0, 1.0]],
+            [[ 1.0, 0.0, 0.0], [ 0.0, 1.0, 1.0]],
+            [[ 0.0, 0.0, 0.0], [ 0.0, 1.0, 1.0]],
+        ])
+        hit, tmin, tmax = gt.rays_intersect_aabbs(r, a)
+        np.testing.assert_equal(hit, [True, True, False, False, True, False])
+        np.testing.assert_almost_equal(tmin[[0, 1, 4]], [-1., 1., 1.])
+        np.testing.assert_almost_equal(tmax[[0, 1, 4]], [1., 3., 4.])
+
+    def test_rays_intersect_aabbs_int(self):
+        a = [[[-1,-1,-1], [1,1,1]], [[1,1,1], [4,4,4]]]
+        r = [[[0,0,-5], [0,0,2]], [[0,0,0], [0,1,1]]]
+        hit, tmin, tmax = gt.rays_intersect_aabbs(r, a)
+        np.testing.assert_equal(hit, [True, False])
+        np.testing.assert_almost_equal(tmin[0], 2.)
+        np.testing.assert_almost_equal(tmax[0], 3.)
+
+        hit, tmin, tmax = gt.rays_intersect_aabbs(r, a, all_pairs=True)
+        np.testing.assert_equal(hit, [[True, False], [True, False]])
+
+    def test_rays_intersect_aabbs_matches_ray_intersect_aabb(self):
+        rng = np.random.RandomState(0)
+        r = np.stack([rng.uniform(-3., 3., (50,3)), rng.normal(size=(50,3))], axis=1)
+        centres = rng.uniform(-2., 2., (20,3))
+        a = np.stack([centres - 1., centres + 1.], axis=1)
+
+        hit, tmin, tmax = gt.rays_intersect_aabbs(r, a, all_pairs=True)
+        self.assertEqual(hit.shape, (50,20))
+        self.assertTrue(np.any(hit) and not np.all(hit))
+        for i in range(50):
+            for j in range(20):
+                point = gt.ray_intersect_aabb(r[i], a[j])
+                self.assertEqual(hit[i,j], point is not None)
+                if point is not None:
+                    t = tmin[i,j] if tmin[i,j] >= 0. else tmax[i,j]
+                    np.testing.assert_almost_equal(r[i,0] + r[i,1] * t, point)
+
+        # paired results match the diagonal of all pairs
+        paired = gt.rays_intersect_aabbs(r[:20], a)
+        np.testing.assert_equal(paired[0], np.diagonal(hit))
+
     def test_point_height_above_plane(self):
         pl = plane.create([0., 1., 0.], 1.)
         p = np.array([0., 1., 0.])
@@ -281,6 +335,46 @@ class test_geometric_tests(unittest.TestCase):
         s2 = sphere.create([3.,0.,0.], 1.0)
         self.assertEqual(gt.sphere_penetration_sphere(s1, s2), 0.0)
 
+    def test_spheres_intersect_spheres(self):
+        s1 = np.tile(sphere.create(), (4,1))
+        s2 = np.array([
+            [0., 0., 0., 1.],
+            [1., 0., 0., 1.],
+            [2., 0., 0., 1.],
+            [3., 0., 0., 1.],
+        ])
+        np.testing.assert_equal(gt.spheres_intersect_spheres(s1, s2), [True, True, True, False])
+        np.testing.assert_almost_equal(gt.spheres_penetration_spheres(s1, s2), [2., 1., 0., 0.])
+
+    def test_spheres_intersect_spheres_single(self):
+        self.assertTrue(gt.spheres_intersect_spheres([0.,0.,0.,1.], [1.,0.,0.,1.]))
+        self.assertFalse(gt.spheres_intersect_spheres([0.,0.,0.,1.], [3.,0.,0.,1.]))
+        np.testing.assert_almost_equal(gt.spheres_penetration_spheres([0.,0.,0.,1.], [1.,0.,0.,1.]), 1.)
+        np.testing.assert_almost_equal(gt.spheres_penetration_spheres([0.,0.,0.,1.], [3.,0.,0.,1.]), 0.)
+
+    def test_spheres_intersect_spheres_int(self):
+        s1 = [[0,0,0,1], [0,0,0,1]]
+        s2 = [[1,0,0,1], [3,0,0,1]]
+        np.testing.assert_equal(gt.spheres_intersect_spheres(s1, s2), [True, False])
+        result = gt.spheres_penetration_spheres(s1, s2)
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result, [1., 0.])
+        np.testing.assert_almost_equal(gt.spheres_penetration_spheres(s1, s2, all_pairs=True), [[1., 0.], [1., 0.]])
+
+    def test_spheres_intersect_spheres_all_pairs(self):
+        rng = np.random.RandomState(0)
+        s1 = np.concatenate([rng.uniform(-3., 3., (30,3)), rng.uniform(.5, 2., (30,1))], axis=-1)
+        s2 = np.concatenate([rng.uniform(-3., 3., (20,3)), rng.uniform(.5, 2., (20,1))], axis=-1)
+
+        hit = gt.spheres_intersect_spheres(s1, s2, all_pairs=True)
+        penetration = gt.spheres_penetration_spheres(s1, s2, all_pairs=True)
+        self.assertEqual(hit.shape, (30,20))
+        self.assertTrue(np.any(hit) and not np.all(hit))
+        for i in range(30):
+            for j in range(20):
+                self.assertEqual(hit[i,j], gt.sphere_does_intersect_sphere(s1[i], s2[j]))
+                self.assertAlmostEqual(penetration[i,j], gt.sphere_penetration_sphere(s1[i], s2[j]))
+
     def test_ray_intersect_sphere_no_solution_1(self):
         r = ray.create([0, 2, 0], [1, 0, 0])
         s = sphere.create([0, 0, 0], 1)
@@ -316,6 +410,117 @@ class test_geometric_tests(unittest.TestCase):
         np.testing.assert_array_almost_equal(intersections[0], np.array([0.44, 1.77, -0.32]), decimal=2)
         np.testing.assert_array_almost_equal(intersections[1], np.array([1.41, 1.62, 0.67]), decimal=2)
 
+    def test_rays_intersect_spheres(self):
+        r = np.array([
+            [[-2., 0., 0.], [1., 0., 0.]],
+            [[ 0., 0., 0.], [1., 0., 0.]],
+            [[ 0., 2., 0.], [1., 0., 0.]],
+            [[ 2., 0., 0.], [1., 0., 0.]],
+            [[-2., 1., 0.], [2., 0., 0.]],
+        ])
+        s = np.array([
+            [0., 0., 0., 1.],
+            [0., 0., 0., 1.],
+            [0., 0., 0., 1.],
+            [0., 0., 0., 1.],
+            [0., 0., 0., 1.],
+        ])
+        hit, tnear, tfar = gt.rays_intersect_spheres(r, s)
+        np.testing.assert_equal(hit, [True, True, False, False, True])
+        np.testing.assert_almost_equal(tnear[[0, 1, 3, 4]], [1., -1., -3., 1.])
+        np.testing.assert_almost_equal(tfar[[0, 1, 3, 4]], [3., 1., -1., 1.])
+        self.assertTrue(np.isnan(tnear[2]) and np.isnan(tfar[2]))
+
+    def test_rays_intersect_spheres_all_pairs(self):
+        rng = np.random.RandomState(0)
+        d = rng.normal(size=(30,3))
+        r = np.stack([rng.uniform(-3., 3., (30,3)), d / np.linalg.norm(d, axis=-1)[:, np.newaxis]], axis=1)
+        s = np.concatenate([rng.uniform(-2., 2., (10,3)), rng.uniform(.5, 2., (10,1))], axis=-1)
+
+        hit, tnear, tfar = gt.rays_intersect_spheres(r, s, all_pairs=True)
+        self.assertEqual(hit.shape, (30,10))
+        self.assertTrue(np.any(hit) and not np.all(hit))
+        for i in range(30):
+            for j in range(10):
+                points = ray_intersect_sphere(r[i], s[j])
+                self.assertEqual(hit[i,j], len(points) > 0)
+                if tnear[i,j] >= 0.:
+                    np.testing.assert_almost_equal(r[i,0] + r[i,1] * tnear[i,j], min(points, key=lambda p: np.dot(p - r[i,0], r[i,1])))
+
+
+    def test_rays_intersect_triangles(self):
+        t = np.array([[-1.,-1., 0.], [ 1.,-1., 0.], [-1., 1., 0.]])
+        r = np.array([
+            [[-.5,-.5, 2.], [ 0., 0.,-1.]],
+            [[-.5,-.5,-2.], [ 0., 0., 1.]],
+            [[ .5, .5, 2.], [ 0., 0.,-1.]],
+            [[-.5,-.5, 2.], [ 0., 0., 1.]],
+            [[-.5,-.5, 2.], [ 1., 0., 0.]],
+            [[-1.,-1., 2.], [ 0., 0.,-2.]],
+        ])
+        hit, dist, bary = gt.rays_intersect_triangles(r, t)
+        np.testing.assert_equal(hit, [True, True, False, False, False, True])
+        np.testing.assert_almost_equal(dist[hit], [2., 2., 1.])
+        np.testing.assert_almost_equal(bary[0], [.5, .25, .25])
+        np.testing.assert_almost_equal(bary[5], [1., 0., 0.])
+        self.assertTrue(np.all(np.isinf(dist[~hit])))
+
+        # the ray from below hits the back face
+        hit, dist, bary = gt.rays_intersect_triangles(r, t, cull_backfaces=True)
+        np.testing.assert_equal(hit, [True, False, False, False, False, True])
+
+    def test_rays_intersect_triangles_all_pairs(self):
+        rng = np.random.RandomState(0)
+        t = rng.uniform(-1., 1., (40,1,3)) + rng.uniform(-.5, .5, (40,3,3))
+        r = np.stack([rng.uniform(-2., 2., (30,3)), rng.normal(size=(30,3))], axis=1)
+        for cull in (False, True):
+            hit, dist, bary = gt.rays_intersect_triangles(r, t, cull_backfaces=cull, all_pairs=True)
+            self.assertEqual(hit.shape, (30,40))
+            self.assertEqual(bary.shape, (30,40,3))
+            self.assertTrue(np.any(hit))
+            expected = gt.rays_intersect_triangles(r[:, np.newaxis], t[np.newaxis], cull_backfaces=cull)
+            np.testing.assert_equal(hit, expected[0])
+            np.testing.assert_almost_equal(dist[hit], expected[1][hit])
+            np.testing.assert_almost_equal(bary[hit], expected[2][hit])
+
+            # the barycentrics and t give the same point
+            ri, ti = np.nonzero(hit)
+            points = r[ri, 0] + r[ri, 1] * dist[hit][:, np.newaxis]
+            np.testing.assert_almost_equal(points, np.einsum('ij,ijk->ik', bary[hit], t[ti]))
+
+    def test_rays_closest_triangle(self):
+        # the cube is counter clockwise when viewed from outside
+        vertices, indices = geometry.create_cube((2., 2., 2.), st=True)
+        r = np.array([
+            [[ 0., 0., 5.], [ 0., 0.,-1.]],
+            [[ .2, .3,-5.], [ 0., 0., 1.]],
+            [[ 5., 5., 5.], [ 0., 0., 1.]],
+            [[ 0., 0., 0.], [ 0., 0., 1.]],
+        ])
+        triangle, dist, bary = gt.rays_closest_triangle(r, vertices, indices, block_size=1)
+        np.testing.assert_equal(triangle[2], -1)
+        np.testing.assert_almost_equal(dist, [4., 4., np.inf, 1.])
+        self.assertTrue(np.all(np.isnan(bary[2])))
+
+        triangles = vertices[indices.reshape(-1,3), 0:3]
+        for i in (0, 1, 3):
+            point = r[i, 0] + r[i, 1] * dist[i]
+            np.testing.assert_almost_equal(point, np.dot(bary[i], triangles[triangle[i]]), decimal=5)
+
+        # the ray from inside the cube only hits back faces
+        triangle, dist, bary = gt.rays_closest_triangle(r, vertices, indices, cull_backfaces=True)
+        np.testing.assert_equal(triangle[2:], [-1, -1])
+        np.testing.assert_almost_equal(dist[0:2], [4., 4.])
+
+    def test_rays_closest_triangle_matches_all_pairs(self):
+        rng = np.random.RandomState(1)
+        t = rng.uniform(-3., 3., (200,1,3)) + rng.uniform(-.5, .5, (200,3,3))
+        r = np.stack([rng.uniform(-3., 3., (50,3)), rng.normal(size=(50,3))], axis=1)
+        triangle, dist, bary = gt.rays_closest_triangle(r, t, block_size=1000)
+        hit, all_dist, all_bary = gt.rays_intersect_triangles(r, t, all_pairs=True)
+        self.assertTrue(np.any(triangle >= 0) and np.any(triangle < 0))
+        np.testing.assert_equal(triangle >= 0, np.any(hit, axis=-1))
+        np.testing.assert_almost_equal(dist, np.min(all_dist, axis=-1))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,94 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import kdtree
+
+
+class test_kdtree(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.points = self.rng.uniform(0., 10., (2000,3))
+        self.queries = self.rng.uniform(-2., 12., (300,3))
+        self.distances = np.sqrt(np.sum((self.queries[:, None] - self.points[None]) ** 2, axis=-1))
+
+    def test_import(self):
+        import pyrr
+        pyrr.kdtree
+        from pyrr import kdtree
+
+    def test_create_from_points(self):
+        tree = kdtree.create_from_points(self.points, leaf_size=8)
+        np.testing.assert_equal(np.sort(tree.indices), np.arange(2000))
+        np.testing.assert_almost_equal(tree.points, self.points[tree.indices])
+        self.assertEqual(tree.levels[-1], len(tree.bounds))
+
+        leaves = tree.children[:, 0] < 0
+        self.assertTrue(np.all(tree.count[leaves] <= 8))
+        self.assertTrue(np.all(tree.count[~leaves] > 8))
+        for node in range(len(tree.bounds)):
+            points = tree.points[tree.start[node]:tree.start[node] + tree.count[node]]
+            np.testing.assert_almost_equal(tree.bounds[node, 0], np.min(points, axis=0))
+            np.testing.assert_almost_equal(tree.bounds[node, 1], np.max(points, axis=0))
+
+    def test_create_from_points_coincident(self):
+        tree = kdtree.create_from_points(np.ones((50,3)), leaf_size=4)
+        nearest, distance = kdtree.query_nearest(tree, [[0., 0., 0.]], k=3)
+        np.testing.assert_almost_equal(distance, [[np.sqrt(3.)] * 3])
+
+    def test_create_from_points_int(self):
+        points = self.rng.randint(0, 100, (500,3))
+        tree = kdtree.create_from_points(points)
+        self.assertTrue(tree.bounds.dtype == float)
+
+        queries = self.rng.randint(0, 100, (20,3))
+        distances = np.sqrt(np.sum((queries[:, None] - points[None]) ** 2, axis=-1))
+        nearest, distance = kdtree.query_nearest(tree, queries, k=3)
+        np.testing.assert_almost_equal(distance, np.sort(distances, axis=-1)[:, :3])
+
+    def test_create_from_points_invalid_leaf_size(self):
+        self.assertRaises(ValueError, lambda: kdtree.create_from_points(self.points, leaf_size=0))
+
+    def test_query_nearest(self):
+        tree = kdtree.create_from_points(self.points)
+        for k in (1, 7, 40):
+            nearest, distance = kdtree.query_nearest(tree, self.queries, k, block_size=100)
+            self.assertEqual(nearest.shape, (300,k))
+            expected = np.sort(self.distances, axis=-1)[:, :k]
+            np.testing.assert_almost_equal(distance, expected)
+            np.testing.assert_almost_equal(self.distances[np.arange(300)[:, None], nearest], expected)
+
+    def test_query_nearest_fewer_points(self):
+        tree = kdtree.create_from_points(self.points[:3])
+        nearest, distance = kdtree.query_nearest(tree, self.queries[:10], k=5)
+        np.testing.assert_equal(np.sort(nearest[:, :3], axis=-1), np.tile(np.arange(3), (10,1)))
+        np.testing.assert_equal(nearest[:, 3:], -1)
+        self.assertTrue(np.all(np.isinf(distance[:, 3:])))
+
+    def test_query_nearest_empty(self):
+        tree = kdtree.create_from_points(np.empty((0,3)))
+        nearest, distance = kdtree.query_nearest(tree, self.queries[:2], k=2)
+        np.testing.assert_equal(nearest, -1)
+        self.assertTrue(np.all(np.isinf(distance)))
+
+    def test_query_radius(self):
+        tree = kdtree.create_from_points(self.points)
+        query, point, distance = kdtree.query_radius(tree, self.queries, 1.5, block_size=100)
+        expected = np.argwhere(self.distances <= 1.5)
+        self.assertTrue(len(query) > 0)
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(point, expected[:, 1])
+        np.testing.assert_almost_equal(distance, self.distances[query, point])
+
+    def test_query_radius_per_query(self):
+        tree = kdtree.create_from_points(self.points)
+        radius = self.rng.uniform(0., 2., 300)
+        query, point, distance = kdtree.query_radius(tree, self.queries, radius)
+        expected = np.argwhere(self.distances <= radius[:, None])
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(point, expected[:, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
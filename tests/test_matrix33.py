@@ -97,6 +97,26 @@ class test_matrix33(unittest.TestCase):
         # TODO: check the result
         matrix33.create_from_eulers([1,2,3])
 
+    def test_create_from_eulers_batch(self):
+        e = np.random.uniform(-np.pi, np.pi, (8,3))
+        result = matrix33.create_from_eulers(e)
+        self.assertEqual(result.shape, (8,3,3))
+        for i in range(8):
+            np.testing.assert_almost_equal(result[i], matrix33.create_from_eulers(e[i]), decimal=5)
+
+    def test_create_from_axis_rotation_batch(self):
+        axis = np.array([[1., 0., 0.], [0., 2., 0.], [1., 1., 1.]])
+        theta = np.array([np.pi / 2., np.pi, np.pi / 3.])
+        result = matrix33.create_from_axis_rotation(axis, theta)
+        self.assertEqual(result.shape, (3,3,3))
+        for i in range(3):
+            np.testing.assert_almost_equal(result[i], matrix33.create_from_axis_rotation(axis[i], theta[i]), decimal=5)
+
+        # a single axis with many angles
+        result = matrix33.create_from_axis_rotation([0., 0., 1.], theta)
+        self.assertEqual(result.shape, (3,3,3))
+        np.testing.assert_almost_equal(result[1], matrix33.create_from_axis_rotation([0., 0., 1.], theta[1]), decimal=5)
+
     def test_create_from_axis_rotation(self):
         # wolfram alpha can be awesome sometimes
         result = matrix33.create_from_axis_rotation([0.57735, 0.57735, 0.57735],np.pi)
@@ -157,6 +177,29 @@ class test_matrix33(unittest.TestCase):
         expected = matrix33.create_from_z_rotation(np.pi)
         self.assertTrue(np.allclose(result, expected))
 
+    def test_create_out(self):
+        out = np.empty((3,3))
+        result = matrix33.create_from_x_rotation(np.pi / 2., out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, matrix33.create_from_x_rotation(np.pi / 2.), decimal=5)
+
+        result = matrix33.create_from_quaternion([1., 0., 0., 0.], out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, matrix33.create_from_quaternion([1., 0., 0., 0.]), decimal=5)
+
+        result = matrix33.create_from_scale([2., 3., 4.], out=out)
+        np.testing.assert_almost_equal(out, np.diag([2., 3., 4.]), decimal=5)
+
+        result = matrix33.create_identity(out=out)
+        np.testing.assert_almost_equal(out, np.identity(3), decimal=5)
+
+    def test_create_out_slice(self):
+        out = np.zeros((4,3,3))
+        matrix33.create_from_eulers([1., 2., 3.], out=out[2])
+        np.testing.assert_almost_equal(out[2], matrix33.create_from_eulers([1., 2., 3.]), decimal=5)
+        np.testing.assert_equal(out[:2], 0.)
+        np.testing.assert_equal(out[3], 0.)
+
     def test_apply_to_vector_identity(self):
         mat = matrix33.create_identity()
         vec = vector3.unit.x
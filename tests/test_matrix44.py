@@ -76,6 +76,14 @@ class test_matrix44(unittest.TestCase):
         np.testing.assert_almost_equal(result, matrix44.create_from_quaternion([5.77350000e-01, 5.77350000e-01, 5.77350000e-01, 6.12323400e-17]), decimal=3)
         self.assertTrue(result.dtype == float)
 
+    def test_create_from_axis_rotation_batch(self):
+        axis = np.array([[1., 0., 0.], [0., 2., 0.], [1., 1., 1.]])
+        theta = np.array([np.pi / 2., np.pi, np.pi / 3.])
+        result = matrix44.create_from_axis_rotation(axis, theta)
+        self.assertEqual(result.shape, (3,4,4))
+        for i in range(3):
+            np.testing.assert_almost_equal(result[i], matrix44.create_from_axis_rotation(axis[i], theta[i]), decimal=5)
+
     def test_create_from_inverse_of_quaternion(self):
         q = quaternion.create_from_x_rotation(np.pi / 2.0)
         result = matrix44.create_from_inverse_of_quaternion(q)
@@ -91,6 +99,48 @@ class test_matrix44(unittest.TestCase):
         result = matrix44.create_from_scale([2.,3.,4.])
         np.testing.assert_almost_equal(result.diagonal()[:-1], [2.,3.,4.], decimal=5)
 
+    def test_create_from_trs(self):
+        t = [10., 0., -5.]
+        q = quaternion.create_from_y_rotation(np.pi / 3.)
+        s = [1., 2., 3.]
+        result = matrix44.create_from_trs(t, q, s)
+        expected = matrix44.create_from_scale(s).dot(matrix44.create_from_quaternion(q)).dot(matrix44.create_from_translation(t))
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+        result = matrix44.create_from_trs(t, q)
+        expected = matrix44.create_from_quaternion(q).dot(matrix44.create_from_translation(t))
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+    def test_create_from_trs_dtype(self):
+        # the translation is not truncated to the quaternion's dtype
+        result = matrix44.create_from_trs([1.5, 2.5, 3.5], [0, 0, 0, 1])
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result[3, 0:3], [1.5, 2.5, 3.5], decimal=5)
+
+        result = matrix44.create_from_trs([1, 2, 3], [0, 0, 0, 1])
+        self.assertTrue(result.dtype == float)
+
+        result = matrix44.create_from_trs(np.zeros(3, dtype=np.float32), np.array([0., 0., 0., 1.], dtype=np.float32))
+        self.assertTrue(result.dtype == np.float32)
+
+    def test_create_from_trs_batch(self):
+        t = np.random.random((8,3))
+        q = quaternion.normalize(np.random.random((8,4)))
+        s = np.random.random((8,3)) + 0.5
+        result = matrix44.create_from_trs(t, q, s)
+        self.assertEqual(result.shape, (8,4,4))
+        for i in range(8):
+            np.testing.assert_almost_equal(result[i], matrix44.create_from_trs(t[i], q[i], s[i]), decimal=5)
+
+        # a single rotation and scale for many translations
+        result = matrix44.create_from_trs(t, q[0], [2., 2., 2.])
+        self.assertEqual(result.shape, (8,4,4))
+        np.testing.assert_almost_equal(result[:, 3, :3], t, decimal=5)
+
+        out = np.empty((8,4,4))
+        result = matrix44.create_from_trs(t, q, s, out=out)
+        self.assertTrue(result is out)
+
     def test_create_matrix33_view( self ):
         mat = matrix44.create_identity()
         result = matrix44.create_matrix33_view(mat)
@@ -110,6 +160,46 @@ class test_matrix44(unittest.TestCase):
         mat[0,0] = 2.
         np.testing.assert_almost_equal(result[:3,:3], orig, decimal=5)
 
+    def test_create_out(self):
+        out = np.empty((4,4))
+        result = matrix44.create_from_quaternion([1., 0., 0., 0.], out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, matrix44.create_from_quaternion([1., 0., 0., 0.]), decimal=5)
+
+        result = matrix44.create_from_translation([1., 2., 3.], out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, matrix44.create_from_translation([1., 2., 3.]), decimal=5)
+
+        matrix44.create_from_scale([1., 2., 3.], out=out)
+        np.testing.assert_almost_equal(out, matrix44.create_from_scale([1., 2., 3.]), decimal=5)
+
+        matrix44.create_from_eulers([1., 2., 3.], out=out)
+        np.testing.assert_almost_equal(out, matrix44.create_from_eulers([1., 2., 3.]), decimal=5)
+
+        matrix44.create_perspective_projection(90, 1024./768., 1., 10., out=out)
+        np.testing.assert_almost_equal(out, matrix44.create_perspective_projection(90, 1024./768., 1., 10.), decimal=5)
+
+        matrix44.create_orthogonal_projection(-1., 1., -1., 1., 1., 10., out=out)
+        np.testing.assert_almost_equal(out, matrix44.create_orthogonal_projection(-1., 1., -1., 1., 1., 10.), decimal=5)
+
+        matrix44.create_look_at([1., 2., 3.], [0., 0., 0.], [0., 1., 0.], out=out)
+        np.testing.assert_almost_equal(out, matrix44.create_look_at([1., 2., 3.], [0., 0., 0.], [0., 1., 0.]), decimal=5)
+
+        matrix44.create_identity(out=out)
+        np.testing.assert_almost_equal(out, np.identity(4), decimal=5)
+
+    def test_create_out_slice(self):
+        out = np.zeros((3,4,4))
+        matrix44.create_from_y_rotation(np.pi / 2., out=out[1])
+        np.testing.assert_almost_equal(out[1], matrix44.create_from_y_rotation(np.pi / 2.), decimal=5)
+        np.testing.assert_equal(out[0], 0.)
+        np.testing.assert_equal(out[2], 0.)
+
+        # a stack of rotations written into a slice of the buffer
+        matrix44.create_from_z_rotation([0., np.pi], out=out[1:])
+        np.testing.assert_almost_equal(out[1], np.identity(4), decimal=5)
+        np.testing.assert_almost_equal(out[2], matrix44.create_from_z_rotation(np.pi), decimal=5)
+
     def test_create_perspective_projection_matrix_vector3(self):
         def apply_test(m, point, inside):
             p = matrix44.apply_to_vector(m, point)
@@ -134,6 +224,59 @@ class test_matrix44(unittest.TestCase):
         self.assertEqual(m1.dtype, np.float32)
         self.assertEqual(m2.dtype, np.float64)
 
+    def test_create_perspective_projection_batch(self):
+        fovy = np.array([60., 90., 120.])
+        near = np.array([.1, 1., 2.])
+        result = matrix44.create_perspective_projection(fovy, 1024./768., near, 100.)
+        self.assertEqual(result.shape, (3,4,4))
+        for i in range(3):
+            np.testing.assert_almost_equal(result[i], matrix44.create_perspective_projection(fovy[i], 1024./768., near[i], 100.), decimal=5)
+
+        result = matrix44.create_orthogonal_projection(-1., 1., -1., 1., near, 100.)
+        self.assertEqual(result.shape, (3,4,4))
+        for i in range(3):
+            np.testing.assert_almost_equal(result[i], matrix44.create_orthogonal_projection(-1., 1., -1., 1., near[i], 100.), decimal=5)
+
+    def test_create_perspective_projection_batch_lists(self):
+        result = matrix44.create_perspective_projection([60., 90.], 1., [1., 2.], 100.)
+        self.assertEqual(result.shape, (2,4,4))
+        np.testing.assert_almost_equal(result[1], matrix44.create_perspective_projection(90., 1., 2., 100.), decimal=5)
+
+        left, right = [-1., -2.], [1., 3.]
+        result = matrix44.create_perspective_projection_from_bounds(left, right, -1., 1., 1., 100.)
+        self.assertEqual(result.shape, (2,4,4))
+        np.testing.assert_almost_equal(result[1], matrix44.create_perspective_projection_from_bounds(-2., 3., -1., 1., 1., 100.), decimal=5)
+
+        result = matrix44.create_orthogonal_projection(left, right, -1., 1., 1., 100.)
+        self.assertEqual(result.shape, (2,4,4))
+        np.testing.assert_almost_equal(result[1], matrix44.create_orthogonal_projection(-2., 3., -1., 1., 1., 100.), decimal=5)
+
+    def test_create_perspective_projection_reverse_z(self):
+        m = matrix44.create_perspective_projection(90, 1024./768., 1., 10., reverse_z=True)
+        depth = matrix44.apply_to_vector(m, [[0., 0., -1.], [0., 0., -10.], [0., 0., -5.]])[:, 2]
+        np.testing.assert_almost_equal(depth[:2], [1., 0.], decimal=5)
+        self.assertTrue(0. < depth[2] < 1.)
+
+        m = matrix44.create_orthogonal_projection(-1., 1., -1., 1., 1., 10., reverse_z=True)
+        depth = matrix44.apply_to_vector(m, [[0., 0., -1.], [0., 0., -10.]])[:, 2]
+        np.testing.assert_almost_equal(depth, [1., 0.], decimal=5)
+
+    def test_create_perspective_projection_infinite_far(self):
+        m = matrix44.create_perspective_projection(90, 1024./768., 1., np.inf)
+        self.assertTrue(np.all(np.isfinite(m)))
+        np.testing.assert_almost_equal(m, matrix44.create_perspective_projection(90, 1024./768., 1., 1e12), decimal=5)
+        depth = matrix44.apply_to_vector(m, [[0., 0., -1.], [0., 0., -1e8]])[:, 2]
+        np.testing.assert_almost_equal(depth, [-1., 1.], decimal=5)
+
+        m = matrix44.create_perspective_projection(90, 1024./768., 1., np.inf, reverse_z=True)
+        depth = matrix44.apply_to_vector(m, [[0., 0., -1.], [0., 0., -1e8]])[:, 2]
+        np.testing.assert_almost_equal(depth, [1., 0.], decimal=5)
+
+        # finite and infinite far planes in the one call
+        result = matrix44.create_perspective_projection(90, 1., 1., [10., np.inf])
+        np.testing.assert_almost_equal(result[0], matrix44.create_perspective_projection(90, 1., 1., 10.), decimal=5)
+        np.testing.assert_almost_equal(result[1], matrix44.create_perspective_projection(90, 1., 1., np.inf), decimal=5)
+
     def test_create_perspective_projection_matrix_vector4_inside(self):
         def apply_test(m, point, inside):
             p = matrix44.apply_to_vector(m, point)
@@ -346,6 +489,19 @@ class test_matrix44(unittest.TestCase):
         self.assertAlmostEqual(y, 0.0)
         self.assertAlmostEqual(z, -10.0)
 
+    def test_create_look_at_batch(self):
+        eye = np.random.uniform(-10., 10., (8,3))
+        target = np.random.uniform(-10., 10., (8,3))
+        up = np.array([0., 1., 0.])
+        result = matrix44.create_look_at(eye, target, up)
+        self.assertEqual(result.shape, (8,4,4))
+        for i in range(8):
+            np.testing.assert_almost_equal(result[i], matrix44.create_look_at(eye[i], target[i], up), decimal=5)
+
+        out = np.empty((8,4,4))
+        self.assertTrue(matrix44.create_look_at(eye, target, up, out=out) is out)
+        np.testing.assert_almost_equal(out, result, decimal=5)
+
     def test_create_look_at_3(self):
         m = matrix44.create_look_at(
             np.array((10.0, 0.0, 0.0)),
@@ -415,6 +571,70 @@ class test_matrix44(unittest.TestCase):
         result = matrix44.apply_to_vector(mat, [1.,1.,1.])
         np.testing.assert_almost_equal(result, [3.,4.,5.], decimal=5)
 
+    def test_apply_to_vector_batch(self):
+        mat = matrix44.multiply(
+            matrix44.create_from_z_rotation(np.pi / 2.),
+            matrix44.create_from_translation([2.,3.,4.])
+        )
+        vecs = np.array([[1.,0.,0.], [0.,1.,0.], [1.,1.,1.]])
+        result = matrix44.apply_to_vector(mat, vecs)
+        expected = [matrix44.apply_to_vector(mat, v) for v in vecs]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+    def test_apply_to_vector_batch_infinity(self):
+        mat = matrix44.create_perspective_projection(90, 1., 1., 10.)
+        vecs = np.array([[0.,0.,0.], [0.,0.,-2.]])
+        result = matrix44.apply_to_vector(mat, vecs)
+        self.assertTrue(np.all(np.isinf(result[0])))
+        np.testing.assert_almost_equal(result[1], matrix44.apply_to_vector(mat, vecs[1]), decimal=5)
+
+    def test_apply_to_vector_matrix_stack(self):
+        mats = np.array([
+            matrix44.create_from_translation([1.,0.,0.]),
+            matrix44.create_from_x_rotation(np.pi),
+            matrix44.create_from_scale([2.,2.,2.]),
+        ])
+        vecs = np.array([[1.,1.,1.], [0.,1.,0.], [1.,2.,3.]])
+        result = matrix44.apply_to_vector(mats, vecs)
+        np.testing.assert_almost_equal(result, [[2.,1.,1.], [0.,-1.,0.], [2.,4.,6.]], decimal=5)
+
+        # a single vector is applied to every matrix
+        result = matrix44.apply_to_vector(mats, [1.,1.,1.])
+        self.assertEqual(result.shape, (3, 3))
+        np.testing.assert_almost_equal(result[0], [2.,1.,1.], decimal=5)
+
+        vecs4 = np.array([[1.,1.,1.,1.], [0.,1.,0.,0.], [1.,2.,3.,1.]])
+        result = matrix44.apply_to_vector(mats, vecs4)
+        np.testing.assert_almost_equal(result, [[2.,1.,1.,1.], [0.,-1.,0.,0.], [2.,4.,6.,1.]], decimal=5)
+
+    def test_apply_to_vector_matrix_stack_pairing(self):
+        # vector i is paired with matrix i, rather than every vector being
+        # applied to every matrix
+        mats = np.array([matrix44.create_from_scale([s, s, s]) for s in (1., 2., 3., 4.)])
+        vecs4 = np.array([[1.,0.,0.,1.], [0.,1.,0.,1.], [0.,0.,1.,1.], [1.,1.,1.,1.]])
+        result = matrix44.apply_to_vector(mats, vecs4)
+        self.assertEqual(result.shape, (4,4))
+        np.testing.assert_almost_equal(result, [[1.,0.,0.,1.], [0.,2.,0.,1.], [0.,0.,3.,1.], [4.,4.,4.,1.]], decimal=5)
+
+        # every pair is produced by adding an axis to the vectors
+        result = matrix44.apply_to_vector(mats, vecs4[:, np.newaxis])
+        self.assertEqual(result.shape, (4,4,4))
+        for i in range(4):
+            for j in range(4):
+                np.testing.assert_almost_equal(result[i, j], matrix44.apply_to_vector(mats[j], vecs4[i]), decimal=5)
+
+        # different numbers of vectors and matrices don't broadcast
+        self.assertRaises(ValueError, lambda: matrix44.apply_to_vector(mats, vecs4[:3]))
+
+    def test_apply_to_vector_affine(self):
+        mat = matrix44.multiply(
+            matrix44.create_from_y_rotation(np.pi / 3.),
+            matrix44.create_from_translation([2.,3.,4.])
+        )
+        vecs = np.array([[1.,0.,0.], [0.,1.,0.], [1.,1.,1.]])
+        result = matrix44.apply_to_vector(mat, vecs, affine=True)
+        np.testing.assert_almost_equal(result, matrix44.apply_to_vector(mat, vecs), decimal=5)
+
     @unittest.skip('Not implemented')
     def test_create_from_eulers(self):
         # just call the function
@@ -456,6 +676,54 @@ class test_matrix44(unittest.TestCase):
         result = matrix44.inverse(m)
         self.assertTrue(np.allclose(result, matrix44.create_from_y_rotation(-np.pi)))
     
+    def test_inverse_affine(self):
+        m = matrix44.create_from_trs([1., 2., 3.], quaternion.create_from_eulers([.1, .2, .3]), [1., 2., -3.])
+        m[1, 0] += .5
+        np.testing.assert_almost_equal(matrix44.inverse_affine(m), np.linalg.inv(m), decimal=5)
+
+    def test_inverse_affine_batch(self):
+        t = np.random.random((8,3))
+        q = quaternion.normalize(np.random.random((8,4)))
+        s = np.random.random((8,3)) + 0.5
+        m = matrix44.create_from_trs(t, q, s)
+        result = matrix44.inverse_affine(m)
+        self.assertEqual(result.shape, (8,4,4))
+        np.testing.assert_almost_equal(result, np.linalg.inv(m), decimal=5)
+
+        # invert in place
+        expected = np.linalg.inv(m)
+        result = matrix44.inverse_affine(m, out=m)
+        self.assertTrue(result is m)
+        np.testing.assert_almost_equal(m, expected, decimal=5)
+
+    def test_inverse_affine_int(self):
+        m = [[2,0,0,0],[0,2,0,0],[0,0,2,0],[1,0,0,1]]
+        result = matrix44.inverse_affine(m)
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result, np.linalg.inv(m), decimal=5)
+
+    def test_inverse_rigid(self):
+        m = matrix44.create_look_at([1., 2., 3.], [0., 0., 0.], [0., 1., 0.])
+        np.testing.assert_almost_equal(matrix44.inverse_rigid(m), np.linalg.inv(m), decimal=5)
+
+    def test_inverse_rigid_batch(self):
+        t = np.random.random((8,3))
+        q = quaternion.normalize(np.random.random((8,4)))
+        m = matrix44.create_from_trs(t, q)
+        result = matrix44.inverse_rigid(m)
+        self.assertEqual(result.shape, (8,4,4))
+        np.testing.assert_almost_equal(result, np.linalg.inv(m), decimal=5)
+
+        expected = np.linalg.inv(m)
+        matrix44.inverse_rigid(m, out=m)
+        np.testing.assert_almost_equal(m, expected, decimal=5)
+
+    def test_inverse_rigid_int(self):
+        m = [[0,1,0,0],[-1,0,0,0],[0,0,1,0],[1,2,3,1]]
+        result = matrix44.inverse_rigid(m)
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result, np.linalg.inv(m), decimal=5)
+
     def test_decompose(self):
         # define expectations
         expected_scale = vector3.create(*[1, 1, 2], dtype='f4')
@@ -485,6 +753,29 @@ class test_matrix44(unittest.TestCase):
         np.testing.assert_almost_equal(translation, expected_translation)
         self.assertTrue(translation.dtype == expected_translation.dtype)
 
+    def test_decompose_batch(self):
+        # rotations which use each of the matrix to quaternion branches
+        q = np.array([
+            quaternion.create_from_eulers([.1, .2, .3]),
+            quaternion.create_from_x_rotation(np.pi * .9),
+            quaternion.create_from_y_rotation(np.pi * .9),
+            quaternion.create_from_z_rotation(np.pi * .9),
+        ])
+        s = np.array([[1., 2., 3.], [-1., 1., 1.], [2., 2., 2.], [.5, 1., 4.]])
+        t = np.array([[1., 2., 3.], [0., 0., 0.], [-1., 5., 2.], [3., 3., 3.]])
+        m = matrix44.create_from_trs(t, q, s)
+
+        scale, rotation, translation = matrix44.decompose(m)
+        self.assertEqual(scale.shape, (4,3))
+        self.assertEqual(rotation.shape, (4,4))
+        self.assertEqual(translation.shape, (4,3))
+        for i in range(4):
+            es, er, et = matrix44.decompose(m[i])
+            np.testing.assert_almost_equal(scale[i], es, decimal=5)
+            np.testing.assert_almost_equal(rotation[i], er, decimal=5)
+            np.testing.assert_almost_equal(translation[i], et, decimal=5)
+        np.testing.assert_almost_equal(matrix44.create_from_trs(translation, rotation, scale), m, decimal=5)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,133 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import octree, frustum, geometric_tests, matrix44
+from .helpers import random_aabbs
+
+
+def overlapping(boxes, aabbs):
+    return np.all((boxes[:, None, 0] <= aabbs[None, :, 1]) & (aabbs[None, :, 0] <= boxes[:, None, 1]), axis=-1)
+
+
+class test_octree(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.aabbs = random_aabbs(self.rng, 500, extent=(.05, .5))
+        self.ids = self.rng.permutation(1000)[:500]
+        self.tree = octree.create([[-10., -10., -10.], [10., 10., 10.]], max_depth=5)
+        octree.insert(self.tree, self.ids, self.aabbs)
+
+    def check_tree(self, tree):
+        # every object is within its node's loose bounds, unless it is in the root
+        slots = np.flatnonzero(tree.ids >= 0)
+        node = tree.node[slots]
+        aabbs = tree.aabbs[slots][node > 0]
+        bounds = tree.bounds[node[node > 0]]
+        self.assertTrue(np.all(bounds[:, 0] <= aabbs[:, 0]))
+        self.assertTrue(np.all(aabbs[:, 1] <= bounds[:, 1]))
+
+        # counts include the objects of every descendant
+        count = np.bincount(node, minlength=len(tree.keys))
+        for n in range(len(tree.keys)):
+            children = tree.children[n][tree.children[n] >= 0]
+            self.assertEqual(tree.count[n], count[n] + np.sum(tree.count[children]))
+
+    def check_intersect_aabbs(self, tree, ids, aabbs):
+        boxes = random_aabbs(self.rng, 50, extent=(.5, 2.))
+        query, found = octree.intersect_aabbs(tree, boxes)
+        expected = np.argwhere(overlapping(boxes, aabbs))
+        expected = np.stack([expected[:, 0], ids[expected[:, 1]]], axis=-1)
+        expected = expected[np.lexsort((expected[:, 1], expected[:, 0]))]
+        self.assertTrue(len(query) > 0)
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(found, expected[:, 1])
+
+    def test_import(self):
+        import pyrr
+        pyrr.octree
+        from pyrr import octree
+
+    def test_create(self):
+        tree = octree.create([[0., 0., 0.], [4., 2., 1.]])
+        np.testing.assert_almost_equal(tree.centre, [2., 1., .5])
+        self.assertEqual(tree.half_size, 2.)
+        np.testing.assert_almost_equal(tree.bounds, [[[-2., -3., -3.5], [6., 5., 4.5]]])
+        self.assertEqual(len(tree), 0)
+
+    def test_create_invalid(self):
+        self.assertRaises(ValueError, lambda: octree.create([[0., 0., 0.], [1., 1., 1.]], looseness=1.))
+        self.assertRaises(ValueError, lambda: octree.create([[0., 0., 0.], [1., 1., 1.]], max_depth=17))
+
+    def test_insert(self):
+        self.assertEqual(len(self.tree), 500)
+        np.testing.assert_equal(self.tree.ids[self.tree.slots[self.ids]], self.ids)
+        self.check_tree(self.tree)
+        self.check_intersect_aabbs(self.tree, self.ids, self.aabbs)
+
+    def test_insert_outside(self):
+        # objects outside of the root are stored in the root
+        tree = octree.create([[0., 0., 0.], [1., 1., 1.]])
+        octree.insert(tree, [0, 1], [[[5., 5., 5.], [6., 6., 6.]], [[.1, .1, .1], [.2, .2, .2]]])
+        self.assertEqual(tree.node[tree.slots[0]], 0)
+        query, found = octree.intersect_aabbs(tree, [[[4., 4., 4.], [5., 5., 5.]]])
+        np.testing.assert_equal(found, [0])
+
+    def test_insert_invalid(self):
+        self.assertRaises(ValueError, lambda: octree.insert(self.tree, [self.ids[0]], self.aabbs[:1]))
+        self.assertRaises(ValueError, lambda: octree.insert(self.tree, [2000, 2000], self.aabbs[:2]))
+        self.assertRaises(ValueError, lambda: octree.insert(self.tree, [-1], self.aabbs[:1]))
+
+    def test_remove(self):
+        octree.remove(self.tree, self.ids[:200])
+        self.assertEqual(len(self.tree), 300)
+        self.check_tree(self.tree)
+        self.check_intersect_aabbs(self.tree, self.ids[200:], self.aabbs[200:])
+
+        # free slots are reused
+        size = len(self.tree.ids)
+        octree.insert(self.tree, self.ids[:200], self.aabbs[:200])
+        self.assertEqual(len(self.tree.ids), size)
+        self.check_intersect_aabbs(self.tree, self.ids, self.aabbs)
+
+    def test_remove_invalid(self):
+        octree.remove(self.tree, self.ids[:1])
+        self.assertRaises(ValueError, lambda: octree.remove(self.tree, self.ids[:1]))
+        self.assertRaises(ValueError, lambda: octree.remove(self.tree, [5000]))
+
+    def test_move(self):
+        moved = self.aabbs + self.rng.normal(scale=.2, size=(500,1,3))
+        moved[:20] *= 3.
+        octree.move(self.tree, self.ids, moved)
+        self.assertEqual(len(self.tree), 500)
+        self.check_tree(self.tree)
+        self.check_intersect_aabbs(self.tree, self.ids, moved)
+
+    def test_intersect_rays(self):
+        rays = np.stack([self.rng.uniform(-15., 15., (100,3)), self.rng.normal(size=(100,3))], axis=1)
+        ray, found, t = octree.intersect_rays(self.tree, rays)
+        self.assertTrue(len(ray) > 0)
+
+        hit, tmin, _ = geometric_tests.rays_intersect_aabbs(rays, self.aabbs, all_pairs=True)
+        expected = np.argwhere(hit)
+        self.assertEqual(
+            set(zip(ray, found)),
+            set(zip(expected[:, 0], self.ids[expected[:, 1]])),
+        )
+        np.testing.assert_almost_equal(t, np.maximum(tmin[ray, self.tree.slots[found]], 0.))
+        self.assertTrue(np.all(np.diff(t)[np.diff(ray) == 0] >= 0.))
+
+    def test_intersect_frustum(self):
+        view = matrix44.create_look_at([0., 0., 20.], [0., 0., 0.], [0., 1., 0.])
+        projection = matrix44.create_perspective_projection(45., 1., .1, 25.)
+        f = frustum.create_from_matrix(matrix44.multiply(view, projection))
+        found = octree.intersect_frustum(self.tree, f)
+
+        _, outside, _ = frustum.classify_aabbs(f, self.aabbs)
+        self.assertTrue(0 < len(found) < 500)
+        np.testing.assert_equal(found, np.sort(self.ids[~outside]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,7 @@ try:
 except:
     import unittest
 import numpy as np
-from pyrr import quaternion
+from pyrr import quaternion, matrix33, matrix44
 
 
 class test_quaternion(unittest.TestCase):
@@ -27,6 +27,29 @@ class test_quaternion(unittest.TestCase):
         np.testing.assert_almost_equal(result, [1.0, 2.0, 3.0, 4.0], decimal=5)
         self.assertTrue(result.dtype == float)
 
+    def test_create_out(self):
+        out = np.empty(4)
+        result = quaternion.create(1., 2., 3., 4., out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, [1., 2., 3., 4.], decimal=5)
+
+        quaternion.create_from_x_rotation(np.pi, out=out)
+        np.testing.assert_almost_equal(out, [1., 0., 0., 0.], decimal=5)
+
+        quaternion.create_from_axis_rotation([1., 1., 1.], np.pi, out=out)
+        np.testing.assert_almost_equal(out, quaternion.create_from_axis_rotation([1., 1., 1.], np.pi), decimal=5)
+
+        quaternion.create_from_matrix(np.eye(3), out=out)
+        np.testing.assert_almost_equal(out, [0., 0., 0., 1.], decimal=5)
+
+        quaternion.create_from_eulers([1., 2., 3.], out=out)
+        np.testing.assert_almost_equal(out, quaternion.create_from_eulers([1., 2., 3.]), decimal=5)
+
+    def test_create_out_slice(self):
+        out = np.zeros((3, 4))
+        quaternion.create_from_y_rotation(np.pi, out=out[1])
+        np.testing.assert_almost_equal(out, [[0., 0., 0., 0.], [0., 1., 0., 0.], [0., 0., 0., 0.]], decimal=5)
+
     def test_create_from_x_rotation(self):
         # 180 degree turn around X axis
         q = quaternion.create_from_x_rotation(np.pi)
@@ -40,6 +63,10 @@ class test_quaternion(unittest.TestCase):
         q = quaternion.create_from_x_rotation(-np.pi / 2.)
         self.assertTrue(np.allclose(q, [-np.sqrt(0.5), 0., 0., np.sqrt(0.5)]))
 
+    def test_create_from_x_rotation_batch(self):
+        q = quaternion.create_from_x_rotation([np.pi, np.pi / 2.])
+        self.assertTrue(np.allclose(q, [[1., 0., 0., 0.], [np.sqrt(0.5), 0., 0., np.sqrt(0.5)]]))
+
     def test_create_from_y_rotation(self):
         # 180 degree turn around Y axis
         q = quaternion.create_from_y_rotation(np.pi)
@@ -82,6 +109,26 @@ class test_quaternion(unittest.TestCase):
         np.testing.assert_almost_equal(result, expected)
         self.assertTrue(result.dtype == float)
 
+    def test_create_from_axis_rotation_batch(self):
+        axis = np.array([[1., 0., 0.], [0., 2., 0.], [1., 1., 1.]])
+        theta = np.array([np.pi / 2., np.pi, np.pi / 3.])
+        result = quaternion.create_from_axis_rotation(axis, theta)
+        self.assertEqual(result.shape, (3,4))
+        for i in range(3):
+            np.testing.assert_almost_equal(result[i], quaternion.create_from_axis_rotation(axis[i], theta[i]), decimal=5)
+
+        # a single axis with many angles
+        result = quaternion.create_from_axis_rotation([1., 0., 0.], theta)
+        np.testing.assert_almost_equal(result, quaternion.create_from_x_rotation(theta), decimal=5)
+
+    def test_create_from_axis_batch(self):
+        axis = np.array([[np.pi, np.pi, np.pi], [0., 0., 0.], [0., 0., np.pi / 2.]])
+        result = quaternion.create_from_axis(axis)
+        self.assertEqual(result.shape, (3,4))
+        np.testing.assert_almost_equal(result[0], quaternion.create_from_axis(axis[0]), decimal=5)
+        np.testing.assert_almost_equal(result[1], [0., 0., 0., 1.], decimal=5)
+        np.testing.assert_almost_equal(result[2], quaternion.create_from_z_rotation(np.pi / 2.), decimal=5)
+
     def test_create_from_matrix_unit(self):
         result = quaternion.create_from_matrix(np.eye(3))
         np.testing.assert_almost_equal(result, [0., 0., 0., 1.], decimal=5)
@@ -114,6 +161,28 @@ class test_quaternion(unittest.TestCase):
         np.testing.assert_almost_equal(result, [0., 0., 1., 0.], decimal=5)
         self.assertTrue(result.dtype == float)
 
+    def test_create_from_matrix_batch(self):
+        # random rotations plus the branches for each diagonal term
+        mats = [matrix33.create_from_quaternion(q) for q in quaternion.normalize(np.random.uniform(-1., 1., (64,4)))]
+        mats += [np.diag([1., -1., -1.]), np.diag([-1., 1., -1.]), np.diag([-1., -1., 1.]), np.eye(3)]
+        mats = np.array(mats)
+
+        result = quaternion.create_from_matrix(mats)
+        self.assertEqual(result.shape, (len(mats),4))
+        for m, q in zip(mats, result):
+            np.testing.assert_almost_equal(q, quaternion.create_from_matrix(m), decimal=5)
+
+        # matrix44 and nested arrays
+        mats44 = np.array([matrix44.create_from_matrix33(m) for m in mats])
+        np.testing.assert_almost_equal(quaternion.create_from_matrix(mats44), result, decimal=5)
+        np.testing.assert_almost_equal(
+            quaternion.create_from_matrix(mats.reshape((2, -1, 3, 3))),
+            result.reshape((2, -1, 4)), decimal=5)
+
+        out = np.empty((len(mats),4))
+        self.assertTrue(quaternion.create_from_matrix(mats, out=out) is out)
+        np.testing.assert_almost_equal(out, result, decimal=5)
+
     def test_create_from_eulers_identity(self):
         result = quaternion.create_from_eulers([0., 0., 0.])
         np.testing.assert_equal(result, [0., 0., 0., 1.])
@@ -124,6 +193,18 @@ class test_quaternion(unittest.TestCase):
         np.testing.assert_almost_equal(result, [0.7549338, -0.2061492, 0.5015091, -0.3688714], decimal=5)
         self.assertTrue(result.dtype == float)
 
+    def test_create_from_eulers_batch(self):
+        e = np.random.uniform(-np.pi, np.pi, (8,3))
+        result = quaternion.create_from_eulers(e)
+        self.assertEqual(result.shape, (8,4))
+        for i in range(8):
+            np.testing.assert_almost_equal(result[i], quaternion.create_from_eulers(e[i]), decimal=5)
+
+        result = quaternion.create_from_inverse_of_eulers(e)
+        self.assertEqual(result.shape, (8,4))
+        for i in range(8):
+            np.testing.assert_almost_equal(result[i], quaternion.create_from_inverse_of_eulers(e[i]), decimal=5)
+
     @unittest.skip('Not implemented')
     def test_create_from_inverse_of_eulers(self):
         pass
@@ -134,6 +215,24 @@ class test_quaternion(unittest.TestCase):
         result = quaternion.cross(q1, q2)
         np.testing.assert_almost_equal(result, quaternion.create(), decimal=5)
 
+    def test_cross_batch(self):
+        q1 = quaternion.create_from_x_rotation([np.pi / 2.0, np.pi])
+        q2 = quaternion.create_from_x_rotation([-np.pi / 2.0, np.pi])
+        result = quaternion.cross(q1, q2)
+        expected = [
+            quaternion.cross(q1[0], q2[0]),
+            quaternion.cross(q1[1], q2[1]),
+        ]
+        self.assertEqual(result.shape, (2, 4))
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+    def test_cross_broadcast(self):
+        q1 = quaternion.create_from_y_rotation(np.pi / 2.0)
+        q2 = quaternion.create_from_x_rotation([0., np.pi / 2.0, np.pi])
+        result = quaternion.cross(q1, q2)
+        expected = [quaternion.cross(q1, q) for q in q2]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
 
     def test_quaternion_slerp(self):
         sqrt2 = np.sqrt(2) / 2
@@ -187,6 +286,51 @@ class test_quaternion(unittest.TestCase):
         xz90rot = quaternion.rotation_angle(xz90rot)
         np.testing.assert_almost_equal(xz90rot, np.pi / 4, decimal=4)
 
+    def test_quaternion_slerp_batch(self):
+        sqrt2 = np.sqrt(2) / 2
+
+        identity = np.array([0.0, 0.0, 0.0, 1.0])
+        y90rot = np.array([0.0, sqrt2, 0.0, sqrt2])
+        x90rot = np.array([sqrt2, 0.0, 0.0, sqrt2])
+
+        q1 = np.array([identity, -y90rot, identity, y90rot])
+        q2 = np.array([y90rot, identity, -x90rot, y90rot])
+        t = np.array([0.5, 0.25, 0.75, 0.5])
+
+        result = quaternion.slerp(q1, q2, t)
+        expected = [quaternion.slerp(a, b, c) for a, b, c in zip(q1, q2, t)]
+        self.assertEqual(result.shape, (4, 4))
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+        # scalar t is broadcast across all pairs
+        result = quaternion.slerp(q1, q2, 0.5)
+        expected = [quaternion.slerp(a, b, 0.5) for a, b in zip(q1, q2)]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+    def test_quaternion_slerp_small_angle_shortest_path(self):
+        # nearly opposite quaternions represent nearly the same rotation
+        # the lerp fallback must still take the shortest path
+        q1 = quaternion.create_from_y_rotation(0.01)
+        q2 = -quaternion.create_from_y_rotation(0.02)
+        result = quaternion.slerp(q1, q2, 0.5)
+        angle = quaternion.rotation_angle(result * np.sign(result[3]))
+        np.testing.assert_almost_equal(angle, 0.015, decimal=4)
+
+    def test_quaternion_lerp_batch(self):
+        q1 = quaternion.create_from_y_rotation([0., 0., np.pi / 2.])
+        q2 = quaternion.create_from_y_rotation([np.pi / 2., np.pi / 2., np.pi / 2.])
+        t = [0., 1., 0.5]
+        result = quaternion.lerp(q1, q2, t)
+        expected = [quaternion.lerp(a, b, c) for a, b, c in zip(q1, q2, t)]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+        np.testing.assert_almost_equal(result[1], q2[1], decimal=5)
+
+    def test_quaternion_nlerp(self):
+        q1 = quaternion.create_from_y_rotation(0.)
+        q2 = quaternion.create_from_y_rotation(np.pi / 2.)
+        result = quaternion.nlerp(q1, -q2, [0., 1.])
+        np.testing.assert_almost_equal(result, [q1, q2], decimal=5)
+
     def test_is_zero_length(self):
         result = quaternion.is_zero_length([1., 0., 0., 0.])
         self.assertFalse(result)
@@ -195,6 +339,13 @@ class test_quaternion(unittest.TestCase):
         result = quaternion.is_zero_length([0., 0., 0., 0.])
         self.assertTrue(result)
 
+    def test_is_zero_length_batch(self):
+        result = quaternion.is_zero_length([
+            [1., 0., 0., 0.],
+            [0., 0., 0., 0.],
+        ])
+        np.testing.assert_equal(result, [False, True])
+
     def test_is_non_zero_length(self):
         result = quaternion.is_non_zero_length([1., 0., 0., 0.])
         self.assertTrue(result)
@@ -263,6 +414,20 @@ class test_quaternion(unittest.TestCase):
         result = quaternion.rotation_axis([5.77350000e-01, 5.77350000e-01, 5.77350000e-01, 6.12323400e-17])
         np.testing.assert_almost_equal(result, [0.57735, 0.57735, 0.57735], decimal=5)
 
+    def test_rotation_angle_batch(self):
+        result = quaternion.rotation_angle([
+            [5.77350000e-01, 5.77350000e-01, 5.77350000e-01, 6.12323400e-17],
+            [0., 0., 0., 1.],
+        ])
+        np.testing.assert_almost_equal(result, [np.pi, 0.], decimal=5)
+
+    def test_rotation_axis_batch(self):
+        result = quaternion.rotation_axis([
+            [5.77350000e-01, 5.77350000e-01, 5.77350000e-01, 6.12323400e-17],
+            [0., 0., 0., 1.],
+        ])
+        np.testing.assert_almost_equal(result, [[0.57735, 0.57735, 0.57735], [0., 0., -1.]], decimal=5)
+
     def test_dot_adjacent(self):
         result = quaternion.dot([1., 0., 0., 0.], [0., 1., 0., 0.])
         np.testing.assert_almost_equal(result, 0.0, decimal=5)
@@ -297,6 +462,10 @@ class test_quaternion(unittest.TestCase):
         result = quaternion.conjugate([5.77350000e-01, 5.77350000e-01, 5.77350000e-01, 6.12323400e-17])
         np.testing.assert_almost_equal(result, [-0.57735, -0.57735, -0.57735, 6.12323e-17], decimal=5)
 
+    def test_conjugate_batch(self):
+        result = quaternion.conjugate([[0., 0., 0., 1.], [1., 2., 3., 4.]])
+        np.testing.assert_almost_equal(result, [[0., 0., 0., 1.], [-1., -2., -3., 4.]], decimal=5)
+
     def test_exp(self):
         source = np.array([0, 0, 0, 1.0])
         result = quaternion.exp(source)
@@ -327,9 +496,25 @@ class test_quaternion(unittest.TestCase):
         expected = 2 * np.finfo(result.dtype).eps
         np.testing.assert_almost_equal(result, expected)
 
-    @unittest.skip('Not implemented')
+    def test_exp_batch(self):
+        source = np.array([
+            [0, 0, 0, 1.0],
+            quaternion.create_from_eulers([np.pi, 0, 0]),
+        ])
+        result = quaternion.exp(source)
+        expected = [quaternion.exp(source[0]), quaternion.exp(source[1])]
+        np.testing.assert_almost_equal(result, expected)
+
     def test_power(self):
-        pass
+        q = quaternion.create_from_x_rotation(np.pi / 4.)
+        result = quaternion.power(q, 2.)
+        np.testing.assert_almost_equal(result, quaternion.create_from_x_rotation(np.pi / 2.), decimal=5)
+
+    def test_power_batch(self):
+        q = quaternion.create_from_x_rotation([np.pi / 4., np.pi / 2., 0.])
+        result = quaternion.power(q, 2.)
+        expected = quaternion.create_from_x_rotation([np.pi / 2., np.pi, 0.])
+        np.testing.assert_almost_equal(result, expected, decimal=5)
 
     def test_inverse(self):
         result = quaternion.inverse([0., 0., 0., 1.])
@@ -345,6 +530,16 @@ class test_quaternion(unittest.TestCase):
         expected = quaternion.conjugate(q) / quaternion.length(q)
         np.testing.assert_almost_equal(result, expected, decimal=5)
 
+    def test_inverse_batch(self):
+        q = [[0., 0., 0., 1.], [1., 2., 3., 4.]]
+        result = quaternion.inverse(q)
+        expected = [quaternion.inverse(q[0]), quaternion.inverse(q[1])]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+
+    def test_is_identity_batch(self):
+        result = quaternion.is_identity([[0., 0., 0., 1.], [1., 0., 0., 0.]])
+        np.testing.assert_equal(result, [True, False])
+
     def test_negate_unit(self):
         result = quaternion.negate([0., 0., 0., 1.])
         np.testing.assert_almost_equal(result, [0., 0., 0., -1.], decimal=5)
@@ -424,6 +619,61 @@ class test_quaternion(unittest.TestCase):
         self.assertTrue(np.allclose(quaternion.apply_to_vector(q, [0., 2., 0.]), [0.,-2., 0.]))
         self.assertTrue(np.allclose(quaternion.apply_to_vector(q, [0., 0., 2.]), [0., 0.,-2.]))
 
+    def test_apply_to_vector_batch(self):
+        # one quaternion applied to many vectors
+        q = quaternion.create_from_x_rotation(np.pi / 2.)
+        vecs = np.array([[1., 0., 0.], [0., 1., 0.], [0., 0., 1.]])
+        result = quaternion.apply_to_vector(q, vecs)
+        np.testing.assert_almost_equal(result, [[1., 0., 0.], [0., 0., 1.], [0.,-1., 0.]], decimal=5)
+
+        # many quaternions applied to many vectors
+        qs = quaternion.create_from_z_rotation([np.pi, np.pi / 2., -np.pi / 2.])
+        vecs = np.array([[1., 0., 0.], [1., 0., 0.], [0., 1., 0.]])
+        result = quaternion.apply_to_vector(qs, vecs)
+        expected = [quaternion.apply_to_vector(a, b) for a, b in zip(qs, vecs)]
+        np.testing.assert_almost_equal(result, expected, decimal=5)
+        np.testing.assert_almost_equal(result, [[-1., 0., 0.], [0., 1., 0.], [1., 0., 0.]], decimal=5)
+
+    def test_apply_to_vector_batch_vector4(self):
+        qs = quaternion.create_from_z_rotation([np.pi / 2., np.pi])
+        vecs = np.array([[1., 0., 0., 1.], [0., 1., 0., 0.]])
+        result = quaternion.apply_to_vector(qs, vecs)
+        np.testing.assert_almost_equal(result, [[0., 1., 0., 1.], [0.,-1., 0., 0.]], decimal=5)
+
+    def test_apply_to_vector_out(self):
+        q = quaternion.create_from_y_rotation(np.pi / 2.)
+        vecs = np.array([[1., 0., 0.], [0., 0., 1.]])
+        out = np.empty((2, 3))
+        result = quaternion.apply_to_vector(q, vecs, out=out)
+        self.assertTrue(result is out)
+        np.testing.assert_almost_equal(out, [[0., 0.,-1.], [1., 0., 0.]], decimal=5)
+
+    def test_apply_to_vector_in_place(self):
+        q = quaternion.create_from_z_rotation(np.pi / 2.)
+        vecs = np.array([[1., 0., 0.], [0., 1., 0.]])
+        result = quaternion.apply_to_vector(q, vecs, out=vecs)
+        self.assertTrue(result is vecs)
+        np.testing.assert_almost_equal(vecs, [[0., 1., 0.], [-1., 0., 0.]], decimal=5)
+
+        vecs4 = np.array([[1., 0., 0., 1.], [0., 1., 0., 0.]])
+        quaternion.apply_to_vector(q, vecs4, out=vecs4)
+        np.testing.assert_almost_equal(vecs4, [[0., 1., 0., 1.], [-1., 0., 0., 0.]], decimal=5)
+
+    def test_apply_to_vector_dtype(self):
+        # an integer quaternion with float vectors
+        result = quaternion.apply_to_vector([0, 0, 0, 1], [1.5, 2.5, 3.5])
+        self.assertTrue(result.dtype == float)
+        np.testing.assert_almost_equal(result, [1.5, 2.5, 3.5], decimal=5)
+
+        # a float32 quaternion doesn't reduce the precision of float64 vectors
+        q = quaternion.create_from_z_rotation(np.pi / 2., dtype=np.float32)
+        result = quaternion.apply_to_vector(q, np.array([[1., 0., 0.]]))
+        self.assertTrue(result.dtype == np.float64)
+
+    def test_apply_to_vector_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            quaternion.apply_to_vector([0., 0., 0., 1.], [1., 0.])
+
     def test_identity(self):
         # https://en.wikipedia.org/wiki/Quaternion
         i = quaternion.create(1., 0., 0., 0.)
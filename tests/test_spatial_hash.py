@@ -0,0 +1,134 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import spatial_hash
+
+
+class test_spatial_hash(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.points = self.rng.uniform(-10., 10., (1000,3))
+        self.queries = self.rng.uniform(-12., 12., (200,3))
+        self.distances = np.linalg.norm(self.queries[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+
+    def test_import(self):
+        import pyrr
+        pyrr.spatial_hash
+        from pyrr import spatial_hash
+
+    def test_create_from_points(self):
+        grid = spatial_hash.create_from_points(self.points, 2.)
+        self.assertEqual(grid.cell_size, 2.)
+        np.testing.assert_equal(grid.radii, 0.)
+        np.testing.assert_equal(np.sort(grid.order), np.arange(1000))
+        self.assertEqual(np.sum(grid.count), 1000)
+        self.assertTrue(np.all(np.diff(grid.keys) > 0))
+
+        # the points within each cell share the same cell
+        for start, count in zip(grid.start, grid.count):
+            cells = np.floor(self.points[grid.order[start:start + count]] / 2.)
+            self.assertTrue(np.all(cells == cells[0]))
+
+    def test_create_from_spheres(self):
+        spheres = np.concatenate([self.points, self.rng.uniform(.1, .5, (1000,1))], axis=-1)
+        grid = spatial_hash.create_from_spheres(spheres)
+        self.assertAlmostEqual(grid.cell_size, 2. * np.max(spheres[:, 3]))
+        np.testing.assert_almost_equal(grid.radii, spheres[:, 3])
+
+    def test_create_out_of_range(self):
+        self.assertRaises(ValueError, lambda: spatial_hash.create_from_points([[1e9, 0., 0.]], 1.))
+
+    def test_query_radius(self):
+        grid = spatial_hash.create_from_points(self.points, 1.)
+        for radius in (.5, 1.5, self.rng.uniform(0., 3., 200)):
+            query, point, distance = spatial_hash.query_radius(grid, self.queries, radius)
+            expected = np.argwhere(self.distances <= np.reshape(radius, (-1,1)))
+            np.testing.assert_equal(query, expected[:, 0])
+            np.testing.assert_equal(point, expected[:, 1])
+            np.testing.assert_almost_equal(distance, self.distances[query, point])
+
+    def test_query_radius_far_away(self):
+        grid = spatial_hash.create_from_points(self.points, .5)
+        queries = self.queries + [40., 0., 0.]
+        radius = self.rng.uniform(25., 35., 200)
+        query, point, distance = spatial_hash.query_radius(grid, queries, radius, block_size=1000)
+        distances = np.linalg.norm(queries[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+        expected = np.argwhere(distances <= radius[:, np.newaxis])
+        self.assertTrue(len(expected) > 0)
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(point, expected[:, 1])
+
+    def test_query_radius_spheres(self):
+        spheres = np.concatenate([self.points, self.rng.uniform(.1, .5, (1000,1))], axis=-1)
+        grid = spatial_hash.create_from_spheres(spheres, cell_size=1.)
+        query, point, distance = spatial_hash.query_radius(grid, self.queries, .5, block_size=100)
+        expected = np.argwhere(self.distances <= .5 + spheres[:, 3])
+        np.testing.assert_equal(query, expected[:, 0])
+        np.testing.assert_equal(point, expected[:, 1])
+
+    def test_query_nearest(self):
+        grid = spatial_hash.create_from_points(self.points, 1.)
+        for k in (1, 8, 40):
+            nearest, distance = spatial_hash.query_nearest(grid, self.queries, k)
+            self.assertEqual(nearest.shape, (200,k))
+            np.testing.assert_equal(nearest, np.argsort(self.distances, axis=-1)[:, :k])
+            np.testing.assert_almost_equal(distance, np.sort(self.distances, axis=-1)[:, :k])
+
+    def test_query_nearest_far_away(self):
+        # queries far from the points need several rounds of searching
+        grid = spatial_hash.create_from_points(self.points, .5)
+        queries = np.array([[50., 0., 0.], [0., -30., 5.]])
+        nearest, distance = spatial_hash.query_nearest(grid, queries, 3, block_size=1)
+        expected = np.linalg.norm(queries[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+        np.testing.assert_equal(nearest, np.argsort(expected, axis=-1)[:, :3])
+
+    def test_query_nearest_far_away_blocks(self):
+        # near and far queries are searched in blocks of a bounded size
+        grid = spatial_hash.create_from_points(self.points, .25)
+        queries = np.concatenate([self.queries, self.queries + [80., 0., 0.]])
+        nearest, distance = spatial_hash.query_nearest(grid, queries, 4, block_size=2000)
+        expected = np.linalg.norm(queries[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+        np.testing.assert_equal(nearest, np.argsort(expected, axis=-1)[:, :4])
+        np.testing.assert_almost_equal(distance, np.sort(expected, axis=-1)[:, :4])
+
+    def test_query_nearest_no_queries(self):
+        grid = spatial_hash.create_from_points(self.points, 1.)
+        nearest, distance = spatial_hash.query_nearest(grid, np.empty((0,3)), 3)
+        self.assertEqual(nearest.shape, (0,3))
+        self.assertEqual(distance.shape, (0,3))
+
+    def test_query_nearest_too_few_points(self):
+        grid = spatial_hash.create_from_points(self.points[:2], 1.)
+        nearest, distance = spatial_hash.query_nearest(grid, self.queries[:1], 4)
+        np.testing.assert_equal(nearest[0, 2:], [-1, -1])
+        np.testing.assert_equal(distance[0, 2:], [np.inf, np.inf])
+        np.testing.assert_equal(np.sort(nearest[0, :2]), [0, 1])
+
+    def test_query_pairs(self):
+        grid = spatial_hash.create_from_points(self.points, 1.)
+        pairs = spatial_hash.query_pairs(grid, .8)
+        distances = np.linalg.norm(self.points[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+        self.assertTrue(len(pairs) > 0)
+        np.testing.assert_equal(pairs, np.argwhere(np.triu(distances <= .8, 1)))
+
+    def test_query_pairs_spheres(self):
+        spheres = np.concatenate([self.points, self.rng.uniform(.1, .5, (1000,1))], axis=-1)
+        grid = spatial_hash.create_from_spheres(spheres)
+        pairs = spatial_hash.query_pairs(grid)
+        distances = np.linalg.norm(self.points[:, np.newaxis] - self.points[np.newaxis], axis=-1)
+        expected = distances <= spheres[:, np.newaxis, 3] + spheres[np.newaxis, :, 3]
+        np.testing.assert_equal(pairs, np.argwhere(np.triu(expected, 1)))
+
+    def test_empty(self):
+        grid = spatial_hash.create_from_points(np.empty((0,3)), 1.)
+        query, point, distance = spatial_hash.query_radius(grid, self.queries, 1.)
+        self.assertEqual(len(query), 0)
+        nearest, distance = spatial_hash.query_nearest(grid, self.queries, 2)
+        np.testing.assert_equal(nearest, -1)
+        self.assertEqual(spatial_hash.query_pairs(grid, 1.).shape, (0,2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr import sweep_and_prune
+from .helpers import random_aabbs
+
+
+def brute_force_pairs(aabbs):
+    overlap = np.all((aabbs[:, None, 0] <= aabbs[None, :, 1]) & (aabbs[None, :, 0] <= aabbs[:, None, 1]), axis=-1)
+    return np.argwhere(np.triu(overlap, 1))
+
+
+class test_sweep_and_prune(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+        self.aabbs = random_aabbs(self.rng, 500)
+
+    def test_import(self):
+        import pyrr
+        pyrr.sweep_and_prune
+        from pyrr import sweep_and_prune
+
+    def test_create_from_aabbs(self):
+        aabbs = self.aabbs * [1., 5., 1.]
+        sap = sweep_and_prune.create_from_aabbs(aabbs)
+        self.assertEqual(sap.axis, 1)
+        self.assertTrue(np.all(np.diff(aabbs[sap.order, 0, 1]) >= 0.))
+
+        sap = sweep_and_prune.create_from_aabbs(aabbs, axis=2)
+        self.assertEqual(sap.axis, 2)
+        self.assertTrue(np.all(np.diff(aabbs[sap.order, 0, 2]) >= 0.))
+
+    def test_find_overlapping_pairs(self):
+        pairs = sweep_and_prune.find_overlapping_pairs(self.aabbs)
+        self.assertTrue(len(pairs) > 0)
+        np.testing.assert_equal(pairs, brute_force_pairs(self.aabbs))
+
+    def test_overlapping_pairs_touching(self):
+        aabbs = np.array([
+            [[0., 0., 0.], [1., 1., 1.]],
+            [[1., 0., 0.], [2., 1., 1.]],
+            [[2., 1., 1.], [3., 2., 2.]],
+            [[0., 0., 0.], [1., 1., 1.]],
+            [[5., 5., 5.], [6., 6., 6.]],
+        ])
+        pairs = sweep_and_prune.find_overlapping_pairs(aabbs, axis=0)
+        np.testing.assert_equal(pairs, [[0, 1], [0, 3], [1, 2], [1, 3]])
+
+    def test_overlapping_pairs_block_size(self):
+        sap = sweep_and_prune.create_from_aabbs(self.aabbs)
+        np.testing.assert_equal(
+            sweep_and_prune.overlapping_pairs(sap, block_size=7),
+            sweep_and_prune.overlapping_pairs(sap),
+        )
+
+    def test_overlapping_pairs_empty(self):
+        pairs = sweep_and_prune.find_overlapping_pairs(np.empty((0,2,3)))
+        self.assertEqual(pairs.shape, (0,2))
+        pairs = sweep_and_prune.find_overlapping_pairs(self.aabbs[:1])
+        self.assertEqual(pairs.shape, (0,2))
+
+    def test_update(self):
+        sap = sweep_and_prune.create_from_aabbs(self.aabbs)
+        aabbs = self.aabbs
+        for frame in range(5):
+            aabbs = aabbs + self.rng.normal(scale=.5, size=(500,1,3))
+            sweep_and_prune.update(sap, aabbs)
+            self.assertTrue(np.all(np.diff(aabbs[sap.order, 0, sap.axis]) >= 0.))
+            np.testing.assert_equal(sweep_and_prune.overlapping_pairs(sap), brute_force_pairs(aabbs))
+
+    def test_update_in_place(self):
+        sap = sweep_and_prune.create_from_aabbs(self.aabbs)
+        sap.aabbs[:, :, sap.axis] *= -1.
+        sap.aabbs[:, :, sap.axis] = sap.aabbs[:, ::-1, sap.axis]
+        sweep_and_prune.update(sap)
+        np.testing.assert_equal(sweep_and_prune.overlapping_pairs(sap), brute_force_pairs(sap.aabbs))
+
+
+if __name__ == '__main__':
+    unittest.main()
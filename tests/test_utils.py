@@ -0,0 +1,157 @@
+try:
+    import unittest2 as unittest
+except:
+    import unittest
+import numpy as np
+from pyrr.utils import all_parameters_as_numpy_arrays, parameters_as_numpy_arrays, fast_path, \
+    solve_quadratic_equation, solve_quadratic_equations
+
+
+class test_utils(unittest.TestCase):
+    def test_import(self):
+        import pyrr
+        pyrr.utils
+        from pyrr import utils
+
+    def test_all_parameters_as_numpy_arrays(self):
+        @all_parameters_as_numpy_arrays
+        def fn(a, b=None, c=None):
+            return a, b, c
+
+        arr = np.array([1., 2.])
+        a, b, c = fn([1, 2], b=arr)
+        self.assertTrue(isinstance(a, np.ndarray))
+        self.assertTrue(b is arr)
+        self.assertTrue(c is None)
+
+    def test_parameters_as_numpy_arrays(self):
+        @parameters_as_numpy_arrays('a', 'c')
+        def fn(a, b, c=None):
+            return a, b, c
+
+        a, b, c = fn([1, 2], [3, 4], [5, 6])
+        self.assertTrue(isinstance(a, np.ndarray))
+        self.assertTrue(isinstance(b, list))
+        self.assertTrue(isinstance(c, np.ndarray))
+
+        a, b, c = fn([1, 2], [3, 4], c=[5, 6])
+        self.assertTrue(isinstance(c, np.ndarray))
+
+        a, b, c = fn([1, 2], b=[3, 4])
+        self.assertTrue(isinstance(b, list))
+        self.assertTrue(c is None)
+
+    def test_parameters_as_numpy_arrays_no_copy(self):
+        @parameters_as_numpy_arrays('a')
+        def fn(a):
+            return a
+
+        arr = np.array([1., 2.])
+        self.assertTrue(fn(arr) is arr)
+        self.assertTrue(fn(a=arr) is arr)
+
+    def test_parameters_as_numpy_arrays_subclass(self):
+        # subclasses are converted to plain arrays so their
+        # operators are not used by the decorated function
+        from pyrr import Vector3
+
+        @parameters_as_numpy_arrays('a')
+        def fn(a):
+            return a
+
+        result = fn(Vector3([1., 2., 3.]))
+        self.assertTrue(type(result) is np.ndarray)
+
+    def test_fast_path(self):
+        @all_parameters_as_numpy_arrays
+        def fn1(a):
+            return a
+
+        @parameters_as_numpy_arrays('a')
+        def fn2(a):
+            return a
+
+        with fast_path():
+            self.assertTrue(isinstance(fn1([1, 2]), list))
+            self.assertTrue(isinstance(fn2([1, 2]), list))
+
+            with fast_path(False):
+                self.assertTrue(isinstance(fn1([1, 2]), np.ndarray))
+            self.assertTrue(isinstance(fn1([1, 2]), list))
+
+        self.assertTrue(isinstance(fn1([1, 2]), np.ndarray))
+        self.assertTrue(isinstance(fn2([1, 2]), np.ndarray))
+
+    def test_fast_path_exception(self):
+        @all_parameters_as_numpy_arrays
+        def fn(a):
+            return a
+
+        with fast_path():
+            try:
+                with fast_path(enabled=False):
+                    self.assertTrue(isinstance(fn([1, 2]), np.ndarray))
+                    raise RuntimeError()
+            except RuntimeError:
+                pass
+            # the enclosing fast path is restored
+            self.assertTrue(isinstance(fn([1, 2]), list))
+
+        self.assertTrue(isinstance(fn([1, 2]), np.ndarray))
+
+    def test_fast_path_thread(self):
+        import threading
+
+        @all_parameters_as_numpy_arrays
+        def fn(a):
+            return a
+
+        entered, checked = threading.Event(), threading.Event()
+        results = []
+
+        def run():
+            with fast_path():
+                results.append(fn([1, 2]))
+                entered.set()
+                checked.wait(5.)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        try:
+            entered.wait(5.)
+            # another thread's fast path doesn't affect this thread
+            self.assertTrue(isinstance(fn([1, 2]), np.ndarray))
+        finally:
+            checked.set()
+            thread.join()
+        self.assertTrue(isinstance(results[0], list))
+
+    def test_fast_path_results(self):
+        import pyrr
+        from pyrr import quaternion
+        q1 = quaternion.create_from_x_rotation(np.pi / 2.)
+        q2 = quaternion.create_from_y_rotation(np.pi / 2.)
+        expected = quaternion.cross(q1, q2)
+        with pyrr.fast_path():
+            result = quaternion.cross(q1, q2)
+        np.testing.assert_almost_equal(result, expected)
+
+    def test_solve_quadratic_equations(self):
+        a = np.array([1., 1., 1., 2., 1., 1e-3])
+        b = np.array([-3., 2., 0., 0., 0., 1e3])
+        c = np.array([2., 1., 1., -8., 0., 1.])
+        x0, x1, real = solve_quadratic_equations(a, b, c)
+        np.testing.assert_equal(real, [True, True, False, True, True, True])
+        np.testing.assert_allclose(x0[real], [1., -1., -2., 0., -1e6 + 1e-3], rtol=1e-9)
+        np.testing.assert_allclose(x1[real], [2., -1., 2., 0., -1e-3], rtol=1e-9)
+        self.assertTrue(np.all(np.isnan(x0[~real])))
+
+        # matches the scalar solver
+        for i in range(len(a)):
+            expected = sorted(solve_quadratic_equation(a[i], b[i], c[i]))
+            if expected:
+                np.testing.assert_almost_equal([x0[i], x1[i]][2 - len(expected):], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()